@@ -0,0 +1,75 @@
+"""木探索の分岐で使う `Battle.copy()` の複製速度（copies/sec）を計測し、
+通常のコピー（deepcopy）と構造共有コピー（`copy_on_write=True`）を比較する。
+
+`MinimaxPlayer` 等の木探索は分岐ごとに
+`battle.copy(reseed=True, copy_logs=False, omniscient=True)` を呼ぶため、
+同じ引数で計測する。盤面は数ターン進めた対戦途中の3vs3を使う
+（開始直後よりハンドラ・場の状態・ログが多く、探索中の実際の負荷に近いため）。
+"""
+import argparse
+import time
+
+from jpoke import Battle, Pokemon
+from jpoke.players import RandomPlayer
+
+
+def build_battle(seed: int, n_turns: int) -> Battle:
+    """3vs3全選出のバトルを開始し、n_turnsターン進めた盤面を返す。"""
+    player1 = RandomPlayer("Player1")
+    player1.team = [
+        Pokemon("ピカチュウ", ability_name="せいでんき", item_name="でんきだま",
+                move_names=["10まんボルト", "ボルテッカー", "でんこうせっか", "かげぶんしん"]),
+        Pokemon("リザードン", ability_name="もうか", item_name="いのちのたま",
+                move_names=["かえんほうしゃ", "エアスラッシュ", "にほんばれ", "ソーラービーム"]),
+        Pokemon("カビゴン", ability_name="あついしぼう", item_name="たべのこし",
+                move_names=["のしかかり", "ねむる", "じしん", "のろい"]),
+    ]
+    player2 = RandomPlayer("Player2")
+    player2.team = [
+        Pokemon("カメックス", ability_name="げきりゅう", item_name="オボンのみ",
+                move_names=["なみのり", "れいとうビーム", "あまごい", "からにこもる"]),
+        Pokemon("フシギバナ", ability_name="しんりょく", item_name="くろいヘドロ",
+                move_names=["ギガドレイン", "ヘドロばくだん", "やどりぎのタネ", "どくどく"]),
+        Pokemon("ゲンガー", ability_name="のろわれボディ", item_name="きあいのタスキ",
+                move_names=["シャドーボール", "さいみんじゅつ", "ヘドロばくだん", "みちづれ"]),
+    ]
+
+    battle = Battle(player1, player2, n_selected=3, seed=seed)
+    battle.start()
+    while battle.can_continue(max_turns=n_turns):
+        battle.step()
+    return battle
+
+
+def measure(battle: Battle, n_copies: int, copy_on_write: bool) -> float:
+    """n_copies回の複製を行い、1秒あたりの複製回数を返す。"""
+    t0 = time.perf_counter()
+    for _ in range(n_copies):
+        battle.copy(reseed=True, copy_logs=False, omniscient=True,
+                    copy_on_write=copy_on_write)
+    return n_copies / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-copies", type=int, default=300, help="1方式あたりの複製回数（既定: 300）")
+    parser.add_argument("--n-turns", type=int, default=3, help="計測前に進めるターン数（既定: 3）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード（既定: 0）")
+    args = parser.parse_args()
+
+    battle = build_battle(args.seed, args.n_turns)
+
+    before = measure(battle, args.n_copies, copy_on_write=False)
+    after = measure(battle, args.n_copies, copy_on_write=True)
+
+    print(f"複製回数: {args.n_copies} / 経過ターン数: {battle.turn} / seed: {args.seed}")
+    print(f"通常のコピー（deepcopy）: {before:.1f} copies/sec")
+    print(f"構造共有コピー（copy_on_write=True）: {after:.1f} copies/sec")
+    print(f"速度比: {after / before:.2f}x")
+
+    # 試してみよう: --n-turns を増やして、ログ・場の状態が積み上がった終盤の盤面で
+    # 再計測してみる
+
+
+if __name__ == "__main__":
+    main()
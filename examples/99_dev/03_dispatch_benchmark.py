@@ -0,0 +1,82 @@
+"""`DamageCalculator.calc_damages` の1回あたりの所要時間と、イベント発火時に
+主体の索引で省いたハンドラの有効判定の数を計測する。
+
+`EventManager.emit` はコンテキスト（`AttackContext` 等）を与えて発火すると、
+ハンドラの subject_spec が指すポケモンを1度だけ解決し、主体がそのポケモンに
+一致し得るハンドラだけを有効判定する。ダメージ計算で発火する補正イベントには
+攻撃側・防御側の両方の特性・持ち物のハンドラが登録されているため、
+相手側のハンドラの有効判定が省かれる。
+"""
+import argparse
+import time
+
+from jpoke import Battle, Pokemon
+from jpoke.core import EmitStats
+from jpoke.players import RandomPlayer
+
+
+def build_battle(seed: int) -> Battle:
+    """ダメージ補正に関わる特性・持ち物を持つ1vs1のバトルを開始した盤面を返す。"""
+    player1 = RandomPlayer("Player1")
+    player1.team = [
+        Pokemon("リザードン", ability_name="もうか", item_name="いのちのたま",
+                move_names=["かえんほうしゃ", "エアスラッシュ", "ソーラービーム", "ドラゴンクロー"]),
+    ]
+    player2 = RandomPlayer("Player2")
+    player2.team = [
+        Pokemon("カビゴン", ability_name="あついしぼう", item_name="とつげきチョッキ",
+                move_names=["のしかかり", "じしん", "かみくだく", "れいとうパンチ"]),
+    ]
+    battle = Battle(player1, player2, n_selected=1, seed=seed)
+    battle.start()
+    return battle
+
+
+def measure(battle: Battle, n_calls: int) -> tuple[float, dict]:
+    """場の2体が互いに全ての技のダメージを n_calls 回ずつ計算し、
+    1回あたりの所要時間（マイクロ秒）とイベントごとの集計を返す。"""
+    player1, player2 = battle.players
+    mon1, mon2 = battle.get_active(player1), battle.get_active(player2)
+    pairs = [(attacker, defender, move)
+             for attacker, defender in ((mon1, mon2), (mon2, mon1))
+             for move in attacker.moves]
+    stats = battle.events.enable_stats()
+    t0 = time.perf_counter()
+    for _ in range(n_calls):
+        for attacker, defender, move in pairs:
+            battle.damage_calculator.calc_damages(attacker, defender, move)
+    elapsed = time.perf_counter() - t0
+    battle.events.disable_stats()
+    return elapsed / (n_calls * len(pairs)) * 1e6, stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-calls", type=int, default=200, help="技1つあたりの計算回数（既定: 200）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード（既定: 0）")
+    args = parser.parse_args()
+
+    battle = build_battle(args.seed)
+    usec, stats = measure(battle, args.n_calls)
+
+    total = EmitStats()
+    print(f"{'イベント':<32}{'発火':>8}{'有効判定':>10}{'索引で除外':>10}{'実行':>8}")
+    for event, s in sorted(stats.items(), key=lambda item: -item[1].index_skips):
+        if s.validity_checks + s.index_skips == 0:
+            continue
+        print(f"{event.name:<32}{s.emits:>8}{s.validity_checks:>10}{s.index_skips:>10}{s.handler_calls:>8}")
+        total.validity_checks += s.validity_checks
+        total.index_skips += s.index_skips
+
+    n_candidates = total.validity_checks + total.index_skips
+    print(f"calc_damages 1回あたり: {usec:.1f} us")
+    if n_candidates:
+        print(f"省いた有効判定: {total.index_skips} / {n_candidates} "
+              f"({total.index_skips / n_candidates:.0%})")
+
+    # 試してみよう: build_battle の特性・持ち物を変えて、索引で除外される
+    # ハンドラの数がどう変わるかを見てみる
+
+
+if __name__ == "__main__":
+    main()
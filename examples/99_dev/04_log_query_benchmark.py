@@ -0,0 +1,101 @@
+"""100ターン進めた対戦のログの取得（`EventLogger.get` 等）の所要時間を計測し、
+全ログを走査する方法と比較する。
+
+`EventLogger` は記録と同時にターンの区間・プレイヤーごとの位置を索引するため、
+`Battle.get_event_logs()` や `Battle.get_log_lines()` のターンを指定した取得は
+全ログを走査せず、結果の件数に比例する時間で済む。長い対戦ほど差が大きくなる。
+対戦は互いにダメージを与えない技だけを使い、決着せずに指定ターン数まで進める。
+"""
+import argparse
+import time
+
+from jpoke import Battle, Pokemon
+from jpoke.core.event_logger import EventLogger
+from jpoke.enums import LogCode
+from jpoke.players import RandomPlayer
+
+MOVE_NAMES = ["かたくなる", "つるぎのまい", "まもる", "はねる"]
+
+
+def build_battle(seed: int, n_turns: int) -> Battle:
+    """3vs3全選出のバトルを開始し、n_turnsターン進めた盤面を返す。"""
+    player1 = RandomPlayer("Player1")
+    player1.team = [
+        Pokemon("ピカチュウ", item_name="たべのこし", move_names=MOVE_NAMES),
+        Pokemon("リザードン", move_names=MOVE_NAMES),
+        Pokemon("カビゴン", move_names=MOVE_NAMES),
+    ]
+    player2 = RandomPlayer("Player2")
+    player2.team = [
+        Pokemon("カメックス", item_name="たべのこし", move_names=MOVE_NAMES),
+        Pokemon("フシギバナ", move_names=MOVE_NAMES),
+        Pokemon("ゲンガー", move_names=MOVE_NAMES),
+    ]
+
+    battle = Battle(player1, player2, n_selected=3, seed=seed)
+    battle.start()
+    while battle.can_continue(max_turns=n_turns):
+        battle.step()
+    return battle
+
+
+def scan_queries(logger: EventLogger, n_turns: int) -> int:
+    """全ログを走査して、各ターン・各プレイヤーのログと HP_CHANGED のログを取得する。"""
+    n = 0
+    for turn in range(n_turns + 1):
+        for idx in (0, 1):
+            n += len([log for log in logger.logs if log.turn == turn and log.idx == idx])
+        n += len([log for log in logger.logs if log.turn == turn and log.log == LogCode.HP_CHANGED])
+    return n
+
+
+def indexed_queries(logger: EventLogger, n_turns: int) -> int:
+    """索引を使って scan_queries() と同じログを取得する。"""
+    n = 0
+    for turn in range(n_turns + 1):
+        for idx in (0, 1):
+            n += len(logger.get(turn, idx))
+        n += len(logger.get_by_code(LogCode.HP_CHANGED, turn))
+    return n
+
+
+def measure(func, logger: EventLogger, n_turns: int, n_repeats: int) -> tuple[float, int]:
+    """func を n_repeats 回実行し、1ターン分の取得あたりの所要時間（マイクロ秒）と取得件数を返す。"""
+    t0 = time.perf_counter()
+    for _ in range(n_repeats):
+        n = func(logger, n_turns)
+    elapsed = time.perf_counter() - t0
+    return elapsed / (n_repeats * (n_turns + 1)) * 1e6, n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-turns", type=int, default=100, help="対戦を進めるターン数（既定: 100）")
+    parser.add_argument("--n-repeats", type=int, default=20, help="全ターンの取得を繰り返す回数（既定: 20）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード（既定: 0）")
+    args = parser.parse_args()
+
+    battle = build_battle(args.seed, args.n_turns)
+    logger = battle.event_logger
+
+    before, n_scan = measure(scan_queries, logger, battle.turn, args.n_repeats)
+    after, n_indexed = measure(indexed_queries, logger, battle.turn, args.n_repeats)
+    assert n_scan == n_indexed
+
+    t0 = time.perf_counter()
+    for _ in range(args.n_repeats):
+        battle.get_log_lines()
+    lines_usec = (time.perf_counter() - t0) / args.n_repeats * 1e6
+
+    print(f"経過ターン数: {battle.turn} / ログ件数: {len(logger.logs)} / seed: {args.seed}")
+    print(f"全ログの走査: {before:.1f} us / ターン")
+    print(f"索引による取得: {after:.1f} us / ターン")
+    print(f"速度比: {before / after:.1f}x")
+    print(f"get_log_lines()（現在のターン）: {lines_usec:.1f} us")
+
+    # 試してみよう: --n-turns を変えて、全ログの走査はターン数に比例して遅くなり、
+    # 索引による取得はほぼ一定であることを確かめる
+
+
+if __name__ == "__main__":
+    main()
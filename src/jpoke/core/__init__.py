@@ -1,8 +1,10 @@
 from .handler import Handler, HandlerReturn
 from .lethal import StateDist, LethalHandler, LethalContext
 from .context import BaseContext, EventContext, AttackContext
-from .event_manager import EventManager
+from .damage import DamageMatrix
+from .event_manager import EventManager, EmitStats
 from .battle import Battle
+from .state_hash import StateHasher, compute_state_hash
 from .player import Player
 from .player_state import PlayerState
 from .ailment_manager import AilmentManager
@@ -121,23 +121,26 @@ class AilmentManager:
 
         # overwriteで既存の状態異常を上書きする場合は解除ログを出力
         if target.ailment.is_active:
-            self.battle.add_event_log(
-                target,
-                LogCode.AILMENT_REMOVED,
-                payload=AilmentPayload(ailment=target.ailment.name)
-            )
+            if self.battle.event_logger.records(LogCode.AILMENT_REMOVED):
+                self.battle.add_event_log(
+                    target,
+                    LogCode.AILMENT_REMOVED,
+                    payload=AilmentPayload(ailment=target.ailment.name)
+                )
 
         # 既存のハンドラを削除
         target.ailment.unregister_handlers(self._events, target)
 
         # 新しい状態異常を設定してハンドラ登録
-        self.battle.add_event_log(
-            target,
-            LogCode.AILMENT_APPLIED,
-            payload=AilmentPayload(ailment=resolved_name, source=source.name if source else None)
-        )
+        if self.battle.event_logger.records(LogCode.AILMENT_APPLIED):
+            self.battle.add_event_log(
+                target,
+                LogCode.AILMENT_APPLIED,
+                payload=AilmentPayload(ailment=resolved_name, source=source.name if source else None)
+            )
         target.ailment = Ailment(resolved_name, count=count)
         target.ailment.register_handlers(self._events, target)
+        self.battle._touch_state_hash(target)
 
         # 付与後イベントを発火（シンクロ等のリアクション用）
         self._events.emit(Event.ON_APPLY_AILMENT, apply_ctx, resolved_name)
@@ -180,13 +183,15 @@ class AilmentManager:
         if target.ailment.uncurable:
             return False
 
-        self.battle.add_event_log(
-            target,
-            LogCode.AILMENT_REMOVED,
-            payload=AilmentPayload(ailment=target.ailment.name)
-        )
+        if self.battle.event_logger.records(LogCode.AILMENT_REMOVED):
+            self.battle.add_event_log(
+                target,
+                LogCode.AILMENT_REMOVED,
+                payload=AilmentPayload(ailment=target.ailment.name)
+            )
         target.ailment.unregister_handlers(self._events, target)
         target.ailment = Ailment()
+        self.battle._touch_state_hash(target)
         return True
 
     def tick(self, target: Pokemon) -> bool:
@@ -4,7 +4,7 @@
 プレイヤー、ポケモン、技、場の状態などを一元管理し、バトルの進行を制御します。
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING, Literal, cast
+from typing import TYPE_CHECKING, Iterable, Literal, cast
 if TYPE_CHECKING:
     from .lethal import LethalHitResult
     from .context import AttackContext
@@ -17,10 +17,11 @@ from copy import deepcopy
 
 from jpoke.types import BattlePhase, Stat, StatChangeReason, GlobalFieldName, \
     HPChangeReason, AbilityDisabledReason, AbilityName, MoveName, CriticalMode, DamageRollMode, \
-    AilmentName, WeatherName, TerrainName, VolatileName, SideFieldName, ItemName, ItemDisabledReason
+    AilmentName, WeatherName, TerrainName, VolatileName, SideFieldName, ItemName, ItemDisabledReason, \
+    LethalBackend
 from jpoke.enums import Event, Command, LogCode
 from jpoke.exceptions import InvalidCommandError, InvalidPhaseError
-from jpoke.utils import fast_copy
+from jpoke.utils import fast_copy, recursive_copy
 from jpoke.utils.math import round_half_down
 
 from jpoke.model.pokemon import Pokemon
@@ -32,11 +33,11 @@ from .player_state import PlayerState
 from .event_manager import EventManager
 from .context import EventContext
 from .player import Player
-from .event_logger import EventLogger
+from .event_logger import create_event_logger
 from .log_payload import Payload
 from .replay import RecordedCommand, BattleReplayData
-from .damage import DamageCalculator
-from .field_manager import WeatherManager, TerrainManager, GlobalFieldManager, SideFieldManager
+from .damage import DamageCalculator, DamageMatrix
+from .field_manager import BaseFieldManager, WeatherManager, TerrainManager, GlobalFieldManager, SideFieldManager
 from .move_executor import MoveExecutor
 from .switch_manager import SwitchManager
 from .turn_controller import TurnController
@@ -48,7 +49,10 @@ from .ailment_manager import AilmentManager
 from .volatile_manager import VolatileManager
 from .status_manager import StatusManager
 from .query import PokemonQuery
-from . import lethal, observation_builder
+from . import lethal, observation_builder, journal
+from .journal import Checkpoint, Journal
+from .state_hash import StateHasher, compute_state_hash
+from .chance import ChanceController
 
 
 @dataclass
@@ -139,7 +143,8 @@ class Battle:
                  damage_roll: DamageRollMode = "normal",
                  accuracy_fix_threshold: int | None = None,
                  effect_chance_threshold: float | None = None,
-                 double_battle: bool = False) -> None:
+                 double_battle: bool = False,
+                 log_codes: Iterable[LogCode] | None = None) -> None:
         """Battleインスタンスを初期化する。
 
         Args:
@@ -158,6 +163,11 @@ class Battle:
             effect_chance_threshold: この値未満の追加効果確率を0%にする（Noneなら無効）
             double_battle: ダブルバトル向けのダメージ計算補正
                 （複数対象になり得る技のダメージ0.75倍・壁の軽減率2/3倍）を有効にするか（デフォルトFalse）
+            log_codes: event_logger に記録する LogCode（Noneなら全て記録する。デフォルトNone）。
+                空にすると何も記録しない（`NullEventLogger`）。ログを読まない大量の自己対戦や
+                探索では、記録しないログの EventLog・Payload を作る費用を省ける。
+                複製（`copy()`・`build_observation()`）にも引き継がれる。
+                対戦のルールではないため `BattleOption` には含めない（リプレイにも記録しない）
         """
 
         self.players: tuple[Player, ...] = players
@@ -187,6 +197,12 @@ class Battle:
         self.copy_depth: int = 0
         self._reseed_count: int = 0
         self.observer: Player | None = None
+        # checkpoint() 以降の巻き戻し用の操作記録（未使用ならNone）
+        self.journal: Journal | None = None
+        # enable_state_hash() 以降の局面ハッシュの差分更新（未使用ならNone）
+        self.state_hasher: StateHasher | None = None
+        # 確率分岐の結果を乱数の代わりに決める制御（`jpoke.core.chance` 参照。未使用ならNone）
+        self.chance_controller: ChanceController | None = None
 
         # 瀕死交代・緊急交代（ききかいひ・だっしゅつパック）など、そのターンの
         # Event.ON_TURN_END が既に発火した後に発生する交代処理の間だけTrueにする
@@ -217,7 +233,7 @@ class Battle:
         self.command_log: list[RecordedCommand] = []
 
         self.events = EventManager(self)
-        self.event_logger = EventLogger()
+        self.event_logger = create_event_logger(log_codes)
         self.turn_controller: TurnController = TurnController(self)
         self.speed_calculator: SpeedCalculator = SpeedCalculator(self)
         self.switch_manager: SwitchManager = SwitchManager(self)
@@ -288,12 +304,70 @@ class Battle:
         Returns:
             Battle: コピーされたBattleインスタンス
         """
+        new = self._deepcopy(copy_logs=True)
+        memo[id(self)] = new
+        return new
+
+    def _deepcopy(self, copy_logs: bool) -> Battle:
+        """deepcopy による複製を作成する（`copy()` / `__deepcopy__` の実体）。
+
+        copy_logs=False の場合、event_logger/command_log は複製せず、複製先に空の
+        新規ログを持たせる。複製元の属性には一切書き込まないため、同じ複製元を
+        複数のスレッドから同時に複製してよい。
+        """
         cls = self.__class__
         new = cls.__new__(cls)
-        memo[id(self)] = new
+        if copy_logs:
+            fast_copy(self, new, keys_to_deepcopy=self._deepcopy_keys())
+        else:
+            fast_copy(self, new, keys_to_deepcopy=self._deepcopy_keys(),
+                      keys_to_skip=("event_logger", "command_log"))
+            new.event_logger = self.event_logger.empty_copy()
+            new.command_log = []
+        self._finalize_copy(new)
+        return new
 
-        fast_copy(self, new, keys_to_deepcopy=self._deepcopy_keys())
+    def _copy_on_write(self, reseed: bool, copy_logs: bool) -> Battle:
+        """構造共有（コピーオンライト）による複製を作成する（`copy(copy_on_write=True)` の実体）。
 
+        `copy_on_write()` を持つ属性（EventManager・場の状態のマネージャー）は
+        ハンドラリスト・Field を複製元と共有し、書き換えが必要になった時点で
+        初めて複製する。乱数生成器は内部状態のタプルだけを受け渡して複製する
+        （reseed=True の場合は直後に作り直すため複製しない）。
+        ポケモン・PlayerState は技・特性・持ち物などのハンドラから属性が直接
+        書き換えられ、書き換えを1か所で捕捉できないため、従来通り先行して複製する。
+        """
+        cls = self.__class__
+        new = cls.__new__(cls)
+        deepcopy_keys = self._deepcopy_keys()
+        for key, val in vars(self).items():
+            if key == "event_logger":
+                new.event_logger = val.copy_on_write() if copy_logs else val.empty_copy()
+            elif key == "command_log":
+                # RecordedCommand は不変なのでリストの浅いコピーで足りる
+                new.command_log = list(val) if copy_logs else []
+            elif hasattr(val, "copy_on_write"):
+                setattr(new, key, val.copy_on_write())
+            elif (
+                isinstance(val, list)
+                and val
+                and all(hasattr(item, "copy_on_write") for item in val)
+            ):
+                setattr(new, key, [item.copy_on_write() for item in val])
+            elif key in ("random", "decision_random"):
+                if not reseed:
+                    rng = Random()
+                    rng.setstate(val.getstate())
+                    setattr(new, key, rng)
+            elif key in deepcopy_keys:
+                setattr(new, key, deepcopy(val))
+            else:
+                setattr(new, key, recursive_copy(val))
+        self._finalize_copy(new)
+        return new
+
+    def _finalize_copy(self, new: Battle) -> None:
+        """複製直後の Battle に対し、複製元を指したままの参照を付け替える。"""
         # player_states のキャッシュを複製後の PlayerState で再構築する
         new._player_states_map = dict(zip(new.players, new._player_states))
 
@@ -312,6 +386,14 @@ class Battle:
         # 複製したBattleインスタンスへの参照を各マネージャークラスに更新
         new._update_reference()
 
+        # 巻き戻し地点と確率分岐の制御は複製元の Battle にのみ有効
+        new.journal = None
+        new.chance_controller = None
+
+        # 局面ハッシュの部分ハッシュは複製先で独立に更新する
+        if self.state_hasher is not None:
+            new.state_hasher = self.state_hasher.copy()
+
         # 深さを更新
         new.copy_depth += 1
 
@@ -324,8 +406,6 @@ class Battle:
         # 実際に自身の `_run_end_phase()` を通過するときに改めて正しく設定させる。
         new.late_field_activation = False
 
-        return new
-
     def _update_reference(self):
         """ディープコピー後のBattleインスタンスへの参照を各マネージャークラスに更新する。
 
@@ -344,7 +424,8 @@ class Battle:
     def copy(self,
              reseed: bool = False,
              copy_logs: bool = True,
-             omniscient: bool = False) -> Battle:
+             omniscient: bool = False,
+             copy_on_write: bool = False) -> Battle:
         """Battleの複製を作成する。
 
         Args:
@@ -369,36 +450,133 @@ class Battle:
                 木探索の内部シミュレーションは全知（相手の合法手もライブ計算）を
                 前提とするため、既定はFalseで呼び出し元が明示したときだけ
                 `observer` を外す。
+            copy_on_write: Trueの場合、deepcopyの代わりに構造共有による複製を作る。
+                イベントハンドラのリストと場の状態（天候・地形・グローバル/サイド
+                フィールドの各 Field）は複製元と共有し、どちらかの側で最初に
+                触れた時点で複製する。ログも不変な EventLog のリストを浅くコピー
+                するだけで済む。ポケモン・PlayerState は従来通り複製する。
+                同じ盤面から多数の枝を作る木探索（`MinimaxPlayer`）向けで、
+                複製元・複製先とも以後は通常通り読み書きしてよい。ただし
+                複製前に取得した Field を複製後に書き換えてはならない
+                （`battle.weather` 等は複製後に取得し直すこと）。既定はFalse。
 
-        Warning:
-            copy_logs=Falseの場合、deepcopy実行中に複製元のevent_logger/command_logを
-            一時的に空へ差し替える（完了後は直ちに元へ復元する）。この間に別スレッドが
-            同じ複製元Battleのevent_logger/command_logへ読み書きすると競合しうる。
-            build_observation()と同様、このコードベースはスレッドセーフを前提として
-            いない。並列化する場合はProcessPoolExecutor等のプロセス並列を使うこと。
+        Note:
+            複製元の属性を一時的に差し替えることはない（copy_logs=False でも複製元の
+            ログはそのまま）。copy_on_write=True で複製元の場の状態に付ける共有中の
+            印も、何度付けても同じ値になる。そのため、対戦を進めているスレッドが
+            ない限り、同じ複製元を複数のスレッドから同時に複製してよい。
         """
-        if copy_logs:
-            new = deepcopy(self)
+        if copy_on_write:
+            new = self._copy_on_write(reseed=reseed, copy_logs=copy_logs)
         else:
-            # 複製元のログを一時的に空へ差し替えてからdeepcopyすることで、
-            # 複製先には独立した空の新規ログを持たせつつ、対戦開始からの
-            # 全履歴コピーのコストを避ける。deepcopy完了後は直ちに複製元の
-            # ログを復元するため、複製元のログは変更されない。
-            saved_event_logger, saved_command_log = self.event_logger, self.command_log
-            self.event_logger, self.command_log = EventLogger(), []
-            try:
-                new = deepcopy(self)
-            finally:
-                self.event_logger, self.command_log = saved_event_logger, saved_command_log
+            new = self._deepcopy(copy_logs=copy_logs)
         if reseed:
-            self._reseed_count += 1
-            new.seed = hash((self.seed, self._reseed_count)) & 0xFFFFFFFF
-            new.random = Random(new.seed)
-            new.decision_random = Random((new.seed + 0x9E3779B9) & 0xFFFFFFFF)
+            new.reseed_from(self)
         if omniscient:
             new.observer = None
         return new
 
+    def reseed_from(self, parent: Battle) -> None:
+        """parent から派生させたシードで乱数生成器を初期化し直す。
+
+        `parent.copy(reseed=True)` と同じ派生規則を使う。`checkpoint()` /
+        `rollback()` で1つのシミュレーション用 Battle を使い回す木探索が、
+        分岐ごとに `copy(reseed=True)` した場合と同じ乱数系列を得るために使う。
+
+        Args:
+            parent: 派生元の Battle（派生回数が1増える）
+        """
+        self._reseed_count = parent._reseed_count
+        parent._reseed_count += 1
+        self.seed = hash((parent.seed, parent._reseed_count)) & 0xFFFFFFFF
+        self.random = Random(self.seed)
+        self.decision_random = Random((self.seed + 0x9E3779B9) & 0xFFFFFFFF)
+
+    def checkpoint(self) -> Checkpoint:
+        """現在の盤面を巻き戻し地点として記録する。
+
+        以後の `step()` 等による変更は `rollback()` で取り消せる。木探索で1つの
+        シミュレーション用 Battle を使い回し、分岐ごとに `sim.step()` →評価→
+        `sim.rollback(checkpoint)` を繰り返すと、分岐ごとの `copy()` が不要になる。
+
+        イベントハンドラの登録・解除と場の状態は変更のたびに逆操作を記録し、
+        ポケモン・PlayerState 等の属性は巻き戻し地点で浅く記録する
+        （詳細は `jpoke.core.journal` を参照）。
+
+        Returns:
+            Checkpoint: `rollback()` に渡す巻き戻し地点
+        """
+        return journal.checkpoint(self)
+
+    def rollback(self, checkpoint: Checkpoint) -> None:
+        """`checkpoint()` で記録した巻き戻し地点の状態へ戻す。
+
+        同じ巻き戻し地点へは何度でも戻せる。入れ子にした巻き戻し地点は
+        作成と逆の順序で使うこと（外側へ巻き戻すと内側の巻き戻し地点は無効になる）。
+
+        Args:
+            checkpoint: この Battle の `checkpoint()` が返した巻き戻し地点
+
+        Raises:
+            ValueError: 別の Battle の巻き戻し地点、または既に無効になった巻き戻し地点を渡した場合
+        """
+        journal.rollback(self, checkpoint)
+
+    def clear_checkpoints(self) -> None:
+        """巻き戻し用の操作記録を破棄し、記録を停止する。
+
+        以前に作成した巻き戻し地点はすべて無効になる。
+        """
+        self.journal = None
+
+    def enable_state_hash(self, check: bool = False) -> int:
+        """局面ハッシュの差分更新を開始する。
+
+        以後は HP・ランク・状態異常・揮発性状態・持ち物の変更と交代のたびに、
+        変更のあったポケモンの部分ハッシュだけを更新する（詳細は
+        `jpoke.core.state_hash` を参照）。巻き戻しでも引き継がれ、`copy()` の複製先は
+        複製した差分更新の状態を独立して持つ。
+
+        Args:
+            check: True の場合、`state_hash()` のたびに局面全体から計算し直した値と
+                照合し、一致しなければ RuntimeError を送出する（テスト用）
+
+        Returns:
+            int: 現在の局面のハッシュ値
+        """
+        self.state_hasher = StateHasher(self, check=check)
+        return self.state_hasher.current(self)
+
+    def disable_state_hash(self) -> None:
+        """局面ハッシュの差分更新を停止する。"""
+        self.state_hasher = None
+
+    def state_hash(self) -> int:
+        """現在の局面を表す64bitのハッシュ値（Zobrist ハッシュ）を返す。
+
+        両プレイヤーのチームの各ポケモン（HP・状態異常・ランク補正・揮発性状態・
+        持ち物・特性・PP）、場のポケモンと選出、天候・地形・場の状態のターン数、
+        ターン数とフェーズから計算する。異なる手順で同じ局面に到達した場合も同じ値に
+        なるため、木探索の置換表・局面の重複排除のキーに使える。
+        `enable_state_hash()` の後は差分更新した値を、それ以前は局面全体から
+        計算した値を返す（どちらも同じ値になる）。
+
+        Returns:
+            int: 64bit のハッシュ値
+        """
+        if self.state_hasher is None:
+            return compute_state_hash(self)
+        return self.state_hasher.current(self)
+
+    def _touch_state_hash(self, mon: Pokemon) -> None:
+        """ポケモンの状態の変更を局面ハッシュに反映する（差分更新の停止中は何もしない）。"""
+        if self.state_hasher is not None:
+            self.state_hasher.update_pokemon(self, mon)
+
+    def _field_managers(self) -> list[BaseFieldManager]:
+        """場の状態を管理するマネージャーの一覧を返す。"""
+        return [self.weather_manager, self.terrain_manager, self.global_manager, *self.side_managers]
+
     @contextmanager
     def phase_context(self, phase: BattlePhase):
         old_phase = self.phase
@@ -436,24 +614,20 @@ class Battle:
         Args:
             observer: 観測対象のプレイヤー。Noneの場合は全ての情報をコピー。
             copy_logs: Falseの場合、event_logger/command_log（対戦開始からの
-                全履歴）をdeepcopyせず、複製先に空の新規ログを持たせる
-                （複製元のログは変更されない）。全履歴のdeepcopyはターン数に
-                比例してコストが増えるため、ログを参照しない用途で使うと
-                コピー負荷を削減できる。既定はTrueで、従来通り履歴を
-                引き継いだ複製を作る（Battle.copy()のdocstring参照）。
+                全履歴）を引き継がず、複製先に空の新規ログを持たせる
+                （複製元のログは変更されない）。既定はTrueで、従来通り履歴を
+                引き継いだ複製を作る（観測は構造共有で複製するため、履歴は
+                複製元と共有され、ターン数に比例したコピーは発生しない）。
                 choose_command()/choose_selection() の実装がログを参照する
                 可能性がある汎用の呼び出し経路では既定のTrueのまま使うこと。
 
         Returns:
             Battle インスタンスのコピー
 
-        Warning:
-            内部実装（observation_builder.build()）がモジュールグローバルな
-            辞書を呼び出しのたびに再代入・書き込み・読み出しするため、
-            スレッドセーフではない。自己対戦データ収集などで並列化する場合は
-            ProcessPoolExecutor 等のプロセス並列を使うこと。
-            ThreadPoolExecutor 等で複数スレッドから同時に build_observation()
-            を呼び出すと、内部状態が競合して壊れる可能性がある。
+        Note:
+            観測の構築は呼び出しごとに局所的な状態だけを使い、複製元の属性を
+            一時的に差し替えることもないため、対戦ごとに別のスレッドで呼び出してよい
+            （observation_builder.build() 参照）。
         """
         if self.is_observation():
             return self.copy(copy_logs=copy_logs)
@@ -473,7 +647,10 @@ class Battle:
                         | list[MoveName | Move | tuple[MoveName | Move, int]],
                     critical: bool = False,
                     move_secondary: bool = False,
-                    max_attack: int = 10) -> list[LethalHitResult]:
+                    max_attack: int = 10,
+                    backend: LethalBackend = "dict",
+                    prune_threshold: float = 0.0,
+                    max_states: int | None = None) -> list[LethalHitResult]:
         """指定した技（列）を最大 max_attack 回撃ち込んだ場合の致死率を計算する（LethalCalculatorへの委譲）。
 
         `moves` には技名の文字列（`MoveName`）・`Move` インスタンス・
@@ -482,12 +659,26 @@ class Battle:
         その順番通りに1回ずつ使用する（例: `["でんこうせっか", "かみなり"]` は
         1発目にでんこうせっか、2発目にかみなりを撃つ）。
 
+        計算は構造共有による複製（`copy(copy_on_write=True)`）の上で行うため、
+        呼び出し前に取得した Field は呼び出し後に `battle.weather` 等で取得し直すこと。
+
         Args:
             attacker: 攻撃側のポケモン
             moves: 使用する技。単体 / (技, ヒット数) / それらのリスト
             critical: 急所として計算するか
             move_secondary: 追加効果ハンドラ（火傷・怯みなど）を適用するか
             max_attack: 最大攻撃回数（確定数が出た時点で打ち切り）
+            backend: HP分布の演算の実装。"dict"（既定）は State の組ごとに集計し、
+                "array" は状態タグごとの整数配列で畳み込む（HP値の種類が多い多段技・
+                複数ターンの計算で速い）。どちらでも結果は同じ
+            prune_threshold: 近似計算の閾値。ヒットごと・ターン終了ごとに、確率が
+                この値未満のHP分布の枝（HP=0 を除く）を、HP 以外の状態が同じで
+                HP が最も近い枝に合算する（既定の 0.0 は厳密な計算）
+            max_states: 近似計算で残すHP分布の状態数の上限（HP=0 の状態を含む）。
+                HP=0 の状態は1つにまとめ、他は確率の高い順に残して残りを同様に合算する
+                （既定の None は上限なし）。HP=0 以外の合算先がない枝は切り捨てる。
+                合算・切り捨てた確率の合計は各結果の `error_bound` に入り、
+                `lethal_probability` の誤差はその値以下になる
 
         Returns:
             list[LethalHitResult]: 各ヒット後の致死率計算結果のリスト。
@@ -499,7 +690,8 @@ class Battle:
         """
         return lethal.calc_lethal(
             self, attacker, moves, critical=critical,
-            move_secondary=move_secondary, max_attack=max_attack
+            move_secondary=move_secondary, max_attack=max_attack, backend=backend,
+            prune_threshold=prune_threshold, max_states=max_states,
         )
 
     @property
@@ -1365,6 +1557,8 @@ class Battle:
                 return max(damages)
             case "min":
                 return min(damages)
+            case _ if self.chance_controller is not None:
+                return damages[self.chance_controller.choose_roll(len(damages))]
             case _:
                 # random.choice() は getrandbits() 経由でPRNG内部状態に依存するため、
                 # random() のみを固定するテストヘルパー（fix_random）では制御できない。
@@ -1399,6 +1593,41 @@ class Battle:
             attacker, defender, move, critical=critical
         )
 
+    def calc_damage_matrix(self,
+                           attacker_team: list[Pokemon],
+                           defender_team: list[Pokemon],
+                           moves: list[Move | MoveName] | None = None,
+                           critical: bool = False) -> DamageMatrix:
+        """攻撃側の全ての技と防御側の全ての組み合わせのダメージ乱数列をまとめて計算する。
+
+        控えのポケモンを防御側に含めれば、相手の交代先ごとのダメージを一度に求められる。
+        控えの防御側は、そのポケモンが場に出た盤面（`SwitchManager.assume_switched_in()`）で
+        計算するため、特性・アイテムの補正が交代後と同じように反映される
+        （交代時の効果は発動しない）。計算後の盤面は呼び出し前と同じで、場に出ている
+        防御側の組み合わせは `calc_damages()` と同じ結果になる。
+
+        Args:
+            attacker_team: 攻撃側のポケモンのリスト（`calc_damages()` と同様に、
+                場に出ているポケモンであること）
+            defender_team: 防御側のポケモンのリスト
+            moves: 攻撃側が使う技（MoveオブジェクトまたはID文字列）。
+                省略した場合は攻撃側それぞれが覚えている技を使う
+            critical: 急所に当たるかどうか
+
+        Returns:
+            DamageMatrix: 行が (攻撃側, 技)、列が防御側のダメージ乱数列の表。
+                行は attacker_team の順に、各攻撃側の技の順で並ぶ
+        """
+        move_list = None if moves is None else [
+            Move(move) if isinstance(move, str) else move for move in moves
+        ]
+        rows = [
+            (attacker, move)
+            for attacker in attacker_team
+            for move in (attacker.moves if move_list is None else move_list)
+        ]
+        return self.damage_calculator.calc_damage_matrix(rows, defender_team, critical=critical)
+
     def has_interrupt(self) -> bool:
         """割り込みフラグが設定されているか確認。
 
@@ -1567,6 +1796,22 @@ class Battle:
         """
         return self.item_manager.consume_item(target, track_loss=track_loss)
 
+    def roll_chance(self, probability: float) -> bool:
+        """確率 probability で起きる事象（追加効果の発動等）の判定を行う。
+
+        `chance_controller` が設定されている場合は乱数を引かずに制御側が結果を決める
+        （`jpoke.core.chance` 参照）。
+
+        Args:
+            probability: 事象が起きる確率
+
+        Returns:
+            bool: 事象が起きる場合True
+        """
+        if self.chance_controller is not None:
+            return self.chance_controller.check(probability)
+        return self.random.random() < probability
+
     def resolve_secondary_chance(
         self,
         ctx: EventContext | AttackContext,
@@ -1619,14 +1864,12 @@ class Battle:
             list[str]: 整形済みログ行のリスト
         """
         if turn == "all":
-            target_turns = None
+            logs = self.event_logger.logs
         else:
-            target_turns = self.turn if turn is None else turn
+            logs = self.event_logger.get_turn(self.turn if turn is None else turn)
 
         lines = []
-        for log in self.event_logger.logs:
-            if target_turns is not None and log.turn != target_turns:
-                continue
+        for log in logs:
             player = self.players[log.idx]
             lines.append(f"Turn {log.turn} : {player.username} : {log.pokemon or ''} : {log.render()}")
         return lines
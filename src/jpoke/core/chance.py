@@ -0,0 +1,156 @@
+"""確率分岐（命中・急所・ダメージ乱数・追加効果）の列挙。
+
+通常の `Battle.step()` はこれらの確率的な事象を乱数で1通りに決めるため、木探索で
+1回の `step()` を1つの分岐として評価すると、たまたま引いた乱数（急所・外れ等）が
+その分岐の評価値を左右してしまう。`expand_chance_outcomes()` は同じ盤面・同じ
+コマンドの `step()` を、事象の結果を指定しながら繰り返し実行し、起こりうる結果ごとの
+盤面とその確率を返す（期待値による評価＝エクスペクティマックス用）。
+
+確率分岐として扱う事象は次のとおりで、いずれも `Battle.chance_controller` が
+設定されている間だけ乱数の代わりに `ChanceController` が結果を決める。
+
+- 命中判定（`MoveExecutor._check_hit`）
+- 急所判定（`MoveExecutor._check_critical`）
+- ダメージ乱数（`Battle.roll_damage`）。16段階の乱数を `damage_buckets` 個の
+  連続した区間にまとめ、各区間の中央の乱数で代表させる
+- 追加効果の発動判定（`Battle.resolve_secondary_chance` で求めた確率を
+  `Battle.roll_chance` で判定する箇所）
+
+連続技の回数・こんらんの自傷など、それ以外の乱数は従来通り乱数生成器で決める。
+同じ盤面の複製は乱数生成器の内部状態も同じため、結果を指定した事象以外は
+どの実行でも同じ乱数を引く。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Iterator
+if TYPE_CHECKING:
+    from jpoke.core import Battle, Player
+    from jpoke.enums import Command
+
+import heapq
+
+
+class ChanceController:
+    """`Battle.step()` 中の確率的な事象の結果を決め、起きた事象を記録する。
+
+    事象は発生順に番号付けし、`script[i]` が指定されていれば i 番目の事象の結果を
+    それに従わせ、指定がなければ最も確率の高い結果を選ぶ（同確率なら中央寄りの結果）。
+
+    Attributes:
+        script: 事象ごとに指定する結果のインデックス（先頭から順に使う）
+        damage_buckets: ダメージ乱数をまとめる区間の数
+        trace: 発生した事象ごとの (選んだ結果のインデックス, 各結果の確率)
+    """
+
+    def __init__(self, script: list[int] | None = None, damage_buckets: int = 4):
+        self.script: list[int] = script or []
+        self.damage_buckets: int = damage_buckets
+        self.trace: list[tuple[int, tuple[float, ...]]] = []
+
+    def check(self, probability: float) -> bool:
+        """確率 probability で起きる事象の結果を返す（0以下・1以上なら事象として記録しない）。
+
+        Args:
+            probability: 事象が起きる確率
+
+        Returns:
+            事象が起きる場合True
+        """
+        if probability >= 1:
+            return True
+        if probability <= 0:
+            return False
+        return self._decide((probability, 1 - probability)) == 0
+
+    def choose_roll(self, n_rolls: int) -> int:
+        """n_rolls 段階のダメージ乱数のうち、使う乱数のインデックスを返す。
+
+        乱数を `damage_buckets` 個の連続した区間に分け、選んだ区間の中央の
+        インデックスを返す。区間の確率は区間に含まれる乱数の数に比例する。
+
+        Args:
+            n_rolls: ダメージ乱数の段階数
+
+        Returns:
+            使う乱数のインデックス（0始まり）
+        """
+        n_buckets = max(1, min(self.damage_buckets, n_rolls))
+        bounds = [n_rolls * k // n_buckets for k in range(n_buckets + 1)]
+        if n_buckets == 1:
+            bucket = 0
+        else:
+            bucket = self._decide(tuple(
+                (bounds[k + 1] - bounds[k]) / n_rolls for k in range(n_buckets)
+            ))
+        return (bounds[bucket] + bounds[bucket + 1] - 1) // 2
+
+    def _decide(self, probabilities: tuple[float, ...]) -> int:
+        """次の事象の結果のインデックスを決めて記録する。"""
+        i = len(self.trace)
+        if i < len(self.script):
+            choice = self.script[i]
+        else:
+            center = (len(probabilities) - 1) / 2
+            choice = max(range(len(probabilities)),
+                         key=lambda k: (probabilities[k], -abs(k - center)))
+        self.trace.append((choice, probabilities))
+        return choice
+
+
+def expand_chance_outcomes(base: Battle,
+                           commands: dict[Player, Command],
+                           *,
+                           damage_buckets: int = 4,
+                           min_probability: float = 0.0,
+                           max_outcomes: int | None = None,
+                           prepare: Callable[[Battle], None] | None = None,
+                           ) -> Iterator[tuple[float, Battle]]:
+    """base の複製で `step(commands)` を実行し、確率分岐の結果ごとの盤面と確率を列挙する。
+
+    最初は全ての事象で最も確率の高い結果を選んで実行し、記録された各事象の他の結果を
+    指定した実行を、そこまでの確率の高い順に追加していく。確率が min_probability
+    未満になる結果は展開しない。列挙した確率の合計は、展開しなかった結果の分だけ
+    1を下回るため、期待値を求める場合は確率の合計で割って正規化すること。
+
+    base は変更しない（各結果は base を乱数の状態ごと複製して実行する）。
+
+    Args:
+        base: 分岐元の盤面
+        commands: `Battle.step()` に渡すコマンド
+        damage_buckets: ダメージ乱数をまとめる区間の数
+        min_probability: 展開する結果の確率の下限
+        max_outcomes: 列挙する結果の数の上限（None なら無制限）
+        prepare: 各複製の `step()` 実行前に呼ぶ関数（探索用オプションの設定等）
+
+    Yields:
+        (結果の確率, step() 実行後の盤面)
+    """
+    # (-確率, 追加順, 結果を指定する事象の並び)
+    queue: list[tuple[float, int, list[int]]] = [(-1.0, 0, [])]
+    n_pushed = 1
+    n_outcomes = 0
+    while queue and (max_outcomes is None or n_outcomes < max_outcomes):
+        _, _, script = heapq.heappop(queue)
+        sim = base.copy(copy_logs=False, copy_on_write=True)
+        if prepare is not None:
+            prepare(sim)
+        controller = ChanceController(script, damage_buckets)
+        sim.chance_controller = controller
+        try:
+            sim.step(commands)
+        finally:
+            sim.chance_controller = None
+
+        probability = 1.0
+        choices: list[int] = []
+        for i, (choice, probabilities) in enumerate(controller.trace):
+            if i >= len(script):
+                for alternative, p in enumerate(probabilities):
+                    if alternative != choice and probability * p >= min_probability:
+                        heapq.heappush(
+                            queue, (-probability * p, n_pushed, choices + [alternative]),
+                        )
+                        n_pushed += 1
+            choices.append(choice)
+            probability *= probabilities[choice]
+        n_outcomes += 1
+        yield probability, sim
@@ -9,6 +9,11 @@ if TYPE_CHECKING:
     from jpoke.core import Battle, EventManager
     from jpoke.model import Pokemon, Move
 
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+
 from jpoke.enums import Event
 from jpoke.types import Stat
 from jpoke.utils import fast_copy
@@ -17,6 +22,101 @@ from jpoke.utils.math import round_half_down
 
 from .context import AttackContext
 
+# calc_damages() が計算後に設定するモニタリング用属性（スコープ内キャッシュで復元する）
+_MONITOR_ATTRIBUTES = (
+    "final_power", "final_attack", "final_defense",
+    "power_modifier", "atk_modifier", "def_modifier",
+    "atk_type_modifier", "def_type_modifier",
+    "damage_modifier", "burn_modifier", "protect_modifier",
+)
+
+
+@lru_cache(maxsize=65536)
+def _calc_damage_rolls(max_damage: int,
+                       atk_type_modifier: int,
+                       def_type_modifier: int,
+                       burn_modifier: int,
+                       damage_modifier: int,
+                       protect_modifier: int) -> tuple[int, ...]:
+    """最大乱数ダメージと乱数適用後の各補正値から、16段階の乱数ダメージを計算する。
+
+    純粋な関数のため、同じ引数の組はメモ化した結果を返す
+    （五捨五超入の計算が重く、同じ盤面の再計算で結果が一致するため）。
+
+    Args:
+        max_damage: 急所補正まで適用した最大乱数ダメージ
+        atk_type_modifier: タイプ一致補正（4096基準）
+        def_type_modifier: タイプ相性補正（4096基準）
+        burn_modifier: やけど補正（4096基準）
+        damage_modifier: ダメージ補正（4096基準）
+        protect_modifier: まもる貫通系補正（4096基準）
+
+    Returns:
+        tuple[int, ...]: 乱数 85~100% に対応する16個のダメージ
+    """
+    r_atk_type = atk_type_modifier / 4096
+    r_def_type = def_type_modifier / 4096
+    r_burn = burn_modifier / 4096
+    r_damage = damage_modifier / 4096
+    r_protect = protect_modifier / 4096
+    guaranteed = r_def_type * r_damage > 0
+
+    damages = []
+    for i in range(16):
+        # 乱数 85~100%
+        damage = int(max_damage * (0.85+0.01*i))
+
+        # タイプ補正
+        damage = round_half_down(damage * r_atk_type)
+        damage = round_half_down(damage * r_def_type)
+
+        # やけど補正
+        damage = round_half_down(damage * r_burn)
+
+        # ダメージ補正
+        damage = round_half_down(damage * r_damage)
+
+        # まもる貫通系補正
+        damage = round_half_down(damage * r_protect)
+
+        # 最低ダメージ補償
+        if guaranteed:
+            damage = max(1, damage)
+
+        damages.append(damage)
+    return tuple(damages)
+
+
+@dataclass(frozen=True)
+class DamageMatrix:
+    """`Battle.calc_damage_matrix()` が返す、(攻撃側, 技) × 防御側 のダメージ乱数列の表。
+
+    乱数列は1つの整数配列に行優先でまとめて保持する。行 i・列 j の乱数列は
+    `rolls[(i * len(defenders) + j) * 16:][:16]` で、`damages(i, j)` で取り出せる。
+    威力のない技（変化技等）の乱数列はすべて0になる。
+
+    Attributes:
+        rows: 各行の (攻撃側のポケモン, 技)
+        defenders: 各列の防御側のポケモン
+        rolls: 16段階乱数に対応するダメージを並べた配列
+    """
+    rows: tuple[tuple[Pokemon, Move], ...]
+    defenders: tuple[Pokemon, ...]
+    rolls: array
+
+    def damages(self, row: int, col: int) -> list[int]:
+        """行 row・列 col の16段階乱数に対応するダメージを返す。"""
+        start = (row * len(self.defenders) + col) * 16
+        return self.rolls[start:start + 16].tolist()
+
+    def min_damage(self, row: int, col: int) -> int:
+        """行 row・列 col の最低ダメージ（乱数下振れ）を返す。"""
+        return self.rolls[(row * len(self.defenders) + col) * 16]
+
+    def max_damage(self, row: int, col: int) -> int:
+        """行 row・列 col の最大ダメージ（乱数上振れ）を返す。"""
+        return self.rolls[(row * len(self.defenders) + col) * 16 + 15]
+
 
 class DamageCalculator:
     """ダメージ計算を行うクラス。"""
@@ -24,6 +124,10 @@ class DamageCalculator:
     def __init__(self, battle: Battle):
         self.battle: Battle = battle
 
+        # cache_scope() の区間中のみ有効な、補正イベントの計算結果のキャッシュ
+        # （キーにオブジェクト自体を持ち、区間中に id が再利用されないようにする）
+        self._scope_cache: dict[tuple[Pokemon, Pokemon, Move, bool], tuple] | None = None
+
         # ダメージ計算の結果を保存するための属性（テスト・デバッグ用）
         self.final_power: int | None = None
         self.final_attack: int | None = None
@@ -56,6 +160,7 @@ class DamageCalculator:
         new = cls.__new__(cls)
         memo[id(self)] = new
         fast_copy(self, new, keys_to_deepcopy=[])
+        new._scope_cache = None
         return new
 
     def update_reference(self, new_battle: Battle):
@@ -70,6 +175,23 @@ class DamageCalculator:
     def _events(self) -> EventManager:
         return self.battle.events
 
+    @contextmanager
+    def cache_scope(self):
+        """区間中の calc_damages() の結果を (攻撃側, 防御側, 技, 急所) ごとにキャッシュする。
+
+        補正イベントのハンドラは盤面の任意の状態を参照するため、キャッシュの有効性は
+        盤面から判定できない。区間中は盤面を変更しないこと（同じ盤面で技・相手の組を
+        総当たりで評価する用途向け）。入れ子にした場合は外側の区間のキャッシュを使う。
+        """
+        if self._scope_cache is not None:
+            yield
+            return
+        self._scope_cache = {}
+        try:
+            yield
+        finally:
+            self._scope_cache = None
+
     def calc_damages(self,
                      attacker: Pokemon,
                      defender: Pokemon,
@@ -86,6 +208,64 @@ class DamageCalculator:
         Returns:
             list[int]: 16段階乱数に対応するダメージリスト
         """
+        cache = self._scope_cache
+        if cache is not None:
+            key = (attacker, defender, move, critical)
+            cached = cache.get(key)
+            if cached is not None:
+                damages, monitor = cached
+                for name, value in zip(_MONITOR_ATTRIBUTES, monitor):
+                    setattr(self, name, value)
+                return list(damages)
+            damages = self._calc_damages(attacker, defender, move, critical)
+            cache[key] = (
+                tuple(damages),
+                tuple(getattr(self, name) for name in _MONITOR_ATTRIBUTES),
+            )
+            return damages
+        return self._calc_damages(attacker, defender, move, critical)
+
+    def calc_damage_matrix(self,
+                           rows: list[tuple[Pokemon, Move]],
+                           defenders: list[Pokemon],
+                           critical: bool = False) -> DamageMatrix:
+        """(攻撃側, 技) の組と防御側の全組み合わせのダメージ乱数列を計算する。
+
+        補正イベントのハンドラは防御側を参照し得るため、補正は組み合わせごとに
+        計算する。ただし全体を `cache_scope()` の区間で計算するため、同じ組み合わせは
+        1度だけ計算し、同じ補正値の組の乱数列はメモ化した結果を共有する。
+        控えの防御側の列は、`SwitchManager.assume_switched_in()` でその防御側が
+        場に出た盤面にして計算する（特性・アイテムの補正が反映される）。
+
+        Args:
+            rows: 行とする (攻撃側, 技) の組のリスト
+            defenders: 列とする防御側のリスト
+            critical: 急所に当たるかどうか
+
+        Returns:
+            DamageMatrix: ダメージ乱数列の表
+        """
+        n_defenders = len(defenders)
+        rolls = array("l", bytes(array("l").itemsize * 16 * len(rows) * n_defenders))
+        switch_manager = self.battle.switch_manager
+        with self.cache_scope():
+            for j, defender in enumerate(defenders):
+                with switch_manager.assume_switched_in(defender):
+                    for i, (attacker, move) in enumerate(rows):
+                        damages = self.calc_damages(attacker, defender, move, critical=critical)
+                        if len(damages) != 16:
+                            # 威力のない技は [0] を返す
+                            continue
+                        start = (i * n_defenders + j) * 16
+                        rolls[start:start + 16] = array("l", damages)
+        return DamageMatrix(rows=tuple(rows), defenders=tuple(defenders), rolls=rolls)
+
+    def _calc_damages(self,
+                      attacker: Pokemon,
+                      defender: Pokemon,
+                      move: Move,
+                      critical: bool) -> list[int]:
+        """calc_damages() の本体（補正イベントを発火して計算する）。"""
         self.reset_monitor_attributes()
 
         if not move.base_power:
@@ -117,51 +297,31 @@ class DamageCalculator:
         if ctx.critical:
             max_damage = round_half_down(max_damage * 1.5)
 
-        # -- ここで乱数が適用される(計算はループ内で実行) --
+        # -- ここで乱数が適用される(計算は _calc_damage_rolls() で実行) --
 
         # タイプ一致補正
         self.atk_type_modifier = self._calc_atk_type_modifier(ctx)
-        r_atk_type = self.atk_type_modifier / 4096
 
         # タイプ相性補正
         self.def_type_modifier = self.calc_def_type_modifier(ctx)
-        r_def_type = self.def_type_modifier / 4096
 
         # やけど補正（タイプ相性の後、ダメージ補正の前）
         self.burn_modifier = self._events.emit(Event.ON_CALC_BURN_MODIFIER, ctx, 4096)
-        r_burn = self.burn_modifier / 4096
 
         # ダメージ補正
         self.damage_modifier = self._events.emit(Event.ON_CALC_DAMAGE_MODIFIER, ctx, 4096)
-        r_damage = self.damage_modifier / 4096
 
         # まもる貫通系補正（Z技、ダイマックス技等）
         self.protect_modifier = self._events.emit(Event.ON_CALC_PROTECT_MODIFIER, ctx, 4096)
-        r_protect = self.protect_modifier / 4096
-
-        damages = [0]*16
-        for i in range(16):
-            # 乱数 85~100%
-            damages[i] = int(max_damage * (0.85+0.01*i))
-
-            # タイプ補正
-            damages[i] = round_half_down(damages[i] * r_atk_type)
-            damages[i] = round_half_down(damages[i] * r_def_type)
-
-            # やけど補正
-            damages[i] = round_half_down(damages[i] * r_burn)
-
-            # ダメージ補正
-            damages[i] = round_half_down(damages[i] * r_damage)
-
-            # まもる貫通系補正
-            damages[i] = round_half_down(damages[i] * r_protect)
-
-            # 最低ダメージ補償
-            if r_def_type * r_damage > 0:
-                damages[i] = max(1, damages[i])
 
-        return damages
+        return list(_calc_damage_rolls(
+            max_damage,
+            self.atk_type_modifier,
+            self.def_type_modifier,
+            self.burn_modifier,
+            self.damage_modifier,
+            self.protect_modifier,
+        ))
 
     def _calc_atk_type_modifier(self, ctx: AttackContext) -> int:
         """タイプ一致補正（STAB）を計算する。
@@ -3,7 +3,9 @@
 バトル中の各種イベント、コマンド、ダメージ情報を記録します。
 ログは後で再生やデバッグ、戦略分析に使用できます。
 """
+from bisect import bisect_left
 from dataclasses import dataclass, asdict
+from typing import Iterable
 
 from jpoke.enums import LogCode
 from jpoke.types import Stat
@@ -258,24 +260,132 @@ class EventLogger:
     バトル中に発生するイベント、コマンド、ダメージを記録し、
     ターンごと、プレイヤーごとに取得可能にする。
 
+    記録と同時に次の索引を更新するため、ターン・プレイヤーを指定した取得は
+    全ログを走査せず、結果の件数（と二分探索）に比例する時間で済む。
+
+    - ターンの区間: 同じターンのログが連続する区間ごとの開始位置
+      （ログは通常ターン順に記録されるため、1ターンは1区間になる）
+    - プレイヤーごとの位置: プレイヤーインデックスごとのログの位置（昇順）
+    - LogCode ごとの位置: `get_by_code()` を初めて呼んだ時点で作成し、以降は記録と
+      同時に更新する（使わない場合は作らない）
+
+    `copy_on_write()` の複製は索引を引き継がず、取得系のメソッドを初めて呼んだ時点で
+    全ログから作り直す（探索の分岐のように、複製してもログを取得しない用途で索引の
+    複製を省くため）。
+
+    `codes` を指定すると、その LogCode のログだけを記録する（それ以外は `add()` で
+    捨てる）。記録しないログの Payload を組み立てる費用も省きたい呼び出し元は、
+    `records()` で記録されるかを確かめてから組み立てる。
+
     Attributes:
-        logs: ログのリスト
+        logs: ログのリスト（直接書き換えないこと。索引と食い違う）
+        codes: 記録する LogCode の集合（Noneなら全て記録する）
     """
 
-    def __init__(self):
-        """EventLoggerを初期化する。"""
+    def __init__(self, codes: Iterable[LogCode] | None = None):
+        """EventLoggerを初期化する。
+
+        Args:
+            codes: 記録する LogCode（Noneなら全て記録する）
+        """
+        self.codes: frozenset[LogCode] | None = frozenset(codes) if codes is not None else None
         self.logs: list[EventLog] = []
         self._next_seq = 0
+        # ターンの区間の開始位置とそのターン番号（区間の終わりは次の区間の開始位置）
+        self._segment_starts: list[int] = []
+        self._segment_turns: list[int] = []
+        # ターン番号 -> そのターンの区間の番号
+        self._turn_segments: dict[int, list[int]] = {}
+        # プレイヤーインデックス -> ログの位置
+        self._player_positions: dict[int, list[int]] = {}
+        # LogCode -> ログの位置（get_by_code() を呼ぶまでは None）
+        self._code_positions: dict[LogCode, list[int]] | None = None
+        # 上の索引が logs と対応しているか（False の間は記録時にも更新しない）
+        self._indexed = True
+
+    def empty_copy(self) -> "EventLogger":
+        """記録する LogCode の設定だけを引き継いだ空の EventLogger を作成する
+        （`Battle.copy(copy_logs=False)` 用）。"""
+        return EventLogger(self.codes)
+
+    def copy_on_write(self) -> "EventLogger":
+        """ログを引き継いだ複製を作成する（`Battle.copy(copy_on_write=True)` 用）。
+
+        EventLog は不変（frozen）なので、リストを浅くコピーするだけで複製元と独立する。
+        索引は複製せず、複製先で取得系のメソッドを初めて呼んだ時点で作り直す。
+        """
+        new = self.empty_copy()
+        new.logs = list(self.logs)
+        new._next_seq = self._next_seq
+        new._indexed = not new.logs
+        return new
+
+    def _ensure_index(self):
+        """索引が logs と対応していなければ、全ログから作り直す。"""
+        if self._indexed:
+            return
+        self._indexed = True
+        for pos, log in enumerate(self.logs):
+            self._index(pos, log.turn, log.idx, log.log)
 
     def clear(self):
         """すべてのログをクリアする。"""
         self.logs.clear()
         self._next_seq = 0
+        self._indexed = True
+        self._segment_starts.clear()
+        self._segment_turns.clear()
+        self._turn_segments.clear()
+        self._player_positions.clear()
+        if self._code_positions is not None:
+            self._code_positions.clear()
+
+    def truncate(self, n_logs: int):
+        """先頭から n_logs 件だけを残し、それ以降のログを削除する（`Battle.rollback()` 用）。
+
+        Args:
+            n_logs: 残すログの件数
+        """
+        removed = len(self.logs) - n_logs
+        if removed <= 0:
+            return
+        if not self._indexed:
+            del self.logs[n_logs:]
+            self._next_seq -= removed
+            return
+        # 削除するログは各索引の末尾にあるため、末尾から取り除く
+        for pos in range(len(self.logs) - 1, n_logs - 1, -1):
+            log = self.logs[pos]
+            self._player_positions[log.idx].pop()
+            if self._code_positions is not None:
+                self._code_positions[log.log].pop()
+        while self._segment_starts and self._segment_starts[-1] >= n_logs:
+            self._segment_starts.pop()
+            turn = self._segment_turns.pop()
+            segments = self._turn_segments[turn]
+            segments.pop()
+            if not segments:
+                del self._turn_segments[turn]
+        del self.logs[n_logs:]
+        self._next_seq -= removed
+
+    def records(self, log: LogCode) -> bool:
+        """log のログを記録するかどうかを返す。
+
+        Args:
+            log: LogCode列挙値
+
+        Returns:
+            記録する場合True（`add()` で捨てる場合False）
+        """
+        return self.codes is None or log in self.codes
 
     def add(self, turn: int, idx: int, log: LogCode, payload: Payload | None = None,
              pokemon: str | None = None):
         """イベントログを追加。
 
+        `codes` に含まれない LogCode のログは記録しない。
+
         Args:
             turn: ターン番号
             idx: プレイヤーインデックス (0 or 1)
@@ -283,8 +393,48 @@ class EventLogger:
             payload: イベントの詳細情報（必要に応じて）
             pokemon: イベントの主体となったポケモン名（あれば）
         """
+        if self.codes is not None and log not in self.codes:
+            return
+        pos = len(self.logs)
         self.logs.append(EventLog(self._next_seq, turn, idx, log, payload, pokemon))
         self._next_seq += 1
+        if self._indexed:
+            self._index(pos, turn, idx, log)
+
+    def _index(self, pos: int, turn: int, idx: int, log: LogCode):
+        """位置 pos に記録したログを索引に加える。"""
+        if not self._segment_turns or self._segment_turns[-1] != turn:
+            self._turn_segments.setdefault(turn, []).append(len(self._segment_starts))
+            self._segment_starts.append(pos)
+            self._segment_turns.append(turn)
+        positions = self._player_positions.get(idx)
+        if positions is None:
+            positions = self._player_positions[idx] = []
+        positions.append(pos)
+        if self._code_positions is not None:
+            self._code_positions.setdefault(log, []).append(pos)
+
+    def _turn_ranges(self, turn: int) -> list[tuple[int, int]]:
+        """turn のログが占める区間 [start, end) のリストを返す。"""
+        self._ensure_index()
+        starts = self._segment_starts
+        ranges = []
+        for k in self._turn_segments.get(turn, ()):
+            end = starts[k + 1] if k + 1 < len(starts) else len(self.logs)
+            ranges.append((starts[k], end))
+        return ranges
+
+    def _select(self, positions: list[int], turn: int | None) -> list[EventLog]:
+        """位置のリスト（昇順）のうち、turn のログ（Noneなら全て）を返す。"""
+        logs = self.logs
+        if turn is None:
+            return [logs[i] for i in positions]
+        result = []
+        for start, end in self._turn_ranges(turn):
+            lo = bisect_left(positions, start)
+            hi = bisect_left(positions, end, lo)
+            result += [logs[i] for i in positions[lo:hi]]
+        return result
 
     def get(self, turn: int, idx: int) -> list[EventLog]:
         """指定したターンとプレイヤーのイベントログを取得。
@@ -296,5 +446,89 @@ class EventLogger:
         Returns:
             EventLog オブジェクトのリスト
         """
-        return [log for log in self.logs if
-                log.turn == turn and log.idx == idx]
+        self._ensure_index()
+        return self._select(self._player_positions.get(idx, []), turn)
+
+    def get_turn(self, turn: int) -> list[EventLog]:
+        """指定したターンの全プレイヤーのイベントログを記録順に取得。
+
+        Args:
+            turn: ターン番号
+
+        Returns:
+            EventLog オブジェクトのリスト
+        """
+        result = []
+        for start, end in self._turn_ranges(turn):
+            result += self.logs[start:end]
+        return result
+
+    def get_player(self, idx: int) -> list[EventLog]:
+        """指定したプレイヤーの全ターンのイベントログを記録順に取得。
+
+        Args:
+            idx: プレイヤーインデックス (0 or 1)
+
+        Returns:
+            EventLog オブジェクトのリスト
+        """
+        self._ensure_index()
+        return self._select(self._player_positions.get(idx, []), None)
+
+    def get_by_code(self, log: LogCode, turn: int | None = None) -> list[EventLog]:
+        """指定した LogCode のイベントログを記録順に取得。
+
+        初めて呼んだ時点で LogCode ごとの索引を全ログから作成し、以降は記録と同時に
+        更新する。
+
+        Args:
+            log: LogCode列挙値
+            turn: ターン番号（Noneの場合は全ターン）
+
+        Returns:
+            EventLog オブジェクトのリスト
+        """
+        self._ensure_index()
+        if self._code_positions is None:
+            self._code_positions = {}
+            for pos, entry in enumerate(self.logs):
+                self._code_positions.setdefault(entry.log, []).append(pos)
+        return self._select(self._code_positions.get(log, []), turn)
+
+
+class NullEventLogger(EventLogger):
+    """何も記録しない EventLogger（`Battle(log_codes=())` 用）。
+
+    ログを読まない大量の自己対戦・探索の内部シミュレーション向け。`add()` は
+    何もせず、`records()` は常に False を返す。取得系のメソッドは常に空のリストを返す。
+    """
+
+    def __init__(self, codes: Iterable[LogCode] | None = None):
+        super().__init__(())
+
+    def empty_copy(self) -> "NullEventLogger":
+        return NullEventLogger()
+
+    def records(self, log: LogCode) -> bool:
+        return False
+
+    def add(self, turn: int, idx: int, log: LogCode, payload: Payload | None = None,
+             pokemon: str | None = None):
+        pass
+
+
+def create_event_logger(codes: Iterable[LogCode] | None = None) -> EventLogger:
+    """codes の LogCode だけを記録する EventLogger を作成する。
+
+    Args:
+        codes: 記録する LogCode（Noneなら全て記録する。空なら何も記録しない
+            `NullEventLogger` を返す）
+
+    Returns:
+        EventLogger インスタンス
+    """
+    if codes is not None:
+        codes = frozenset(codes)
+        if not codes:
+            return NullEventLogger()
+    return EventLogger(codes)
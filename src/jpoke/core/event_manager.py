@@ -4,16 +4,86 @@
 特性、技、アイテムなどの効果発動を統一的に処理するイベントシステムを提供します。
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Sequence
 if TYPE_CHECKING:
-    from jpoke.core import Battle, Handler, Player
+    from jpoke.core import Battle, Handler
     from jpoke.model import Pokemon
+    from jpoke.types import RoleSpec
+
+from dataclasses import dataclass
 
 from jpoke.enums import DomainEvent, Event
 from jpoke.utils import fast_copy
 
 from .context import BaseContext, EventContext
 from .handler import HandlerReturn, RegisteredHandler
+from .player import Player
+
+
+@dataclass
+class EmitStats:
+    """イベントごとの発火回数の集計（`EventManager.enable_stats()` で有効化）。
+
+    Attributes:
+        emits: イベントの発火回数
+        handler_calls: 有効判定を通過して実行されたハンドラの数
+        sort_cache_hits: 優先度順の並びをキャッシュから再利用した回数
+        speed_evaluations: 同じ優先度のハンドラを並べるために素早さを計算した回数
+        validity_checks: ハンドラの有効判定（`_check_handler_validity`）の回数
+        index_skips: 主体の索引により、有効判定をせずに除外したハンドラの数
+    """
+    emits: int = 0
+    handler_calls: int = 0
+    sort_cache_hits: int = 0
+    speed_evaluations: int = 0
+    validity_checks: int = 0
+    index_skips: int = 0
+
+
+class _Dispatch:
+    """1つのハンドラリストから作る、発火用の並びと主体の索引（`EventManager` 内部用）。
+
+    Attributes:
+        handlers: 作成元のハンドラリスト（同一性でキャッシュの有効性を判定する）
+        ordered: 優先度順に並べたハンドラ（ドメインイベントは登録順のまま）
+        tie_ranges: ordered のうち同じ優先度のハンドラが並ぶ区間 [start, end) のリスト
+        unindexed: 主体の照合を索引で行えない（常に有効判定する）ハンドラの ordered 上の位置
+        by_spec: subject_spec ごとに、主体のキーから ordered 上の位置のリストへの索引。
+            キーはポケモンなら (プレイヤーインデックス, チームインデックス)、
+            プレイヤーなら プレイヤーインデックス（場のポケモンが主体になる）
+    """
+    __slots__ = ("handlers", "ordered", "tie_ranges", "unindexed", "by_spec")
+
+    def __init__(self,
+                 handlers: list[RegisteredHandler],
+                 ordered: list[RegisteredHandler],
+                 players: Sequence[Player]) -> None:
+        self.handlers = handlers
+        self.ordered = ordered
+        self.tie_ranges = _tie_ranges(ordered)
+        self.unindexed: list[int] = []
+        self.by_spec: dict[RoleSpec, dict[tuple[int, int] | int, list[int]]] = {}
+        for i, rh in enumerate(ordered):
+            handler = rh.handler
+            key: tuple[int, int] | int | None = rh.slot
+            if key is None and isinstance(rh.registered_subject, Player):
+                key = players.index(rh.registered_subject)
+            if handler.skip_subject_check or key is None:
+                self.unindexed.append(i)
+            else:
+                self.by_spec.setdefault(handler.subject_spec, {}).setdefault(key, []).append(i)
+
+
+def _tie_ranges(ordered: list[RegisteredHandler]) -> list[tuple[int, int]]:
+    """優先度順のハンドラから、同じ優先度のハンドラが2つ以上並ぶ区間を返す。"""
+    ranges = []
+    start = 0
+    for i in range(1, len(ordered) + 1):
+        if i == len(ordered) or ordered[i].handler.priority != ordered[start].handler.priority:
+            if i - start > 1:
+                ranges.append((start, i))
+            start = i
+    return ranges
 
 
 class EventManager:
@@ -24,6 +94,7 @@ class EventManager:
     Attributes:
         battle: バトルインスタンス
         handlers: イベントタイプごとの登録済みハンドラリスト
+        stats: イベントごとの発火回数の集計（`enable_stats()` を呼ぶまでは None）
     """
 
     def __init__(self, battle: Battle) -> None:
@@ -33,7 +104,18 @@ class EventManager:
             battle: バトルインスタンス
         """
         self.battle = battle
+        # イベントごとのハンドラリストはその場で変更せず、on/off のたびに新しいリストへ
+        # 差し替える（不変リストとして扱う）。これにより copy_on_write() の複製間で
+        # リスト・RegisteredHandler をそのまま共有できる。
         self.handlers: dict[Event | DomainEvent, list[RegisteredHandler]] = {}
+        # copy_on_write() で複製元と RegisteredHandler を共有しているか
+        self._handlers_shared: bool = False
+        # イベントごとの優先度順の並びと主体の索引。ハンドラリストは不変なので、
+        # リストが差し替えられていなければ（on/off がなければ）そのまま使える。
+        # 素早さは盤面によって変わるため保持せず、同じ優先度の区間だけを
+        # 発火のたびに並べ直す。
+        self._sort_cache: dict[Event | DomainEvent, _Dispatch] = {}
+        self.stats: dict[Event | DomainEvent, EmitStats] | None = None
 
     def __deepcopy__(self, memo):
         """EventManagerインスタンスのディープコピーを作成する。
@@ -47,21 +129,64 @@ class EventManager:
         cls = self.__class__
         new = cls.__new__(cls)
         memo[id(self)] = new
-        return fast_copy(self, new, keys_to_deepcopy=["handlers"])
+        fast_copy(self, new, keys_to_deepcopy=["handlers"])
+        new._handlers_shared = False
+        # 複製先のハンドラリストは別オブジェクトになるため、キャッシュは引き継がない
+        new._sort_cache = {}
+        new.stats = None
+        return new
+
+    def copy_on_write(self) -> EventManager:
+        """ハンドラリストを複製元と共有する軽量な複製を作成する（`Battle.copy(copy_on_write=True)` 用）。
+
+        ハンドラリストは on/off のたびに差し替えられ、その場で変更されることはないため、
+        辞書だけを浅くコピーすればリストと RegisteredHandler は複製元と共有してよい。
+        ポケモンの主体は `RegisteredHandler.slot` で複製先のチームから解決される。
+
+        Returns:
+            EventManager: 複製されたEventManagerインスタンス
+        """
+        cls = self.__class__
+        new = cls.__new__(cls)
+        new.__dict__.update(self.__dict__)
+        new.handlers = dict(self.handlers)
+        new._handlers_shared = True
+        # ハンドラリストを共有しているため、並びのキャッシュも引き継げる
+        new._sort_cache = dict(self._sort_cache)
+        new.stats = None
+        return new
+
+    def enable_stats(self) -> dict[Event | DomainEvent, EmitStats]:
+        """イベントごとの発火回数の集計を開始する（既存の集計は破棄する）。
+
+        複製した Battle には集計は引き継がれない。
+
+        Returns:
+            dict[Event | DomainEvent, EmitStats]: 集計先の辞書（`self.stats` と同じもの）
+        """
+        self.stats = {}
+        return self.stats
+
+    def disable_stats(self) -> None:
+        """イベントごとの発火回数の集計を終了する。"""
+        self.stats = None
 
     def update_reference(self, new: Battle):
         """ディープコピー後のBattleインスタンスへの参照を更新する。
 
         ハンドラが参照するポケモンやプレイヤーを新しいBattleインスタンスのものに置き換える。
+        copy_on_write() による複製では RegisteredHandler を複製元と共有しているため
+        書き換えず、Battle への参照のみを更新する。
 
         Args:
             new: 新しいBattleインスタンス
         """
         # ハンドラの対象に指定されているポケモンまたはプレイヤーへの参照を更新する
-        old = self.battle
-        for handlers in self.handlers.values():
-            for rh in handlers:
-                rh.update_reference(old, new)
+        if not self._handlers_shared:
+            old = self.battle
+            for handlers in self.handlers.values():
+                for rh in handlers:
+                    rh.update_reference(old, new)
 
         # Battle への参照を更新する
         self.battle = new
@@ -69,6 +194,26 @@ class EventManager:
     def _resolve_subject(self, rh: RegisteredHandler) -> Pokemon | None:
         return rh.get_subject(self.battle)
 
+    def _registered_subject(self, rh: RegisteredHandler) -> Pokemon | Player:
+        """登録時の主体（ポケモンまたはプレイヤー）を、このBattle上のインスタンスとして返す。"""
+        if rh.slot is not None:
+            player_index, team_index = rh.slot
+            return self.battle._player_states[player_index].team[team_index]
+        return rh.registered_subject
+
+    def _slot_of(self, subject: Pokemon | Player) -> tuple[int, int] | None:
+        """ポケモンの主体を (プレイヤーインデックス, チームインデックス) に変換する。
+
+        プレイヤー、またはどのチームにも属さないポケモンの場合は None を返す。
+        """
+        if isinstance(subject, Player):
+            return None
+        for player_index, state in enumerate(self.battle._player_states):
+            for team_index, mon in enumerate(state.team):
+                if mon is subject:
+                    return player_index, team_index
+        return None
+
     def on(self,
            event: Event | DomainEvent,
            handler: Handler,
@@ -80,9 +225,9 @@ class EventManager:
             handler: ハンドラ定義
             subject: ハンドラの主体（ポケモンまたはプレイヤー）
         """
-        self.handlers.setdefault(event, []).append(
-            RegisteredHandler(handler, subject)
-        )
+        rh = RegisteredHandler(handler, subject, self._slot_of(subject))
+        self._record_undo(event)
+        self.handlers[event] = [*self.handlers.get(event, ()), rh]
 
     def off(self,
             event: Event | DomainEvent,
@@ -97,13 +242,39 @@ class EventManager:
         """
         if event not in self.handlers:
             return
+        slot = self._slot_of(subject)
+        self._record_undo(event)
         self.handlers[event] = [
             rh for rh in self.handlers[event]
-            if not (rh.handler == handler and rh.registered_subject == subject)
+            if not (rh.handler == handler and self._same_subject(rh, subject, slot))
         ]
         if not self.handlers[event]:
             del self.handlers[event]
 
+    def _record_undo(self, event: Event | DomainEvent):
+        """巻き戻しの記録中であれば、差し替え前のハンドラリストへ戻す逆操作を記録する。"""
+        journal = self.battle.journal
+        if journal is None:
+            return
+        old = self.handlers.get(event)
+
+        def undo():
+            if old is None:
+                self.handlers.pop(event, None)
+            else:
+                self.handlers[event] = old
+
+        journal.record(undo)
+
+    @staticmethod
+    def _same_subject(rh: RegisteredHandler,
+                      subject: Pokemon | Player,
+                      slot: tuple[int, int] | None) -> bool:
+        """登録済みハンドラの主体が subject と一致するかを判定する。"""
+        if rh.slot is not None and slot is not None:
+            return rh.slot == slot
+        return rh.registered_subject == subject
+
     def emit(self,
              event: Event | DomainEvent,
              ctx: BaseContext | None = None,
@@ -131,20 +302,36 @@ class EventManager:
         """
         # ソート時にドメインイベントを発火して素早さ計算を行うため、
         # ドメインイベントはソートせずに発火して再帰を防ぐ
-        # （ハンドラ内での on/off に耐えるようコピーをイテレートする）
-        if isinstance(event, DomainEvent):
-            handlers = list(self.handlers.get(event, []))
+        # （ハンドラリストは on/off でその場で変更されないため、そのままイテレートできる）
+        stats = None
+        if self.stats is not None:
+            stats = self.stats.get(event)
+            if stats is None:
+                stats = self.stats[event] = EmitStats()
+            stats.emits += 1
+
+        rhs = self.handlers.get(event, [])
+        if ctx and len(rhs) > 1:
+            # コンテキストが与えられた場合は、主体がコンテキストのロールに一致し得る
+            # ハンドラだけに絞ってから並べる
+            handlers = self._select_handlers(event, rhs, ctx, stats)
+        elif isinstance(event, DomainEvent):
+            handlers = rhs
         else:
-            handlers = self._sort_handlers(self.handlers.get(event, []))
+            handlers = self._sort_handlers(event, rhs, stats)
 
         for rh in handlers:
             context = ctx if ctx else self._build_context(rh)
 
             # ハンドラが現在のコンテキストで有効かどうかをチェックする
             # （subject_spec が指すポケモンが既に瀕死の場合のスキップ判定を含む）
+            if stats is not None:
+                stats.validity_checks += 1
             if not self._check_handler_validity(rh, context):
                 continue
 
+            if stats is not None:
+                stats.handler_calls += 1
             result = rh.handler.func(self.battle, context, value)
 
             if not isinstance(result, HandlerReturn):
@@ -152,7 +339,7 @@ class EventManager:
 
             # 一度きりのハンドラを解除
             if rh.handler.once:
-                self.off(event, rh.handler, rh.registered_subject)
+                self.off(event, rh.handler, self._registered_subject(rh))
 
             value = result.value
 
@@ -178,25 +365,140 @@ class EventManager:
             return EventContext(target=mon)
         return EventContext(source=mon)
 
-    def _sort_handlers(self, rhs: list[RegisteredHandler]) -> list[RegisteredHandler]:
+    def _dispatch(self,
+                  event: Event | DomainEvent,
+                  rhs: list[RegisteredHandler],
+                  stats: EmitStats | None) -> _Dispatch:
+        """ハンドラリストに対応する優先度順の並びと主体の索引を返す（キャッシュする）。"""
+        dispatch = self._sort_cache.get(event)
+        if dispatch is not None and dispatch.handlers is rhs:
+            if stats is not None:
+                stats.sort_cache_hits += 1
+            return dispatch
+        if isinstance(event, DomainEvent):
+            ordered = rhs
+        else:
+            ordered = sorted(rhs, key=lambda rh: rh.handler.priority)
+        dispatch = _Dispatch(rhs, ordered, self.battle.players)
+        self._sort_cache[event] = dispatch
+        return dispatch
+
+    def _sort_handlers(self,
+                       event: Event | DomainEvent,
+                       rhs: list[RegisteredHandler],
+                       stats: EmitStats | None = None) -> list[RegisteredHandler]:
         """ハンドラを優先度と素早さに基づいてソートする。
 
+        `sorted(rhs, key=(優先度, -素早さ))` と同じ順序を返す。優先度順の並びは
+        ハンドラリストごとにキャッシュし、素早さは同じ優先度のハンドラの主体が
+        異なる区間についてのみ計算する（主体が同じなら素早さも同じで、並びは変わらない）。
+
         Args:
+            event: ソート対象のイベントタイプ（キャッシュのキー）
             rhs: ソート対象のRegisteredHandlerリスト
+            stats: 集計中であれば、このイベントの集計先
 
         Returns:
-            list[RegisteredHandler]: ソート後のリスト
+            list[RegisteredHandler]: ソート後のリスト（変更してはならない）
         """
         if len(rhs) <= 1:
-            return list(rhs)
+            return rhs
+        dispatch = self._dispatch(event, rhs, stats)
+        return self._break_speed_ties(dispatch.ordered, dispatch.tie_ranges, stats)
+
+    def _select_handlers(self,
+                         event: Event | DomainEvent,
+                         rhs: list[RegisteredHandler],
+                         ctx: BaseContext,
+                         stats: EmitStats | None) -> list[RegisteredHandler]:
+        """コンテキストのロールに主体が一致し得るハンドラだけを、実行順に並べて返す。
+
+        subject_spec ごとにコンテキストのロールが指すポケモンを1度だけ解決し、
+        主体の索引からそのポケモン（またはそのポケモンを場に出しているプレイヤー）の
+        ハンドラを取り出す。除外したハンドラは `_check_handler_validity` の主体の照合で
+        必ず無効になるものに限られるため、実行されるハンドラとその順序は
+        全ハンドラを並べて有効判定する場合と同じになる。
+        ロールが解決できない場合（None や ValueError）はそのロールのハンドラを
+        すべて残し、従来通り有効判定に委ねる。
 
-        def key(rh: RegisteredHandler):
-            subject = self._resolve_subject(rh)
-            assert subject is not None
-            speed = self.battle.speed_calculator.calc_effective_speed(subject)
-            return (rh.handler.priority, -speed)
+        Args:
+            event: 発火するイベントタイプ
+            rhs: イベントの登録済みハンドラリスト
+            ctx: 発火時のコンテキスト
+            stats: 集計中であれば、このイベントの集計先
 
-        return sorted(rhs, key=key)
+        Returns:
+            list[RegisteredHandler]: 実行候補のハンドラ（変更してはならない）
+        """
+        dispatch = self._dispatch(event, rhs, stats)
+        positions = list(dispatch.unindexed)
+        player_states = self.battle._player_states
+        for spec, index in dispatch.by_spec.items():
+            try:
+                target = ctx.resolve_role(self.battle, spec)
+            except ValueError:
+                target = None
+            if target is None:
+                for group in index.values():
+                    positions.extend(group)
+                continue
+            slot = self._slot_of(target)
+            if slot is None:
+                continue
+            mon_group = index.get(slot)
+            if mon_group is not None:
+                positions.extend(mon_group)
+            player_index = slot[0]
+            state = player_states[player_index]
+            if state.active_index is not None and state.team[state.active_index] is target:
+                player_group = index.get(player_index)
+                if player_group is not None:
+                    positions.extend(player_group)
+
+        if stats is not None:
+            stats.index_skips += len(rhs) - len(positions)
+        if len(positions) == len(rhs):
+            if isinstance(event, DomainEvent):
+                return dispatch.ordered
+            return self._break_speed_ties(dispatch.ordered, dispatch.tie_ranges, stats)
+
+        positions.sort()
+        ordered = dispatch.ordered
+        selected = [ordered[i] for i in positions]
+        if isinstance(event, DomainEvent) or len(selected) <= 1:
+            return selected
+        return self._break_speed_ties(selected, _tie_ranges(selected), stats)
+
+    def _break_speed_ties(self,
+                          ordered: list[RegisteredHandler],
+                          tie_ranges: list[tuple[int, int]],
+                          stats: EmitStats | None) -> list[RegisteredHandler]:
+        """優先度順のハンドラのうち、同じ優先度の区間を主体の素早さ順に並べ直す。
+
+        並べ直しが不要な場合は ordered をそのまま返す。
+        """
+        result = ordered
+        speeds: dict[int, int] = {}
+        for start, end in tie_ranges:
+            group = ordered[start:end]
+            subjects = [self._resolve_subject(rh) for rh in group]
+            if all(subject is subjects[0] for subject in subjects):
+                continue
+
+            def speed(subject: Pokemon | None) -> int:
+                assert subject is not None
+                key = id(subject)
+                if key not in speeds:
+                    speeds[key] = self.battle.speed_calculator.calc_effective_speed(subject)
+                    if stats is not None:
+                        stats.speed_evaluations += 1
+                return speeds[key]
+
+            indexes = sorted(range(len(group)), key=lambda i: -speed(subjects[i]))
+            if result is ordered:
+                result = list(ordered)
+            result[start:end] = [group[i] for i in indexes]
+        return result
 
     def _check_handler_validity(self, rh: RegisteredHandler, ctx: BaseContext) -> bool:
         """ハンドラが現在のコンテキストで有効かどうかをチェックする。"""
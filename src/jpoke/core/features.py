@@ -0,0 +1,141 @@
+"""盤面の特徴量ベクトル（評価関数・学習用の固定長の数値列）。
+
+`extract_features(battle, player)` は、盤面を player の視点から1回走査し、
+`FEATURE_NAMES` と同じ並び・同じ長さ（`N_FEATURES`）の数値のリストを返す。
+チームの人数・場の状態の有無によらず長さは一定で、チームは `MAX_TEAM_SIZE` 体分の
+枠に詰め、空いた枠は0で埋める。並びは次のとおり（自分 → 相手の順に同じ項目を並べる）。
+
+- チームの各枠: HP割合・ひんしか・場に出ているか・状態異常（種類ごとに1/0）
+- 場のポケモンの能力ランク（攻撃〜回避。-6〜+6 を 6 で割った値）
+- そのプレイヤーの側の場の状態の残りターン数（まきびし等は重ねた数）
+- 天候・フィールド（種類ごとに1/0）とその残りターン数、全体の場の状態の残りターン数
+- 素早さ順: 自分の場のポケモンの実効素早さが相手より速ければ1、同速なら0.5、遅ければ0
+  （トリックルームは考慮しない。全体の場の状態の項目で別に表す）
+- タイプ相性: 自分の場のポケモンのタイプの技で相手を攻撃したときの最大の倍率が
+  2倍以上・1倍未満・0倍か、相手のタイプの技で攻撃されたときの同じ3項目（1/0）
+
+場の状態は読み取るだけで、構造共有（`Battle.copy(copy_on_write=True)`）中の
+`Field` を複製しない。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Sequence, get_args
+if TYPE_CHECKING:
+    from jpoke.core import Battle, Player
+    from jpoke.model import Pokemon
+
+from jpoke.data import TYPE_MODIFIER
+from jpoke.types import AilmentName, GlobalFieldName, SideFieldName, Stat, TerrainName, Type, WeatherName
+from jpoke.utils.constants import STATS, STAT_RANK_MAX
+
+__all__ = [
+    "MAX_TEAM_SIZE",
+    "FEATURE_NAMES",
+    "N_FEATURES",
+    "extract_features",
+]
+
+MAX_TEAM_SIZE = 6
+
+_AILMENTS: tuple[str, ...] = tuple(name for name in get_args(AilmentName) if name)
+_BOOST_STATS: tuple[Stat, ...] = tuple(stat for stat in STATS if stat != "hp")
+_SIDE_FIELDS: tuple[SideFieldName, ...] = get_args(SideFieldName)
+_WEATHERS: tuple[str, ...] = tuple(name for name in get_args(WeatherName) if name)
+_TERRAINS: tuple[str, ...] = tuple(name for name in get_args(TerrainName) if name)
+_GLOBAL_FIELDS: tuple[GlobalFieldName, ...] = get_args(GlobalFieldName)
+_MATCHUPS: tuple[str, ...] = ("super_effective", "resisted", "immune")
+
+
+def _side_feature_names(side: str) -> list[str]:
+    names = []
+    for slot in range(MAX_TEAM_SIZE):
+        prefix = f"{side}.slot{slot}"
+        names += [f"{prefix}.hp", f"{prefix}.fainted", f"{prefix}.active"]
+        names += [f"{prefix}.ailment.{name}" for name in _AILMENTS]
+    names += [f"{side}.boost.{stat}" for stat in _BOOST_STATS]
+    names += [f"{side}.side_field.{name}" for name in _SIDE_FIELDS]
+    return names
+
+
+FEATURE_NAMES: tuple[str, ...] = tuple(
+    _side_feature_names("self")
+    + _side_feature_names("opponent")
+    + [f"weather.{name}" for name in _WEATHERS] + ["weather.count"]
+    + [f"terrain.{name}" for name in _TERRAINS] + ["terrain.count"]
+    + [f"global_field.{name}" for name in _GLOBAL_FIELDS]
+    + ["speed.faster"]
+    + [f"offense.{name}" for name in _MATCHUPS]
+    + [f"defense.{name}" for name in _MATCHUPS]
+)
+N_FEATURES: int = len(FEATURE_NAMES)
+
+# チームの1枠あたりの項目数
+_SLOT_SIZE = 3 + len(_AILMENTS)
+
+
+def extract_features(battle: Battle, player: Player) -> list[float]:
+    """盤面を player の視点で特徴量ベクトルに変換する。
+
+    Args:
+        battle: 対象の盤面
+        player: 視点のプレイヤー（`FEATURE_NAMES` の "self"）
+
+    Returns:
+        `FEATURE_NAMES` の順に並べた長さ `N_FEATURES` の数値のリスト
+    """
+    opponent = battle.opponent(player)
+    features: list[float] = []
+    actives: list[Pokemon | None] = []
+    for p in (player, opponent):
+        state = battle.player_states[p]
+        active = state.active
+        actives.append(active)
+        for mon in state.team[:MAX_TEAM_SIZE]:
+            features += (mon.hp_fraction, float(mon.fainted), float(mon is active))
+            ailment = mon.ailment.name
+            features += (float(ailment == name) for name in _AILMENTS)
+        features += [0.0] * (_SLOT_SIZE * (MAX_TEAM_SIZE - min(len(state.team), MAX_TEAM_SIZE)))
+
+        if active is not None:
+            features += (active.boosts[stat] / STAT_RANK_MAX for stat in _BOOST_STATS)
+        else:
+            features += [0.0] * len(_BOOST_STATS)
+        # `fields` プロパティは共有中の Field を複製するため、読み取りには `_fields` を使う
+        side_fields = battle.get_side(p)._fields
+        features += (float(side_fields[name].count) for name in _SIDE_FIELDS)
+
+    # 天候・地形も `battle.weather` 等を経由せず `_fields` から読む
+    weather_manager = battle.weather_manager
+    weather = weather_manager._fields[weather_manager.active_name]
+    features += (float(weather.name == name) for name in _WEATHERS)
+    features.append(float(weather.count))
+    terrain_manager = battle.terrain_manager
+    terrain = terrain_manager._fields[terrain_manager.current_name]
+    features += (float(terrain.name == name) for name in _TERRAINS)
+    features.append(float(terrain.count))
+    global_fields = battle.global_manager._fields
+    features += (float(global_fields[name].count) for name in _GLOBAL_FIELDS)
+
+    mine, theirs = actives
+    if mine is not None and theirs is not None:
+        my_speed = battle.speed_calculator.calc_effective_speed(mine)
+        their_speed = battle.speed_calculator.calc_effective_speed(theirs)
+        features.append(1.0 if my_speed > their_speed else 0.5 if my_speed == their_speed else 0.0)
+        features += _matchup_bits(mine.types, theirs.types)
+        features += _matchup_bits(theirs.types, mine.types)
+    else:
+        features += [0.0] * (1 + 2 * len(_MATCHUPS))
+    return features
+
+
+def _matchup_bits(attack_types: Sequence[Type], defense_types: Sequence[Type]) -> list[float]:
+    """attack_types の技で defense_types を攻撃したときの最大の倍率の区分（1/0）を返す。"""
+    best = 1.0
+    if attack_types:
+        best = 0.0
+        for attack_type in attack_types:
+            row = TYPE_MODIFIER.get(attack_type, {})
+            modifier = 1.0
+            for defense_type in defense_types:
+                modifier *= row.get(defense_type, 1.0)
+            best = max(best, modifier)
+    return [float(best >= 2), float(0 < best < 1), float(best == 0)]
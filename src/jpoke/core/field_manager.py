@@ -9,6 +9,8 @@ if TYPE_CHECKING:
     from jpoke.core import Battle, Player, EventManager
     from jpoke.model import Pokemon
 
+from copy import deepcopy
+
 from jpoke.utils import fast_copy
 from jpoke.types import GlobalFieldName, SideFieldName, WeatherName, TerrainName
 from jpoke.data.field import WEATHER_PRIORITY
@@ -39,13 +41,36 @@ class BaseFieldManager(Generic[T]):
         """
         self.battle: Battle = battle
         self.owners: tuple[Player, ...] = owners
-        self.fields: dict[T, Field] = fields
+        self._fields: dict[T, Field] = fields
+        # copy_on_write() で他のBattleと共有したままになっているフィールド名。
+        # 共有中の Field は get() / fields で初めて触れたときに複製する。
+        self._shared: set[T] = set()
+        # Battle.checkpoint() 以降に変更前の Field を journal に記録済みのフィールド名
+        self._journaled: set[T] = set()
 
     def __deepcopy__(self, memo):
         cls = self.__class__
         new = cls.__new__(cls)
         memo[id(self)] = new
-        fast_copy(self, new, keys_to_deepcopy=["fields"])
+        fast_copy(self, new, keys_to_deepcopy=["_fields"])
+        new._shared = set()
+        new._journaled = set()
+        return new
+
+    def copy_on_write(self):
+        """Field を複製元と共有する軽量な複製を作成する（`Battle.copy(copy_on_write=True)` 用）。
+
+        Field はハンドラから直接書き換えられる（`field.count`・`field.damage` 等）ため、
+        複製元・複製先の双方で全フィールドを共有中として扱い、どちらの側でも
+        最初に取得したときに複製する（触れなかったフィールドは複製されない）。
+        """
+        cls = self.__class__
+        new = cls.__new__(cls)
+        new.__dict__.update(self.__dict__)
+        new._fields = dict(self._fields)
+        self._shared = set(self._fields)
+        new._shared = set(self._fields)
+        new._journaled = set()
         return new
 
     def update_reference(self, new_battle: Battle):
@@ -56,6 +81,28 @@ class BaseFieldManager(Generic[T]):
         """
         self.battle = new_battle
 
+    @property
+    def fields(self) -> dict[T, Field]:
+        """フィールド名と Field の辞書を返す。
+
+        呼び出し側が任意の Field を書き換えられるよう、`materialize()` を呼んでから返す。
+        読み取るだけなら `get()` で個別に取得する方が、触れないフィールドを複製せずに済む。
+        """
+        self.materialize()
+        return self._fields
+
+    def materialize(self):
+        """共有中のフィールドをすべて複製し、このマネージャー専用の Field にする。
+
+        巻き戻しの記録中であれば、変更前の Field をすべて記録する。
+        """
+        if self.battle.journal is not None:
+            for name in list(self._fields):
+                self.get(name)
+        elif self._shared:
+            for name in list(self._shared):
+                self.get(name)
+
     @property
     def _events(self) -> EventManager:
         return self.battle.events
@@ -69,7 +116,35 @@ class BaseFieldManager(Generic[T]):
         Returns:
             Field: 対応するフィールドオブジェクト
         """
-        return self.fields[name]
+        journal = self.battle.journal
+        if journal is not None and name not in self._journaled:
+            # 巻き戻し地点以降で初めて触れるフィールドは、変更前の Field を記録して
+            # 以後は複製側を書き換える
+            self._journaled.add(name)
+            old = self._fields[name]
+            was_shared = name in self._shared
+            self._shared.discard(name)
+            self._fields[name] = deepcopy(old)
+            journal.record(lambda: self._restore_field(name, old, was_shared))
+        elif name in self._shared:
+            self._shared.discard(name)
+            self._fields[name] = deepcopy(self._fields[name])
+        return self._fields[name]
+
+    def _restore_field(self, name: T, field: Field, shared: bool):
+        """journal の逆操作: 変更前の Field に戻す。"""
+        self._fields[name] = field
+        if shared:
+            self._shared.add(name)
+        else:
+            self._shared.discard(name)
+
+    def reset_journal(self):
+        """巻き戻し地点の作成・巻き戻しのたびに、記録済みのフィールド名を忘れる。
+
+        以後に触れたフィールドは、新しい巻き戻し地点からの変更として改めて記録される。
+        """
+        self._journaled.clear()
 
     def tick_down(self, name: T):
         """フィールド効果のカウントを1減らす。
@@ -95,20 +170,22 @@ class BaseFieldManager(Generic[T]):
         field.count = count
         for player in field.owners:
             field.register_handlers(self._events, player)
-        self.battle.add_event_log(
-            field.owners[0], LogCode.FIELD_STARTED,
-            payload=FieldPayload(field=field.name, count=count)
-        )
+        if self.battle.event_logger.records(LogCode.FIELD_STARTED):
+            self.battle.add_event_log(
+                field.owners[0], LogCode.FIELD_STARTED,
+                payload=FieldPayload(field=field.name, count=count)
+            )
         self._events.emit(Event.ON_FIELD_ACTIVATE, value=field)
 
     def _deactivate_field(self, field: Field):
         """解除イベントを発火してからフィールドを無効化する。"""
         field_name = field.data.name
         field.count = 0
-        self.battle.add_event_log(
-            field.owners[0], LogCode.FIELD_ENDED,
-            payload=FieldPayload(field=field_name)
-        )
+        if self.battle.event_logger.records(LogCode.FIELD_ENDED):
+            self.battle.add_event_log(
+                field.owners[0], LogCode.FIELD_ENDED,
+                payload=FieldPayload(field=field_name)
+            )
         self._events.emit(Event.ON_FIELD_DEACTIVATE, value=field)
         for player in field.owners:
             field.unregister_handlers(self._events, player)
@@ -165,12 +242,12 @@ class ExclusiveFieldManager(BaseFieldManager[T]):
     @property
     def current(self) -> Field:
         """現在有効なフィールドオブジェクトを返す。"""
-        return self.fields[self.current_name]
+        return self.get(self.current_name)
 
     @property
     def inactive(self) -> Field:
         """非発動状態のフィールドオブジェクトを返す。"""
-        return self.fields[self.inactive_name]
+        return self.get(self.inactive_name)
 
     def apply(self, name: T, count: int, source: Pokemon | None = None) -> bool:
         """フィールド効果を発動する。
@@ -302,10 +379,11 @@ class StackableFieldManager(BaseFieldManager[T]):
         if max_count <= 1 or field.count >= max_count:
             return False
         field.count += 1
-        self.battle.add_event_log(
-            field.owners[0], LogCode.FIELD_STACKED,
-            payload=FieldPayload(field=field.name, count=field.count)
-        )
+        if self.battle.event_logger.records(LogCode.FIELD_STACKED):
+            self.battle.add_event_log(
+                field.owners[0], LogCode.FIELD_STACKED,
+                payload=FieldPayload(field=field.name, count=field.count)
+            )
         return True
 
     def deactivate(self, name: T) -> bool:
@@ -335,13 +413,18 @@ class WeatherManager(ExclusiveFieldManager[WeatherName]):
         super().__init__(battle, battle.players, WeatherName)
 
     @property
-    def active(self) -> Field:
-        """現在有効な天候オブジェクトを返す。"""
+    def active_name(self) -> WeatherName:
+        """現在有効な天候の名前を返す（エアロック・ノーてんき等で無効なら空文字）。"""
         if self.current_name != self.inactive_name:
             enabled = self._events.emit(Event.ON_CHECK_WEATHER_ENABLED, value=True)
             if not enabled:
-                return self.inactive
-        return self.current
+                return self.inactive_name
+        return self.current_name
+
+    @property
+    def active(self) -> Field:
+        """現在有効な天候オブジェクトを返す。"""
+        return self.get(self.active_name)
 
     def apply(self, name: WeatherName, count: int, source: Pokemon | None = None) -> bool:
         """天候を発動する。
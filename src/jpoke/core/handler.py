@@ -78,15 +78,22 @@ class RegisteredHandler:
     Attributes:
         handler: ハンドラ定義
         registered_subject: ハンドラの主体（ポケモンまたはプレイヤー）
+        slot: 主体がポケモンの場合の (プレイヤーインデックス, チームインデックス)。
+            主体の解決はこの位置情報で行うため、コピーオンライトの複製
+            （`Battle.copy(copy_on_write=True)`）で複製元と共有されたままの
+            インスタンスでも、複製先のポケモンを正しく指す。主体がプレイヤーの場合や、
+            登録時にどのチームにも属していなかった場合は None（registered_subject を直接使う）
     """
     handler: Handler
     registered_subject: Pokemon | Player
+    slot: tuple[int, int] | None = None
 
     def __deepcopy__(self, memo):
+        # Handler は不変（frozen）な静的定義のため複製せず共有する
         cls = self.__class__
         new = cls.__new__(cls)
         memo[id(self)] = new
-        return fast_copy(self, new, keys_to_deepcopy=["handler"])
+        return fast_copy(self, new, keys_to_deepcopy=[])
 
     def update_reference(self, old: Battle, new: Battle):
         """Battleの複製後に、対応する新しい主体ポケモンを参照するように更新する。
@@ -98,6 +105,11 @@ class RegisteredHandler:
         if isinstance(self.registered_subject, Player):
             return
 
+        if self.slot is not None:
+            player_index, team_index = self.slot
+            self.registered_subject = new._player_states[player_index].team[team_index]
+            return
+
         player = old.get_player(self.registered_subject)  # 元のBattleからプレイヤーを特定
         old_state = old.player_states[player]
         team_index = old_state.team.index(self.registered_subject)
@@ -112,6 +124,9 @@ class RegisteredHandler:
             Pokemon | None: ハンドラの主体となるポケモン。
                 主体がPlayerで場が空いている場合は None
         """
+        if self.slot is not None:
+            player_index, team_index = self.slot
+            return battle._player_states[player_index].team[team_index]
         if isinstance(self.registered_subject, Player):
             return battle.get_active(self.registered_subject)
         else:
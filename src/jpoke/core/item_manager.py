@@ -151,19 +151,22 @@ class ItemManager:
         # アイテムを変更してハンドラを登録し、イベントを発火する
         mon.item = Item(name)
         mon.item.revealed = True
+        self.battle._touch_state_hash(mon)
 
         if mon.item.name:
-            self.battle.add_event_log(
-                mon,
-                LogCode.ITEM_GAINED,
-                payload=ItemPayload(item=mon.item.name)
-            )
+            if self.battle.event_logger.records(LogCode.ITEM_GAINED):
+                self.battle.add_event_log(
+                    mon,
+                    LogCode.ITEM_GAINED,
+                    payload=ItemPayload(item=mon.item.name)
+                )
         else:
-            self.battle.add_event_log(
-                mon,
-                LogCode.ITEM_LOST,
-                payload=ItemPayload(item=lost_item_name)
-            )
+            if self.battle.event_logger.records(LogCode.ITEM_LOST):
+                self.battle.add_event_log(
+                    mon,
+                    LogCode.ITEM_LOST,
+                    payload=ItemPayload(item=lost_item_name)
+                )
 
         if is_active and name:
             mon.item.register_handlers(self._events, mon)
@@ -0,0 +1,254 @@
+"""Battle の巻き戻し（checkpoint / rollback）を行う操作記録（undo ログ）。
+
+木探索で「盤面を進めて評価し、元に戻す」を繰り返すために使う。
+`Battle.checkpoint()` で巻き戻し地点を作り、`sim.step()` 等で盤面を進めたあと
+`Battle.rollback(checkpoint)` で巻き戻し地点の状態へ戻す。
+
+状態の種類ごとに次の方法で巻き戻す。
+
+- イベントハンドラの登録（`EventManager.on/off`）: 差し替え前のハンドラリストを
+  逆操作として記録する（リストはその場で変更されないため、戻すだけでよい）。
+- 場の状態（各 FieldManager の Field）: 巻き戻し地点以降に初めて取得された時点で
+  変更前の Field を記録し、以後は複製側を書き換える（マネージャー自身の属性は
+  下記のポケモン等と同様に記録する）。
+- 乱数生成器・ログ: 内部状態のタプルとログの件数を記録し、巻き戻し時に復元・切り詰める。
+- ポケモン・PlayerState・各マネージャーの属性: 特性・技・持ち物などのハンドラが
+  属性を直接書き換え、書き換えを1か所で捕捉できないため、巻き戻し地点で属性の
+  浅い記録（リスト・辞書はその中身）を取り、巻き戻し時にその場で書き戻す。
+  オブジェクトの同一性は保たれるため、複製と違って参照の付け替えは不要。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable
+if TYPE_CHECKING:
+    from jpoke.core import Battle
+
+from dataclasses import dataclass
+from enum import Enum
+
+from .event_logger import EventLogger
+from .event_manager import EventManager
+from .field_manager import BaseFieldManager
+from .handler import Handler, RegisteredHandler
+from .player import Player
+
+
+class Journal:
+    """巻き戻し用の逆操作を記録する undo ログ。"""
+
+    def __init__(self) -> None:
+        self._undo: list[Callable[[], None]] = []
+        # 有効な巻き戻し地点（作成順）
+        self._checkpoints: list[Checkpoint] = []
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def record(self, undo: Callable[[], None]) -> None:
+        """直前の変更を取り消す逆操作を記録する。
+
+        Args:
+            undo: 引数なしで呼ぶと変更前の状態へ戻す関数
+        """
+        self._undo.append(undo)
+
+    def undo_to(self, position: int) -> None:
+        """記録数が position になるまで、新しい順に逆操作を実行する。
+
+        Args:
+            position: 巻き戻し先の記録数（`len(journal)` の値）
+        """
+        undo = self._undo
+        while len(undo) > position:
+            undo.pop()()
+
+    def push(self, checkpoint: Checkpoint) -> None:
+        """巻き戻し地点を有効なものとして登録する。"""
+        self._checkpoints.append(checkpoint)
+
+    def release_after(self, checkpoint: Checkpoint) -> None:
+        """checkpoint より後に作られた巻き戻し地点を無効にする。
+
+        Raises:
+            ValueError: checkpoint がこの記録で有効な巻き戻し地点でない場合
+        """
+        for i, live in enumerate(self._checkpoints):
+            if live is checkpoint:
+                del self._checkpoints[i + 1:]
+                return
+        raise ValueError("この Battle で有効な巻き戻し地点ではありません。")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """`Battle.checkpoint()` が返す巻き戻し地点。
+
+    同じ巻き戻し地点へは何度でも巻き戻せる。ただし巻き戻し地点 A より後に作った
+    巻き戻し地点 B は、A へ巻き戻した時点で無効になる（スタック順に使うこと）。
+
+    Attributes:
+        position: 巻き戻し地点での undo ログの記録数
+        random_state: ゲーム進行用乱数生成器の内部状態
+        decision_random_state: 行動選択用乱数生成器の内部状態
+        n_logs: イベントログの件数
+        n_commands: コマンドログの件数
+        objects: (オブジェクト, 属性辞書の浅いコピー) の組
+        containers: (リスト・辞書・集合, 中身の浅いコピー) の組
+    """
+    position: int
+    random_state: tuple
+    decision_random_state: tuple
+    n_logs: int
+    n_commands: int
+    objects: tuple[tuple[Any, dict[str, Any]], ...]
+    containers: tuple[tuple[Any, Any], ...]
+
+
+# 属性を記録しない型（不変・共有が前提のもの、または専用の方法で巻き戻すもの）
+_SKIP_TYPES = (
+    Player, Handler, RegisteredHandler, EventManager, EventLogger, Journal,
+)
+# 属性は記録するが、一部の属性の先を辿らない型と、その属性名
+# （FieldManager の Field は undo ログで巻き戻す）
+_PARTIAL_TYPES: dict[type, frozenset[str]] = {
+    BaseFieldManager: frozenset({"_fields"}),
+}
+
+# 対戦開始後に書き換えられない Battle の属性（辿らない）
+_UNTRACKED_BATTLE_KEYS = frozenset({"players", "_team_snapshot"})
+
+_SKIP, _OBJECT, _PARTIAL, _LIST, _DICT, _SET, _TUPLE = range(7)
+
+# 型ごとの記録方法のキャッシュ
+_KIND_CACHE: dict[type, int] = {}
+
+
+def _kind(cls: type) -> int:
+    """型ごとに、巻き戻し地点での記録方法を判定する。"""
+    kind = _KIND_CACHE.get(cls)
+    if kind is not None:
+        return kind
+    module = getattr(cls, "__module__", "")
+    if issubclass(cls, list):
+        kind = _LIST
+    elif issubclass(cls, dict):
+        kind = _DICT
+    elif issubclass(cls, set):
+        kind = _SET
+    elif issubclass(cls, tuple):
+        kind = _TUPLE
+    elif issubclass(cls, tuple(_PARTIAL_TYPES)):
+        kind = _PARTIAL
+    elif (
+        module.startswith("jpoke.")
+        # 図鑑・技・特性・アイテム等の静的データは書き換えられない
+        and not module.startswith("jpoke.data")
+        and not issubclass(cls, (Enum, *_SKIP_TYPES))
+        # EventLog・RecordedCommand 等の不変な dataclass
+        and not getattr(getattr(cls, "__dataclass_params__", None), "frozen", False)
+        and hasattr(cls, "__dict__")
+    ):
+        kind = _OBJECT
+    else:
+        kind = _SKIP
+    _KIND_CACHE[cls] = kind
+    return kind
+
+
+def _untracked_keys(cls: type) -> frozenset[str]:
+    """`_PARTIAL_TYPES` から、その型で辿らない属性名を返す。"""
+    for base, keys in _PARTIAL_TYPES.items():
+        if issubclass(cls, base):
+            return keys
+    return frozenset()
+
+
+def _capture(battle: Battle) -> tuple[list, list]:
+    """Battle から辿れるオブジェクトの属性とコンテナの中身を浅く記録する。"""
+    objects: list[tuple[Any, dict[str, Any]]] = []
+    containers: list[tuple[Any, Any]] = []
+    state = dict(battle.__dict__)
+    objects.append((battle, state))
+    seen: set[int] = {id(battle)}
+    stack: list[Any] = [
+        value for key, value in state.items() if key not in _UNTRACKED_BATTLE_KEYS
+    ]
+    kinds = _KIND_CACHE
+    while stack:
+        obj = stack.pop()
+        cls = type(obj)
+        kind = kinds.get(cls)
+        if kind is None:
+            kind = _kind(cls)
+        if kind == _SKIP:
+            continue
+        oid = id(obj)
+        if oid in seen:
+            continue
+        seen.add(oid)
+        if kind == _OBJECT:
+            state = dict(obj.__dict__)
+            objects.append((obj, state))
+            stack.extend(state.values())
+        elif kind == _PARTIAL:
+            state = dict(obj.__dict__)
+            objects.append((obj, state))
+            untracked = _untracked_keys(cls)
+            stack.extend(value for key, value in state.items() if key not in untracked)
+        elif kind == _LIST:
+            containers.append((obj, list(obj)))
+            stack.extend(obj)
+        elif kind == _DICT:
+            containers.append((obj, dict(obj)))
+            stack.extend(obj.values())
+        elif kind == _SET:
+            containers.append((obj, set(obj)))
+        else:
+            stack.extend(obj)
+    return objects, containers
+
+
+def checkpoint(battle: Battle) -> Checkpoint:
+    """現在の盤面を巻き戻し地点として記録する（`Battle.checkpoint()` の実体）。"""
+    if battle.journal is None:
+        battle.journal = Journal()
+    for manager in battle._field_managers():
+        manager.reset_journal()
+    objects, containers = _capture(battle)
+    result = Checkpoint(
+        position=len(battle.journal),
+        random_state=battle.random.getstate(),
+        decision_random_state=battle.decision_random.getstate(),
+        n_logs=len(battle.event_logger.logs),
+        n_commands=len(battle.command_log),
+        objects=tuple(objects),
+        containers=tuple(containers),
+    )
+    battle.journal.push(result)
+    return result
+
+
+def rollback(battle: Battle, checkpoint: Checkpoint) -> None:
+    """盤面を巻き戻し地点の状態へ戻す（`Battle.rollback()` の実体）。"""
+    journal = battle.journal
+    if journal is None:
+        raise ValueError("この Battle で有効な巻き戻し地点ではありません。")
+    journal.release_after(checkpoint)
+
+    journal.undo_to(checkpoint.position)
+    for obj, state in checkpoint.objects:
+        attrs = obj.__dict__
+        attrs.clear()
+        attrs.update(state)
+    for container, saved in checkpoint.containers:
+        if isinstance(container, list):
+            container[:] = saved
+        else:
+            container.clear()
+            container.update(saved)
+
+    battle.random.setstate(checkpoint.random_state)
+    battle.decision_random.setstate(checkpoint.decision_random_state)
+    battle.event_logger.truncate(checkpoint.n_logs)
+    del battle.command_log[checkpoint.n_commands:]
+    for manager in battle._field_managers():
+        manager.reset_journal()
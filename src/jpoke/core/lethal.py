@@ -20,11 +20,11 @@ if TYPE_CHECKING:
     from jpoke.model import Pokemon, Move
     from jpoke.types import MoveName
 
-from copy import deepcopy
-from dataclasses import dataclass, field
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
 from collections import defaultdict
 
-from jpoke.types import Stat, AilmentName, LethalSubject
+from jpoke.types import Stat, AilmentName, LethalSubject, LethalBackend
 from jpoke.enums import LethalEvent
 from jpoke.utils.lethal_dist import State, StateDist, to_dist, add_dist, subtract_dist
 
@@ -61,6 +61,8 @@ class LethalContext:
     # HP満タン枝専用のダメージ分布。defender が full_hp_damage_modifier を持ち、
     # 満タン時と非満タン時でダメージが異なる場合のみ設定される（それ以外は None）。
     damage_dist_full: StateDist | None = None
+    # ダメージ適用時の分布演算の実装（utils/lethal_dist 参照）
+    backend: LethalBackend = "dict"
 
 
 @dataclass
@@ -92,6 +94,9 @@ class LethalHitResult:
         hp_dist: ダメージ適用後のHP分布
         damage_dist: このヒットで与えたダメージの分布
         attacker_state / defender_state: 計算時の攻撃側・防御側の状態スナップショット
+        error_bound: 近似計算（`prune_threshold` / `max_states`）で他の状態に合算した、
+            または切り捨てた枝の確率の合計。`lethal_probability` と厳密な致死率の差は
+            この値以下になる（厳密な計算では 0.0）
     """
     initial_hp: int
     move: Move
@@ -103,6 +108,7 @@ class LethalHitResult:
         default_factory=LethalPokemonState)
     defender_state: LethalPokemonState = field(
         default_factory=LethalPokemonState)
+    error_bound: float = 0.0
 
     def __add__(self, other: LethalHitResult) -> LethalHitResult:
         """2つのLethalHitResultのHP分布・ダメージ分布を合成する。
@@ -128,6 +134,7 @@ class LethalHitResult:
             damage_dist=damage_dist,
             attacker_state=attacker_state,
             defender_state=defender_state,
+            error_bound=min(1.0, self.error_bound + other.error_bound),
         )
 
     def _counter(self, dist: StateDist) -> dict[int, int]:
@@ -220,26 +227,42 @@ def calc_lethal(battle: Battle,
                 | list[MoveName | Move | tuple[MoveName | Move, int]],
                 critical: bool,
                 move_secondary: bool,
-                max_attack: int) -> list[LethalHitResult]:
+                max_attack: int,
+                backend: LethalBackend = "dict",
+                prune_threshold: float = 0.0,
+                max_states: int | None = None) -> list[LethalHitResult]:
     """致死率計算のエントリーポイント。
 
     Args:
-        battle: 現在のバトル状態（deepcopy して使用するため破壊しない）
+        battle: 現在のバトル状態（`_lethal_snapshot` の複製の上で計算するため変更しない。
+            ただし呼び出し前に取得した Field は、呼び出し後に `battle.weather` 等で
+            取得し直すこと）
         attacker: 攻撃側ポケモン
         moves: 技（単体 / (技, ヒット数) / リスト）。技名の文字列を渡した場合は
             内部で `Move(name)` に正規化される
         critical: 急所計算をするか
         move_secondary: 追加効果ハンドラを適用するか
         max_attack: 最大攻撃回数
+        backend: HP分布の演算の実装（"dict" / "array"）。結果は変わらない
+        prune_threshold: 近似計算で束ねる枝の確率の閾値（0.0 なら束ねない）
+        max_states: 近似計算で残すHP分布の状態数の上限（HP=0 の状態を含む。None なら上限なし）
 
     Returns:
         各ヒット後の LethalHitResult のリスト（確定数が出た時点で打ち切り）
+
+    Raises:
+        ValueError: prune_threshold が [0, 1) の範囲外、または max_states が1未満の場合
     """
+    if not 0.0 <= prune_threshold < 1.0:
+        raise ValueError(f"prune_threshold は 0 以上 1 未満で指定してください: {prune_threshold}")
+    if max_states is not None and max_states < 1:
+        raise ValueError(f"max_states は 1 以上で指定してください: {max_states}")
+
     # 攻撃側のインデックスを取得
     attacker_index = battle._get_player_index(attacker)
 
-    # deepcopy してバトル状態を壊さずに計算する
-    battle = deepcopy(battle)
+    # 複製の上で計算し、バトル状態を壊さない
+    battle = _lethal_snapshot(battle)
     attacker = battle.actives[attacker_index]
     defender = battle.foe(attacker)
     initial_hp = defender.hp
@@ -251,7 +274,24 @@ def calc_lethal(battle: Battle,
     )
     move_list = _generate_move_list(moves)
 
-    return _lethal_loop(initial_hp, hp_dist, battle, attacker, defender, move_list, critical, move_secondary, max_attack)
+    return _lethal_loop(initial_hp, hp_dist, battle, attacker, defender, move_list, critical, move_secondary, max_attack,
+                        backend, prune_threshold, max_states)
+
+
+def _lethal_snapshot(battle: Battle) -> Battle:
+    """致死率計算用の複製を作る。
+
+    致死率計算が読み書きするのは攻撃側・防御側のポケモンと、そのサイドの場・
+    全体の場（天候・地形等）、イベントハンドラの登録だけで、ログは参照しない。
+    そのため deepcopy ではなく構造共有による複製（`copy_on_write=True`）を使い、
+    ログは引き継がない（`copy_logs=False`）。ハンドラリスト・場の状態は実際に
+    書き換えられた時点で初めて複製されるため、1回あたりの複製コストが小さい。
+
+    構造共有の複製は、複製元の場のマネージャーにも全フィールドを共有中として記録する
+    （`Battle.copy()` 参照）。そのため呼び出し前に取得した Field は、呼び出し後には
+    複製元の場の状態を指さなくなる場合がある。
+    """
+    return battle.copy(copy_logs=False, copy_on_write=True)
 
 
 def _generate_move_list(
@@ -292,16 +332,23 @@ def _lethal_loop(initial_hp: int,
                  move_list: list[tuple[Move, int]],
                  critical: bool,
                  move_secondary: bool,
-                 max_attack: int) -> list[LethalHitResult]:
+                 max_attack: int,
+                 backend: LethalBackend = "dict",
+                 prune_threshold: float = 0.0,
+                 max_states: int | None = None) -> list[LethalHitResult]:
     """致死率計算のメインループ。
 
     max_attack 回分、move_list の技を順に使用し、各ヒット後の LethalHitResult を返す。
     いずれかの時点で HP=0 の状態が現れたら途中で打ち切る。
+    prune_threshold / max_states を指定した場合は、ヒットごと・ターン終了ごとに
+    HP分布の枝を束ね（`_prune_dist`）、合算・切り捨てた確率を error_bound に積算する。
     """
+    # これまでに切り捨てた枝の確率（初期分布に対する割合）
+    error_bound = 0.0
     # move ごとに LethalContext を作成しておく（ループ内で毎回作る必要がないため）
     ctx_list: list[tuple[int, LethalContext]] = [
         (n_hits, LethalContext(attacker, defender, move,
-         critical=critical, move_secondary=move_secondary))
+         critical=critical, move_secondary=move_secondary, backend=backend))
         for move, n_hits in move_list
     ]
 
@@ -319,6 +366,8 @@ def _lethal_loop(initial_hp: int,
                 ctx.hit_count = hit
                 # 技の適用
                 hp_dist = _run_move(battle, ctx, hp_dist, every_event_handlers)
+                hp_dist, dropped = _prune_dist(hp_dist, prune_threshold, max_states)
+                error_bound = 1.0 - (1.0 - error_bound) * (1.0 - dropped)
 
                 attacker_state, defender_state = _pokemon_states(hp_dist)
                 result = LethalHitResult(
@@ -330,6 +379,7 @@ def _lethal_loop(initial_hp: int,
                     damage_dist=ctx.damage_dist,
                     attacker_state=attacker_state,
                     defender_state=defender_state,
+                    error_bound=error_bound,
                 )
                 results.append(result)
 
@@ -338,7 +388,10 @@ def _lethal_loop(initial_hp: int,
 
             # ターン終了時のハンドラを適用（たべのこし回復など）
             hp_dist = _run_turn_end(battle, ctx, hp_dist, every_event_handlers)
+            hp_dist, dropped = _prune_dist(hp_dist, prune_threshold, max_states)
+            error_bound = 1.0 - (1.0 - error_bound) * (1.0 - dropped)
             results[-1].hp_dist = hp_dist  # ターン終了後の HP 分布を反映
+            results[-1].error_bound = error_bound
             results[-1].attacker_state, results[-1].defender_state = _pokemon_states(hp_dist)
             if fainted(hp_dist):
                 return results
@@ -346,6 +399,76 @@ def _lethal_loop(initial_hp: int,
     return results
 
 
+def _prune_dist(hp_dist: StateDist,
+                prune_threshold: float,
+                max_states: int | None) -> tuple[StateDist, float]:
+    """HP分布の状態を、確率の高い順に max_states 個以下に束ねる。
+
+    HP=0 の状態は確率が最大のもの1つにまとめて残し、それ以外の状態を確率の高い順に、
+    合わせて最大 max_states 個まで残す。HP=0 以外で確率が prune_threshold 未満の状態は
+    残さない。残さなかった HP=0 以外の状態の確率は、HP 以外のタグ（特性・道具の
+    有効フラグ、ランク補正・状態異常）が同じ残した状態のうち HP が最も近いもの
+    （同じ距離なら HP の高い方）に合算し、該当する状態がなければ切り捨てる。
+
+    HP=0 の状態どうしの合算は致死率を変えない。それ以外の合算・切り捨てでは、その枝の
+    その後の致死確率が 0〜1 のどれにもなり得るため、近似した致死率と厳密な致死率の
+    差は、合算・切り捨てた確率の合計以下になる。
+
+    Returns:
+        (束ねた後の分布, 誤差として積算する確率（HP=0 以外の合算・切り捨ての合計の、
+        分布全体に対する割合）)
+    """
+    if prune_threshold <= 0.0 and (max_states is None or len(hp_dist) <= max_states):
+        return hp_dist, 0.0
+
+    total = sum(hp_dist.values())
+    ranked = sorted(hp_dist.items(), key=lambda item: (item[0].value != 0, -item[1]))
+    limit = len(ranked) if max_states is None else max_states
+    kept: StateDist = {}
+    pruned: list[tuple[State, int]] = []
+    ko_state = ranked[0][0] if ranked[0][0].value == 0 else None
+    for state, freq in ranked:
+        if state.value == 0:
+            if state is ko_state:
+                kept[state] = freq
+            else:
+                pruned.append((state, freq))
+        elif not kept or (len(kept) < limit and freq >= prune_threshold * total):
+            kept[state] = freq
+        else:
+            pruned.append((state, freq))
+    if not pruned:
+        return hp_dist, 0.0
+
+    # HP 以外のタグごとの、残した状態の HP の昇順のリスト
+    by_tags: dict[State, list[int]] = defaultdict(list)
+    for state in kept:
+        if state.value != 0:
+            by_tags[replace(state, value=0)].append(state.value)
+    for values in by_tags.values():
+        values.sort()
+
+    moved = 0
+    for state, freq in pruned:
+        if state.value == 0:
+            assert ko_state is not None
+            kept[ko_state] += freq
+            continue
+        moved += freq
+        tags = replace(state, value=0)
+        kept_values = by_tags.get(tags)
+        if not kept_values:
+            continue
+        i = bisect_left(kept_values, state.value)
+        if i == len(kept_values) or (i > 0 and state.value - kept_values[i - 1] < kept_values[i] - state.value):
+            i -= 1
+        kept[replace(state, value=kept_values[i])] += freq
+
+    # 代表枝（`_pokemon_states`）が変わらないよう、元の分布の順に並べる
+    result = {state: kept[state] for state in hp_dist if state in kept}
+    return result, moved / total
+
+
 def _before_move(battle: Battle,
                  ctx: LethalContext,
                  hp_dist: StateDist,
@@ -414,13 +537,13 @@ def _apply_damage(battle: Battle, ctx: LethalContext, hp_dist: StateDist) -> Sta
 
     result: StateDist = defaultdict(int)
     if full_states:
-        full_result = subtract_dist(full_states, full_dmg, minimum=0)
+        full_result = subtract_dist(full_states, full_dmg, minimum=0, backend=ctx.backend)
         for h in _get_handlers(LethalEvent.ON_APPLY_DAMAGE, battle, ctx):
             full_result = h.func(battle, ctx, full_result)
         for s, f in full_result.items():
             result[s] += f
     if other_states:
-        for s, f in subtract_dist(other_states, baseline_dmg, minimum=0).items():
+        for s, f in subtract_dist(other_states, baseline_dmg, minimum=0, backend=ctx.backend).items():
             result[s] += f
 
     if full_states and other_states:
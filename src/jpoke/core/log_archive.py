@@ -0,0 +1,356 @@
+"""イベントログの列指向のバイナリ形式での書き出し・読み込み。
+
+大量の自己対戦のログを分析用に保存するための形式。`EventLog.to_dict()` のように
+ログ1件ごとに辞書（JSON）を作らず、1対戦分のログを項目ごとの数値の配列
+（列）に詰めて、対戦ごとに zlib で圧縮した1ブロックとして追記する。
+`read_log_archive()` はファイルを先頭から1ブロックずつ読み、対戦ごとの
+`LogColumns` を返す（ファイル全体をメモリに載せない）。
+
+## ファイルの構成
+
+    ヘッダ: b"JPLG" + 形式のバージョン（uint8）
+    ブロック（対戦ごと）: 圧縮後のバイト数（uint32） + zlib で圧縮した本体
+
+本体は、対戦の情報（seed: int64, ターン数: int32, 勝者のプレイヤーインデックス:
+int8（未決着なら -1）, ログ件数: uint32）、コード表（ブロックに現れる `LogCode` の
+名前）、文字列表（ポケモン名・技名等）、`COLUMNS` の順に並べた各列の配列からなる。
+表はどちらも件数（uint16）と、バイト数（uint16）を前に置いた UTF-8 の文字列の並び。
+数値はすべてリトルエンディアン。
+
+`LogCode` の値は列挙子の追加・並べ替えで変わるため、code 列には値ではなく
+コード表の番号を格納し、読み込み時に名前から `LogCode` に戻す。
+
+## 列
+
+| 列 | 型 | 内容 |
+|---|---|---|
+| turn / idx / code | int32 / int8 / uint8 | ターン番号・プレイヤーインデックス・`LogColumns.code_names` の番号 |
+| pokemon | int16 | `EventLog.pokemon` の文字列表の番号（なければ -1） |
+| name | int16 | Payload の主な名前（技・特性・持ち物・状態異常・揮発状態・場の状態・テラスタイプ） |
+| source / target | int16 | Payload の `source` / `target`（公開系のログの相手のポケモン名） |
+| reason | int16 | `display_reason`（HP_CHANGED は `internal_reason`） |
+| value / hp / max_hp | int32 | HP_CHANGED の増減量・変化後のHP・最大HP。PP_CONSUMED の `value` は value 列 |
+| count | int16 | FieldPayload の `count`（なければ -1） |
+| atk 〜 evasion | int8 | STAT_CHANGED の能力ごとの増減段階 |
+
+文字列の列（pokemon〜reason）は `LogColumns.strings` の番号で、該当しないログは -1。
+数値の列の該当しないログは 0。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator
+if TYPE_CHECKING:
+    from jpoke.core import Battle
+
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass, field
+
+from jpoke.core.event_logger import EventLog
+from jpoke.enums import LogCode
+from jpoke.core.log_payload import (
+    Payload, AbilityPayload, AilmentPayload, FailureLogPayload, FieldPayload,
+    HPChangePayload, ItemPayload, ItemRevealPayload, MoveActionPayload,
+    MoveRevealPayload, StatChangePayload, TerastalPayload, VolatilePayload,
+)
+
+__all__ = [
+    "COLUMNS",
+    "LogColumns",
+    "LogArchiveWriter",
+    "read_log_archive",
+]
+
+MAGIC = b"JPLG"
+VERSION = 2
+
+_STAT_COLUMNS: tuple[str, ...] = ("atk", "def", "spa", "spd", "spe", "accuracy", "evasion")
+
+# 列名と array の型コード
+COLUMNS: dict[str, str] = {
+    "turn": "i",
+    "idx": "b",
+    "code": "B",
+    "pokemon": "h",
+    "name": "h",
+    "source": "h",
+    "target": "h",
+    "reason": "h",
+    "value": "i",
+    "hp": "i",
+    "max_hp": "i",
+    "count": "h",
+    **{stat: "b" for stat in _STAT_COLUMNS},
+}
+
+_FILE_HEADER = struct.Struct("<4sB")
+_BLOCK_HEADER = struct.Struct("<I")
+_BATTLE_HEADER = struct.Struct("<qibI")
+_STRING_LENGTH = struct.Struct("<H")
+
+
+@dataclass
+class LogColumns:
+    """1対戦分のイベントログの列。
+
+    Attributes:
+        seed: 対戦の乱数シード
+        turn_count: 対戦のターン数
+        winner: 勝者のプレイヤーインデックス（未決着なら -1）
+        strings: 文字列の列が参照する文字列表
+        code_names: code 列が参照する `LogCode` の名前の表
+        columns: 列名（`COLUMNS`）ごとの配列。長さはログ件数
+    """
+    seed: int
+    turn_count: int
+    winner: int
+    strings: list[str] = field(default_factory=list)
+    code_names: list[str] = field(default_factory=list)
+    columns: dict[str, array] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.columns["code"])
+
+    def __getitem__(self, name: str) -> array:
+        return self.columns[name]
+
+    def decode(self, name: str) -> list[str | None]:
+        """文字列の列 name を文字列（該当しないログは None）のリストに変換する。"""
+        strings = self.strings
+        return [strings[i] if i >= 0 else None for i in self.columns[name]]
+
+    def code_id(self, code: LogCode) -> int:
+        """code 列で code を表す番号を返す（このブロックに現れなければ -1）。"""
+        try:
+            return self.code_names.index(code.name)
+        except ValueError:
+            return -1
+
+    def decode_codes(self) -> list[LogCode | None]:
+        """code 列を `LogCode` のリストに変換する（現在の `LogCode` にない名前は None）。"""
+        members = LogCode.__members__
+        codes = [members.get(name) for name in self.code_names]
+        return [codes[i] for i in self.columns["code"]]
+
+
+class LogArchiveWriter:
+    """対戦のイベントログを列指向のバイナリ形式で書き出す。
+
+    with 文で使うか、書き終えたら `close()` を呼ぶ。パスを渡した場合はファイルを
+    開いて閉じる。開いたバイナリのファイルオブジェクトを渡した場合は閉じない。
+
+    Args:
+        file: 書き出し先のパス、またはバイナリのファイルオブジェクト
+        level: zlib の圧縮レベル（0〜9）
+    """
+
+    def __init__(self, file: str | BinaryIO, level: int = 6):
+        if isinstance(file, str):
+            self._file: BinaryIO = open(file, "wb")
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self.level = level
+        self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+
+    def __enter__(self) -> LogArchiveWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """書き出しを終える（パスを渡した場合はファイルを閉じる）。"""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def write(self, battle: Battle) -> None:
+        """battle のイベントログを1ブロックとして追記する。
+
+        Args:
+            battle: 書き出す対戦（`battle.event_logger.logs` の全件を書き出す）
+        """
+        winner = battle.players.index(battle.winner) if battle.winner is not None else -1
+        self.write_logs(battle.event_logger.logs, seed=battle.seed,
+                        turn_count=battle.turn, winner=winner)
+
+    def write_logs(self, logs: Iterable[EventLog], seed: int = 0, turn_count: int = 0,
+                   winner: int = -1) -> None:
+        """イベントログの列を1ブロックとして追記する。
+
+        Args:
+            logs: 書き出すイベントログ
+            seed: 対戦の乱数シード（負の値を含む int64 の範囲）
+            turn_count: 対戦のターン数
+            winner: 勝者のプレイヤーインデックス（未決着なら -1）
+        """
+        columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        string_ids: dict[str, int] = {}
+        code_ids: dict[LogCode, int] = {}
+
+        def string_id(text: str | None) -> int:
+            if not text:
+                return -1
+            i = string_ids.get(text)
+            if i is None:
+                i = string_ids[text] = len(string_ids)
+            return i
+
+        appenders = {name: col.append for name, col in columns.items()}
+        for log in logs:
+            appenders["turn"](log.turn)
+            appenders["idx"](log.idx)
+            code = code_ids.get(log.log)
+            if code is None:
+                code = code_ids[log.log] = len(code_ids)
+            appenders["code"](code)
+            appenders["pokemon"](string_id(log.pokemon))
+            _append_payload(appenders, log.payload, string_id)
+
+        body = bytearray(_BATTLE_HEADER.pack(seed, turn_count, winner, len(columns["code"])))
+        _pack_strings(body, [code.name for code in code_ids])
+        _pack_strings(body, string_ids)
+        for col in columns.values():
+            if sys.byteorder == "big":
+                col.byteswap()
+            body += col.tobytes()
+
+        data = zlib.compress(bytes(body), self.level)
+        self._file.write(_BLOCK_HEADER.pack(len(data)))
+        self._file.write(data)
+
+
+def _pack_strings(body: bytearray, texts: Iterable[str]) -> None:
+    """文字列の表を件数・各文字列のバイト数とともに body に追加する。"""
+    encoded = [text.encode("utf-8") for text in texts]
+    body += _STRING_LENGTH.pack(len(encoded))
+    for data in encoded:
+        body += _STRING_LENGTH.pack(len(data))
+        body += data
+
+
+def _unpack_strings(view: memoryview, offset: int) -> tuple[list[str], int]:
+    """_pack_strings() で追加した文字列の表を読み、表と読み終えた位置を返す。"""
+    (n_strings,) = _STRING_LENGTH.unpack_from(view, offset)
+    offset += _STRING_LENGTH.size
+    strings = []
+    for _ in range(n_strings):
+        (length,) = _STRING_LENGTH.unpack_from(view, offset)
+        offset += _STRING_LENGTH.size
+        strings.append(bytes(view[offset:offset + length]).decode("utf-8"))
+        offset += length
+    return strings, offset
+
+
+def _append_payload(appenders: dict, payload: Payload | None, string_id) -> None:
+    """Payload の内容を各列に追加する（該当しない列には -1 / 0 を追加する）。"""
+    name = source = target = reason = None
+    value = hp = max_hp = 0
+    count = -1
+    stats: dict = {}
+    if payload is not None:
+        reason = payload.display_reason
+        match payload:
+            case HPChangePayload():
+                value, hp, max_hp = payload.value, payload.hp, payload.max_hp
+                source = payload.source
+                reason = payload.internal_reason or reason
+            case StatChangePayload():
+                stats = payload.stats
+                source = payload.source
+            case MoveActionPayload():
+                name = payload.move
+                value = payload.value or 0
+            case FailureLogPayload():
+                name = payload.move
+            case AilmentPayload():
+                name, source = payload.ailment, payload.source
+            case VolatilePayload():
+                name, source = payload.volatile, payload.source
+            case AbilityPayload():
+                name = payload.ability
+            case ItemRevealPayload():
+                name, target = payload.item, payload.target
+            case ItemPayload():
+                name = payload.item
+            case MoveRevealPayload():
+                name, target = payload.move, payload.target
+            case FieldPayload():
+                name = payload.field
+                if payload.count is not None:
+                    count = payload.count
+            case TerastalPayload():
+                name = payload.type
+    appenders["name"](string_id(name))
+    appenders["source"](string_id(source))
+    appenders["target"](string_id(target))
+    appenders["reason"](string_id(reason))
+    appenders["value"](value)
+    appenders["hp"](hp)
+    appenders["max_hp"](max_hp)
+    appenders["count"](count)
+    for stat in _STAT_COLUMNS:
+        appenders[stat](stats.get(stat, 0))
+
+
+def read_log_archive(file: str | BinaryIO) -> Iterator[LogColumns]:
+    """`LogArchiveWriter` で書き出したファイルを先頭から1対戦ずつ読み込む。
+
+    Args:
+        file: 読み込むパス、またはバイナリのファイルオブジェクト
+
+    Yields:
+        対戦ごとのイベントログの列
+
+    Raises:
+        ValueError: ファイルの形式が異なる、またはブロックが途中で切れている場合
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            yield from _read_blocks(f)
+    else:
+        yield from _read_blocks(file)
+
+
+def _read_blocks(f: BinaryIO) -> Iterator[LogColumns]:
+    header = f.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+        raise ValueError("ログアーカイブのヘッダがありません")
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"未対応のログアーカイブ形式です: {magic!r} version={version}")
+
+    while True:
+        size_bytes = f.read(_BLOCK_HEADER.size)
+        if not size_bytes:
+            return
+        if len(size_bytes) < _BLOCK_HEADER.size:
+            raise ValueError("ログアーカイブのブロックが途中で切れています")
+        (size,) = _BLOCK_HEADER.unpack(size_bytes)
+        data = f.read(size)
+        if len(data) < size:
+            raise ValueError("ログアーカイブのブロックが途中で切れています")
+        yield _decode_block(zlib.decompress(data))
+
+
+def _decode_block(body: bytes) -> LogColumns:
+    view = memoryview(body)
+    seed, turn_count, winner, n_logs = _BATTLE_HEADER.unpack_from(view, 0)
+    code_names, offset = _unpack_strings(view, _BATTLE_HEADER.size)
+    strings, offset = _unpack_strings(view, offset)
+
+    columns = {}
+    for name, typecode in COLUMNS.items():
+        col = array(typecode)
+        size = col.itemsize * n_logs
+        col.frombytes(view[offset:offset + size])
+        if sys.byteorder == "big":
+            col.byteswap()
+        columns[name] = col
+        offset += size
+    return LogColumns(seed=seed, turn_count=turn_count, winner=winner,
+                      strings=strings, code_names=code_names, columns=columns)
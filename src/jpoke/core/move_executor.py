@@ -173,7 +173,7 @@ class MoveExecutor:
         # テストオプションによる命中率の上書き
         if self.battle.test_option.accuracy is not None:
             self.accuracy = self.battle.test_option.accuracy
-            return 100 * self.battle.random.random() < self.accuracy
+            return self._roll_hit(self.accuracy)
 
         assert ctx.defender is not None
         attacker = ctx.attacker
@@ -208,6 +208,16 @@ class MoveExecutor:
         if threshold is not None and accuracy >= threshold:
             return True
 
+        return self._roll_hit(accuracy)
+
+    def _roll_hit(self, accuracy: float) -> bool:
+        """命中率 accuracy（%）で命中の判定を行う。
+
+        `Battle.chance_controller` が設定されている場合は乱数を引かずに制御側が結果を決める。
+        """
+        controller = self.battle.chance_controller
+        if controller is not None:
+            return controller.check(accuracy / 100)
         return 100 * self.battle.random.random() < accuracy
 
     def _check_critical(self, ctx: AttackContext) -> bool:
@@ -228,7 +238,7 @@ class MoveExecutor:
         if self.battle.option.critical_mode == "always":
             critical_rank = clamp_critic(ctx.move.crit_ratio)
             self.critical_rank = critical_rank  # デバッグ用に保存
-            return self.battle.random.random() < CRIT_RATES[critical_rank]
+            return self.battle.roll_chance(CRIT_RATES[critical_rank])
 
         # 急所ランクの計算
         critical_rank = self._events.emit(
@@ -247,7 +257,7 @@ class MoveExecutor:
 
         self.critical_rank = critical_rank  # デバッグ用に保存
 
-        return self.battle.random.random() < crit_rate
+        return self.battle.roll_chance(crit_rate)
 
     def check_hit_substitute(self, ctx: AttackContext) -> bool:
         """みがわりに技が当たるかどうかを判定する。
@@ -573,10 +583,11 @@ class MoveExecutor:
 
                 if need_hit_check and not self._check_hit(ctx):
                     self.move_missed = True
-                    self.battle.add_event_log(
-                        ctx.attacker, LogCode.MOVE_MISSED,
-                        payload=FailureLogPayload(move=ctx.move.name)
-                    )
+                    if self.battle.event_logger.records(LogCode.MOVE_MISSED):
+                        self.battle.add_event_log(
+                            ctx.attacker, LogCode.MOVE_MISSED,
+                            payload=FailureLogPayload(move=ctx.move.name)
+                        )
                     self._events.emit(Event.ON_MISS, ctx)
                     break
 
@@ -633,10 +644,11 @@ class MoveExecutor:
         else:
             self.critical = self._check_critical(ctx)
             if self.critical:
-                self.battle.add_event_log(
-                    ctx.attacker, LogCode.CRITICAL_HIT,
-                    payload=MoveActionPayload(move=ctx.move.name)
-                )
+                if self.battle.event_logger.records(LogCode.CRITICAL_HIT):
+                    self.battle.add_event_log(
+                        ctx.attacker, LogCode.CRITICAL_HIT,
+                        payload=MoveActionPayload(move=ctx.move.name)
+                    )
         damage = self.battle.roll_damage(
             ctx.attacker, ctx.defender, ctx.move, critical=self.critical
         )
@@ -781,10 +793,11 @@ class MoveExecutor:
             # 最後にPPを消費した技として記録する（かなしばり・うらみ・さいはい等の参照先）。
             # ねごとのサブ技は ねごと_suppress_pp により v=0 となるためここには記録されない。
             ctx.attacker.pp_consumed_move = move
-        self.battle.add_event_log(
-            ctx.attacker,
-            LogCode.PP_CONSUMED,
-            payload=MoveActionPayload(move=move.name, value=v)
-        )
+        if self.battle.event_logger.records(LogCode.PP_CONSUMED):
+            self.battle.add_event_log(
+                ctx.attacker,
+                LogCode.PP_CONSUMED,
+                payload=MoveActionPayload(move=move.name, value=v)
+            )
         # PP消費後のフック（ヒメリのみ: PPが0になったとき回復する）
         self._events.emit(Event.ON_PP_CONSUMED, ctx, move.pp)
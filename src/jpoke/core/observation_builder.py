@@ -4,62 +4,43 @@ if TYPE_CHECKING:
     from jpoke.core import Battle, Player
     from jpoke.model import Pokemon
 
-from copy import deepcopy
-
-from jpoke.core.event_logger import EventLogger
 from jpoke.model.ability import Ability
 from jpoke.model.item import Item
 
 
-OBSERVED_MOVE_INDEXES: dict[Pokemon, dict[int, int]] = {}  # 技のインデックス変更を記録する辞書. dict[Pokemon, dict[old_index, new_index]]
-
-
 def build(battle: Battle, observer: Player, copy_logs: bool = True) -> Battle:
     """Battle インスタンスから Observation インスタンスを構築する。
 
+    観測は `Battle.copy(copy_on_write=True)` による構造共有の複製に対して隠蔽処理を
+    行って作る。イベントハンドラの登録一覧と場の状態は複製元と共有し、どちらかの側で
+    書き換える時点で初めて複製する。ログは不変な EventLog の参照を並べたリストを
+    浅くコピーするだけで（EventLog 自体と取得用の索引は複製しない）、ログの件数に
+    比例する費用はポインタのコピー分だけ残る。ポケモン・プレイヤー状態は従来通り
+    複製し、隠蔽で書き換える。
+
     Args:
         battle: Battle インスタンス
         observer: 観測対象のプレイヤー
         copy_logs: Falseの場合、event_logger/command_log（対戦開始からの
-            全履歴）をdeepcopyせず、複製先に空の新規ログを持たせる
-            （複製元のログは変更されない）。全履歴のdeepcopyはターン数に
-            比例してコストが増えるため、ログを参照しない用途で使うと
-            コピー負荷を削減できる。既定はTrueで、従来通り履歴を
-            引き継いだ複製を作る（Battle.copy()のdocstring参照）。
+            全履歴）を引き継がず、複製先に空の新規ログを持たせる
+            （複製元のログは変更されない）。ログを参照しない用途向け。
+            既定はTrueで、従来通り履歴を引き継いだ複製を作る
+            （Battle.copy()のdocstring参照）。
 
     Returns:
         Observation インスタンス
 
-    Warning:
-        本関数はモジュールグローバルな辞書 OBSERVED_MOVE_INDEXES を
-        呼び出しのたびに再代入・書き込み・読み出しする実装であり、
-        スレッドセーフではない。自己対戦データ収集などで並列化する場合は
-        ProcessPoolExecutor 等のプロセス並列を使うこと。
-        ThreadPoolExecutor 等で複数スレッドから同時に build() を呼び出すと、
-        インデックス対応表が競合して壊れる可能性がある。
-        copy_logs=Falseの場合はさらに、deepcopy実行中に battle の
-        event_logger/command_log を一時的に空へ差し替える（完了後は
-        直ちに元へ復元する）。この間に別スレッドが同じ battle の
-        event_logger/command_log へ読み書きすると競合しうる。
-
     Note:
-        copy_logs=Falseは Battle.copy(copy_logs=False) と同じ「ログを
-        一時的に空へ差し替えてから deepcopy し、完了後直ちに復元する」
-        方式を再利用している。
+        隠蔽に使う状態（技のインデックスの対応表など）は呼び出しごとに局所的に持ち、
+        複製元の属性を一時的に差し替えることもない。そのため、対戦ごとに別の
+        スレッドで build() を呼び出してよい（同じ複製元から複数のスレッドで同時に
+        観測を構築することもできる。Battle.copy() の Note 参照）。
     """
     opponent = battle.opponent(observer)
 
-    # Battle インスタンスをコピーして、相手プレイヤーの情報を隠蔽する
-    if copy_logs:
-        new = deepcopy(battle)
-    else:
-        saved_event_logger, saved_command_log = battle.event_logger, battle.command_log
-        battle.event_logger, battle.command_log = EventLogger(), []
-        try:
-            new = deepcopy(battle)
-        finally:
-            battle.event_logger, battle.command_log = saved_event_logger, saved_command_log
-    # ゲーム進行用の random は deepcopy のまま独立させる（本体と共有すると、方策が
+    # Battle インスタンスを構造共有で複製して、相手プレイヤーの情報を隠蔽する
+    new = battle.copy(copy_logs=copy_logs, copy_on_write=True)
+    # ゲーム進行用の random は複製したまま独立させる（本体と共有すると、方策が
     # choose_command() 内で sim.random を直接触った場合に、本来は技実行後（ダメージ
     # ロール・命中判定・急所判定等）に消費されるはずの乱数列を行動選択時点で先取り
     # 消費できてしまい、「これから打つ技が急所に当たるか」を打つ前に知った上で行動を
@@ -67,7 +48,7 @@ def build(battle: Battle, observer: Player, copy_logs: bool = True) -> Battle:
     # 本体と同一のオブジェクト参照に差し替える。
     # 観測用コピーは choose_command()/choose_selection() に渡され、RandomPlayer 等は
     # sim.decision_random（＝battle.decision_random）を消費して選択する。これを
-    # deepcopyのまま独立させると、技を使わず交代のみが選ばれ続けるターンでは本体の
+    # 複製のまま独立させると、技を使わず交代のみが選ばれ続けるターンでは本体の
     # battle.decision_random が一切進まず、次のターンも同じ乱数状態から観測用コピーが
     # 作られて同じ選択を繰り返す無限ループに陥る
     # （交代コマンドのみ選ばれ続け技が二度と使われない不具合の原因だった）。
@@ -84,9 +65,6 @@ def _mask(battle: Battle, player: Player):
         battle: Battle インスタンス
         player: 隠蔽対象のプレイヤー
     """
-    global OBSERVED_MOVE_INDEXES
-    OBSERVED_MOVE_INDEXES = {}
-
     state = battle.player_states[player]
 
     # 場に出ているポケモンを特定する（交代前など active_index が未設定の局面もあるため
@@ -94,8 +72,10 @@ def _mask(battle: Battle, player: Player):
     active_mon = state.team[state.active_index] if state.active_index is not None else None
 
     # チームのポケモンの情報を隠蔽する
+    # 技のインデックスの新旧対応表. dict[Pokemon, dict[old_index, new_index]]
+    move_indexes: dict[Pokemon, dict[int, int]] = {}
     for mon in state.team:
-        _mask_pokemon(battle, mon, mon is active_mon)
+        move_indexes[mon] = _mask_pokemon(battle, mon, mon is active_mon)
 
     # 選出されているポケモンのインデックスを、公開されているポケモンのみに更新する
     state.selected_indexes = [
@@ -105,17 +85,20 @@ def _mask(battle: Battle, player: Player):
     if battle.phase == "selection":
         return
 
-    _mask_command(battle, player)
+    _mask_command(battle, player, move_indexes)
     return
 
 
-def _mask_pokemon(battle: Battle, mon: Pokemon, is_active: bool) -> Pokemon:
+def _mask_pokemon(battle: Battle, mon: Pokemon, is_active: bool) -> dict[int, int]:
     """Pokemon インスタンスの情報を隠蔽する。
 
     Args:
         battle: Battle インスタンス（特性・アイテムのハンドラ登録の同期に使う）
         mon: Pokemon インスタンス
         is_active: mon が現在場に出ているかどうか
+
+    Returns:
+        技のインデックスの新旧対応表（`_mask_move()` の戻り値）
     """
     # ステータス情報を隠蔽する
     # 相手に見えるのはHP割合（HPバー）であって絶対量ではないため、
@@ -134,9 +117,7 @@ def _mask_pokemon(battle: Battle, mon: Pokemon, is_active: bool) -> Pokemon:
     _mask_item(battle, mon, is_active)
 
     # 技の情報を隠蔽する
-    _mask_move(mon)
-
-    return mon
+    return _mask_move(mon)
 
 
 def _mask_ability(battle: Battle, mon: Pokemon, is_active: bool):
@@ -192,30 +173,38 @@ def _mask_item(battle: Battle, mon: Pokemon, is_active: bool):
             mon.item.register_handlers(battle.events, mon)
 
 
-def _mask_move(mon: Pokemon):
+def _mask_move(mon: Pokemon) -> dict[int, int]:
     """技情報を隠蔽する。
 
     Args:
         mon: Pokemon インスタンス
 
+    Returns:
+        公開済みの技の新旧インデックスの対応表. dict[old_index, new_index]
+
     Note:
         技のリストを作り直すため、そのままだとインデックス情報が壊れてコマンドとの対応関係が壊れてしまう。
-        そこで NEW_MOVE_IDNEXES に新旧インデックスを記録しておき、コマンドを隠蔽する際に利用する。
+        そこで新旧インデックスの対応表を返し、コマンドを隠蔽する際に利用する。
     """
-    global OBSERVED_MOVE_INDEXES
-    OBSERVED_MOVE_INDEXES[mon] = {}
-
+    indexes: dict[int, int] = {}
     new_moves = []
     for i, move in enumerate(mon.moves):
         if move.revealed:
             new_moves.append(move)
-            new_index = len(new_moves) - 1
-            OBSERVED_MOVE_INDEXES[mon][i] = new_index
+            indexes[i] = len(new_moves) - 1
 
     mon.moves = new_moves
+    return indexes
+
 
+def _mask_command(battle: Battle, player: Player, move_indexes: dict[Pokemon, dict[int, int]]):
+    """コマンドの情報を隠蔽する。
 
-def _mask_command(battle: Battle, player: Player):
+    Args:
+        battle: Battle インスタンス
+        player: 隠蔽対象のプレイヤー
+        move_indexes: ポケモンごとの技の新旧インデックスの対応表（`_mask()` 参照）
+    """
     state = battle.player_states[player]
     active = state.active
 
@@ -234,7 +223,7 @@ def _mask_command(battle: Battle, player: Player):
         ):
             state.required_command_type = "move"
 
-    observed_move_indexes = OBSERVED_MOVE_INDEXES[active]
+    observed_move_indexes = move_indexes[active]
 
     # last_available_commandsを隠蔽する。これは観測盤面における合法手として扱われる。
     commands = []
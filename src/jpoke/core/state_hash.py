@@ -0,0 +1,202 @@
+"""Battle の局面を表す64bitのハッシュ値（Zobrist ハッシュ）。
+
+局面を「特徴」（ポケモンのHP・状態異常・ランク補正・揮発性状態・持ち物・PP、
+プレイヤーの場のポケモンと選出、場の状態のターン数、ターン数とフェーズ）の集合で表し、
+特徴ごとに決めた64bitの乱数値（`zobrist_key`）の XOR をハッシュ値とする。
+XOR は順序によらないため、異なる手順で同じ局面に到達した場合も同じ値になる。
+
+ハッシュ値は構成要素（チームの各ポケモン・各プレイヤーの状態・各場の状態・
+ターン数とフェーズ）ごとの部分ハッシュの XOR として `StateHasher` が保持し、
+変更のあった構成要素の部分ハッシュだけを差し替えて更新する。
+
+- ポケモンの状態は、HP・ランク・状態異常・揮発性状態・持ち物を変更する各マネージャーの
+  窓口（`StatusManager.modify_hp` / `modify_stats`、`AilmentManager.apply` / `remove`、
+  `VolatileManager.apply` / `remove`、`ItemManager` の持ち物の変更、交代）から
+  `Battle._touch_state_hash()` を通じて更新する。
+- 場のポケモン・プレイヤーの状態・場の状態・ターン数とフェーズは、ハンドラが
+  属性（揮発性状態のカウンター、PP、場の状態のターン数等）を直接書き換えることが
+  あり、書き換えを1か所で捕捉できないため、ハッシュ値を取得するたびに部分ハッシュを
+  計算し直す（控えのポケモンに比べて数が少ないため、コストは小さい）。
+
+`check=True` の検査モードでは、取得のたびに局面全体からハッシュ値を計算し直し、
+差分更新の結果と一致することを確かめる（テスト用）。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Hashable, Iterator
+if TYPE_CHECKING:
+    from jpoke.core import Battle
+    from jpoke.model import Pokemon
+
+import hashlib
+from functools import lru_cache
+
+from .field_manager import BaseFieldManager
+
+
+@lru_cache(maxsize=None)
+def zobrist_key(*feature: Hashable) -> int:
+    """特徴に対応する64bitの乱数値を返す。
+
+    特徴の repr を BLAKE2b でハッシュ化して作るため、プロセス（PYTHONHASHSEED）を
+    跨いでも同じ値になる。
+
+    Args:
+        *feature: 特徴を表す値の並び（文字列・整数・None・それらのタプル）
+
+    Returns:
+        64bit の整数
+    """
+    digest = hashlib.blake2b(repr(feature).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def pokemon_hash(mon: Pokemon, slot: tuple[int, int]) -> int:
+    """ポケモン1体の部分ハッシュを計算する。
+
+    Args:
+        mon: 対象のポケモン
+        slot: (プレイヤーインデックス, チーム内インデックス)
+
+    Returns:
+        ポケモンの各特徴の乱数値の XOR
+    """
+    key = zobrist_key
+    h = key(slot, "name", mon.name)
+    h ^= key(slot, "hp", mon.hp)
+    h ^= key(slot, "ailment", mon.ailment.name, mon.ailment.count)
+    h ^= key(slot, "item", mon.item.name)
+    h ^= key(slot, "ability", mon.ability.name)
+    h ^= key(slot, "terastal", mon.is_terastallized)
+    for stat, value in mon.boosts.items():
+        if value:
+            h ^= key(slot, "boost", stat, value)
+    for name, volatile in mon.volatiles.items():
+        h ^= key(slot, "volatile", name, volatile.count, volatile.hp, volatile.move_name)
+    for i, move in enumerate(mon.moves):
+        h ^= key(slot, "move", i, move.name, move.pp)
+    return h
+
+
+def _field_manager_hash(manager: BaseFieldManager, tag: Hashable) -> int:
+    """場の状態のマネージャー1つの部分ハッシュを計算する。"""
+    h = 0
+    # `fields` プロパティは共有中の Field を複製するため、読み取りには `_fields` を使う
+    for name, field in manager._fields.items():
+        if field.count:
+            h ^= zobrist_key(tag, name, field.count, field.heal, field.damage)
+    return h
+
+
+def _pokemon_components(battle: Battle) -> Iterator[tuple[Hashable, int]]:
+    """チームの全ポケモンの (構成要素のキー, 部分ハッシュ) を返す。"""
+    for p, state in enumerate(battle._player_states):
+        for t, mon in enumerate(state.team):
+            yield ("pokemon", p, t), pokemon_hash(mon, (p, t))
+
+
+def _refreshed_components(battle: Battle) -> Iterator[tuple[Hashable, int]]:
+    """取得のたびに計算し直す構成要素の (キー, 部分ハッシュ) を返す。"""
+    for p, state in enumerate(battle._player_states):
+        index = state.active_index
+        if index is not None:
+            yield ("pokemon", p, index), pokemon_hash(state.team[index], (p, index))
+        yield ("player", p), zobrist_key(
+            "player", p, index, tuple(state.selected_indexes), state.interrupt.name,
+        )
+    yield ("weather",), _field_manager_hash(battle.weather_manager, "weather")
+    yield ("terrain",), _field_manager_hash(battle.terrain_manager, "terrain")
+    yield ("global",), _field_manager_hash(battle.global_manager, "global")
+    for p, manager in enumerate(battle.side_managers):
+        yield ("side", p), _field_manager_hash(manager, ("side", p))
+    yield ("turn",), zobrist_key("turn", battle.turn, battle.phase)
+
+
+def compute_state_hash(battle: Battle) -> int:
+    """局面全体からハッシュ値を計算する（差分更新を使わない）。
+
+    Args:
+        battle: 対象のバトル
+
+    Returns:
+        64bit のハッシュ値
+    """
+    parts = dict(_pokemon_components(battle))
+    parts.update(_refreshed_components(battle))
+    h = 0
+    for value in parts.values():
+        h ^= value
+    return h
+
+
+class StateHasher:
+    """ハッシュ値を構成要素ごとの部分ハッシュとして保持し、差分更新する。
+
+    `Battle.enable_state_hash()` が作成し、`Battle.state_hasher` に保持される。
+    Battle への参照を持たない。`Battle.copy()` は `copy()` で複製したものを複製先に持たせる。
+
+    Attributes:
+        check: True の場合、取得のたびに局面全体から計算し直した値と照合する
+        value: 最後に更新した時点のハッシュ値
+    """
+
+    def __init__(self, battle: Battle, check: bool = False):
+        self.check: bool = check
+        self._parts: dict[Hashable, int] = dict(_pokemon_components(battle))
+        self._parts.update(_refreshed_components(battle))
+        self.value: int = 0
+        for h in self._parts.values():
+            self.value ^= h
+
+    def copy(self) -> StateHasher:
+        """部分ハッシュを複製した StateHasher を返す（複製元の更新は複製先に影響しない）。"""
+        new = StateHasher.__new__(StateHasher)
+        new.check = self.check
+        new._parts = dict(self._parts)
+        new.value = self.value
+        return new
+
+    def _set(self, key: Hashable, h: int) -> None:
+        """構成要素の部分ハッシュを差し替え、差分をハッシュ値に反映する。"""
+        old = self._parts.get(key, 0)
+        if old != h:
+            self.value ^= old ^ h
+            self._parts[key] = h
+
+    def update_pokemon(self, battle: Battle, mon: Pokemon) -> None:
+        """ポケモン1体の部分ハッシュを計算し直す。
+
+        Args:
+            battle: 対象のバトル
+            mon: 状態が変わったポケモン（バトルのチームにいない場合は何もしない）
+        """
+        for p, state in enumerate(battle._player_states):
+            for t, member in enumerate(state.team):
+                if member is mon:
+                    self._set(("pokemon", p, t), pokemon_hash(mon, (p, t)))
+                    return
+
+    def current(self, battle: Battle) -> int:
+        """現在の局面のハッシュ値を返す。
+
+        Args:
+            battle: 対象のバトル
+
+        Returns:
+            64bit のハッシュ値
+
+        Raises:
+            RuntimeError: 検査モードで、差分更新の結果が局面全体から計算した値と
+                一致しない場合
+        """
+        for key, h in _refreshed_components(battle):
+            self._set(key, h)
+        if self.check:
+            expected = compute_state_hash(battle)
+            if expected != self.value:
+                stale = [
+                    key for key, h in _pokemon_components(battle) if self._parts.get(key) != h
+                ]
+                raise RuntimeError(
+                    f"状態ハッシュの差分更新が局面と一致しません（更新漏れ: {stale}）"
+                )
+        return self.value
@@ -92,16 +92,18 @@ class StatusManager:
         v = target._modify_hp_raw(v)
 
         if v != 0:
-            self.battle.add_event_log(
-                target, LogCode.HP_CHANGED,
-                payload=HPChangePayload(
-                    value=v,
-                    hp=target.hp,
-                    max_hp=target.max_hp,
-                    source=source.name if source else None,
-                    internal_reason=reason,
-                ),
-            )
+            self.battle._touch_state_hash(target)
+            if self.battle.event_logger.records(LogCode.HP_CHANGED):
+                self.battle.add_event_log(
+                    target, LogCode.HP_CHANGED,
+                    payload=HPChangePayload(
+                        value=v,
+                        hp=target.hp,
+                        max_hp=target.max_hp,
+                        source=source.name if source else None,
+                        internal_reason=reason,
+                    ),
+                )
 
         if v < 0:
             if target.fainted:
@@ -168,25 +170,28 @@ class StatusManager:
             actual_changes[stat] = actual_value
 
         if actual_changes:
+            self.battle._touch_state_hash(target)
             # うっぷんばらし用: ランクが実際に下がった場合にフラグを立てる
             if any(v < 0 for v in actual_changes.values()):
                 target.stat_lowered_this_turn = True
             # みわくのボイス・しっとのほのお用: ランクが実際に上がった場合にフラグを立てる
             if any(v > 0 for v in actual_changes.values()):
                 target.stat_raised_this_turn = True
-            self.battle.add_event_log(
-                target, LogCode.STAT_CHANGED,
-                payload=StatChangePayload(
-                    stats=actual_changes,
-                    source=source.name if source else None,
-                    display_reason=reason,
-                ),
-            )
+            if self.battle.event_logger.records(LogCode.STAT_CHANGED):
+                self.battle.add_event_log(
+                    target, LogCode.STAT_CHANGED,
+                    payload=StatChangePayload(
+                        stats=actual_changes,
+                        source=source.name if source else None,
+                        display_reason=reason,
+                    ),
+                )
             self._events.emit(Event.ON_MODIFY_STAT, ctx, actual_changes)
         else:
-            self.battle.add_event_log(
-                target, LogCode.STAT_CHANGE_BLOCKED,
-                payload=FailureLogPayload(display_reason=reason),
-            )
+            if self.battle.event_logger.records(LogCode.STAT_CHANGE_BLOCKED):
+                self.battle.add_event_log(
+                    target, LogCode.STAT_CHANGE_BLOCKED,
+                    payload=FailureLogPayload(display_reason=reason),
+                )
 
         return actual_changes
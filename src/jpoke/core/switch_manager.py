@@ -4,10 +4,12 @@
 """
 
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 if TYPE_CHECKING:
     from . import Battle, EventManager, Player, PlayerState
 
+from contextlib import contextmanager
+
 from jpoke.model.pokemon import Pokemon
 from jpoke.enums import Interrupt, LogCode
 from jpoke.exceptions import InvalidCommandError
@@ -355,6 +357,7 @@ class SwitchManager:
 
         mon.reset_on_switch_in()
         self._register_handlers_on_switch_in(mon)
+        self.battle._touch_state_hash(mon)
 
         self.battle.add_event_log(mon, LogCode.SWITCHED_IN)
 
@@ -382,6 +385,7 @@ class SwitchManager:
         # （例: トレースでコピーした特性を持ったまま退場した場合）。
         self._unregister_handlers_on_switch_out(mon)
         mon.reset_on_switch_out()
+        self.battle._touch_state_hash(mon)
 
         self.battle.add_event_log(mon, LogCode.SWITCHED_OUT)
 
@@ -428,3 +432,36 @@ class SwitchManager:
         mon.ability.unregister_handlers(self._events, mon)
         mon.item.unregister_handlers(self._events, mon)
         mon.ailment.unregister_handlers(self._events, mon)
+
+    @contextmanager
+    def assume_switched_in(self, mon: Pokemon) -> Iterator[None]:
+        """区間中だけ、mon が場のポケモンと入れ替わった盤面にする（補正の計算用）。
+
+        場のポケモンと mon の特性・アイテム・状態異常のハンドラを入れ替え、
+        場に出ているポケモンを mon にするだけで、交代時のイベントの発火・ログの記録・
+        揮発状態の解除は行わない。区間を抜けると場のポケモンとハンドラの登録を
+        区間に入る前の状態（登録順を含む）に戻す。mon が既に場に出ている場合は何もしない。
+
+        Args:
+            mon: 場に出たものとして扱う控えのポケモン
+        """
+        state = self.battle._player_states[self.battle._get_player_index(mon)]
+        old_index = state.active_index
+        active = state.team[old_index] if old_index is not None else None
+        if active is mon:
+            yield
+            return
+
+        handlers = dict(self._events.handlers)
+        if active is not None:
+            self._unregister_handlers_on_switch_out(active)
+        state.active_index = state.team.index(mon)
+        self._register_handlers_on_switch_in(mon)
+        try:
+            yield
+        finally:
+            state.active_index = old_index
+            # 解除・再登録ではハンドラの登録順が変わるため、差し替え前のリストに戻す
+            # （ハンドラリストはその場で変更されないため、そのまま戻してよい）
+            self._events.handlers.clear()
+            self._events.handlers.update(handlers)
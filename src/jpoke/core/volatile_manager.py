@@ -102,13 +102,15 @@ class VolatileManager:
                 )
             return False
 
-        self.battle.add_event_log(
-            target,
-            LogCode.VOLATILE_APPLIED,
-            payload=VolatilePayload(volatile=resolved_name, source=source.name if source else None)
-        )
+        if self.battle.event_logger.records(LogCode.VOLATILE_APPLIED):
+            self.battle.add_event_log(
+                target,
+                LogCode.VOLATILE_APPLIED,
+                payload=VolatilePayload(volatile=resolved_name, source=source.name if source else None)
+            )
         target.volatiles[resolved_name] = Volatile(resolved_name, count=count, **kwargs)
         target.volatiles[resolved_name].register_handlers(self._events, target)
+        self.battle._touch_state_hash(target)
 
         # 付与後フック
         self._events.emit(
@@ -136,6 +138,7 @@ class VolatileManager:
             return False
 
         volatile = target.volatiles.pop(name)
+        self.battle._touch_state_hash(target)
 
         # 終了時ハンドラ（例: ほろびのうた_faint）が modify_hp で致死ダメージを
         # 与えて即座に勝敗を決めてしまうと、VOLATILE_REMOVED ログより先に
@@ -151,11 +154,12 @@ class VolatileManager:
             )
 
             volatile.unregister_handlers(self._events, target)
-            self.battle.add_event_log(
-                target,
-                LogCode.VOLATILE_REMOVED,
-                payload=VolatilePayload(volatile=name, display_reason=reason)
-            )
+            if self.battle.event_logger.records(LogCode.VOLATILE_REMOVED):
+                self.battle.add_event_log(
+                    target,
+                    LogCode.VOLATILE_REMOVED,
+                    payload=VolatilePayload(volatile=name, display_reason=reason)
+                )
         finally:
             self.battle.end_deferred_winner_log()
 
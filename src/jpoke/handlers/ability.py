@@ -500,8 +500,7 @@ def あくしゅう_maybe_flinch(battle: Battle, ctx: AttackContext, value: Any)
         or ctx.move.name in _INNATE_FLINCH_MOVES
     ):
         return HandlerReturn(value=value)
-    chance = battle.resolve_secondary_chance(ctx, 0.1)
-    if battle.random.random() < chance:
+    if battle.roll_chance(battle.resolve_secondary_chance(ctx, 0.1)):
         battle.volatile_manager.apply(defender, "ひるみ", source=ctx.attacker)
     return HandlerReturn(value=value)
 
@@ -2928,7 +2927,7 @@ def どくしゅ_maybe_poison_on_contact(battle: Battle, ctx: AttackContext, val
     """
     if (
         not battle.query.is_contact(ctx)
-        or battle.random.random() >= battle.resolve_secondary_chance(ctx, 0.3)
+        or not battle.roll_chance(battle.resolve_secondary_chance(ctx, 0.3))
     ):
         return HandlerReturn(value=value)
 
@@ -2949,7 +2948,7 @@ def どくのくさり_maybe_badly_poison(battle: Battle, ctx: AttackContext, va
     """
     if ctx.substitute_damage:
         return HandlerReturn(value=value)
-    if battle.random.random() < battle.resolve_secondary_chance(ctx, 0.3):
+    if battle.roll_chance(battle.resolve_secondary_chance(ctx, 0.3)):
         battle.ailment_manager.apply(
             ctx.defender, "もうどく", source=ctx.attacker,
         )
@@ -621,8 +621,7 @@ def flinch_on_hit_10pct(battle: Battle, ctx: AttackContext, value: Any) -> Handl
         and not ctx.move.has_flag("ohko")
         and ctx.move.name not in _INNATE_FLINCH_MOVES
     ):
-        chance = battle.resolve_secondary_chance(ctx, 0.1)
-        if battle.random.random() < chance:
+        if battle.roll_chance(battle.resolve_secondary_chance(ctx, 0.1)):
             battle.volatile_manager.apply(defender, "ひるみ", source=ctx.attacker)
     return HandlerReturn(value=value)
 
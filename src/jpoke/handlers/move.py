@@ -66,7 +66,7 @@ def modify_attacker_stats(battle: Battle,
     resolve_secondary_chance に target="attacker" を指定する。
     """
     chance = battle.resolve_secondary_chance(ctx, chance, target="attacker")
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     result = battle.modify_stats(ctx.attacker, stats, source=ctx.attacker)
     if isinstance(value, bool):
@@ -89,7 +89,7 @@ def modify_defender_stats(battle: Battle,
     瀕死ガードと同様）。
     """
     chance = battle.resolve_secondary_chance(ctx, chance)
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     if ctx.defender.fainted:
         result = {}
@@ -107,7 +107,7 @@ def apply_ailment_to_defender(battle: Battle,
                               count: int | None = None,
                               chance: float = 1) -> HandlerReturn:
     chance = battle.resolve_secondary_chance(ctx, chance)
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     return HandlerReturn(value=battle.ailment_manager.apply(
         ctx.defender, ailment, count=count, source=ctx.attacker
@@ -125,7 +125,7 @@ def apply_volatile_to_attacker(battle: Battle,
     resolve_secondary_chance に target="attacker" を指定する。
     """
     chance = battle.resolve_secondary_chance(ctx, chance, target="attacker")
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     return HandlerReturn(value=battle.volatile_manager.apply(
         ctx.attacker, volatile, count=count, source=ctx.attacker, **kwargs
@@ -140,7 +140,7 @@ def apply_volatile_to_defender(battle: Battle,
                                chance: float = 1,
                                **kwargs) -> HandlerReturn:
     chance = battle.resolve_secondary_chance(ctx, chance)
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     return HandlerReturn(value=battle.volatile_manager.apply(
         ctx.defender, volatile, count=count, source=ctx.attacker, **kwargs
@@ -153,7 +153,7 @@ def apply_confusion_to_defender(battle: Battle,
                                chance: float = 1) -> HandlerReturn:
     """こんらん状態をランダムターン数（2〜5）で防御者に付与するヘルパー。"""
     chance = battle.resolve_secondary_chance(ctx, chance)
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     return HandlerReturn(value=battle.volatile_manager.apply_confusion(
         ctx.defender, source=ctx.attacker
@@ -383,7 +383,7 @@ def うたかたのアリア_cure_defender_burn(battle: Battle, ctx: AttackConte
     りんぷん・おんみつマントを持つ相手には発動しない（`resolve_secondary_chance` 経由で判定）。
     """
     chance = battle.resolve_secondary_chance(ctx, 1)
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     mon = ctx.defender
     if mon.ailment.name == "やけど":
@@ -653,7 +653,7 @@ def かかとおとし_apply_confusion(battle: Battle, ctx: AttackContext, value
     通常のこんらん付与技（2〜5ターン）と異なり、この技のこんらんは3〜5ターン継続する。
     """
     chance = battle.resolve_secondary_chance(ctx, 0.3)
-    if chance < 1 and battle.random.random() >= chance:
+    if chance < 1 and not battle.roll_chance(chance):
         return HandlerReturn(value=value)
     count = battle.random.randint(3, 5)
     return HandlerReturn(value=battle.volatile_manager.apply(
@@ -0,0 +1,137 @@
+"""相手の非公開情報の決定化（事前分布からのサンプリング）。
+
+`choose_command()` が受け取る観測では、相手ポケモンの未公開の技・特性・持ち物・
+性格・努力値と未公開の選出が隠蔽されている。`sample_opponent()` は観測の複製に
+対し、隠蔽された情報を `OpponentPrior`（使用率などの重み付きの候補）から1通り
+サンプリングして書き込む（決定化）。木探索プレイヤーは `n_determinizations` 通りの
+決定化した盤面で探索し、結果を平均することで、1つの推定に依存しない手を選ぶ。
+
+公開済みの情報（公開された技・特性・持ち物・選出）は書き換えない。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Hashable, TypeVar
+if TYPE_CHECKING:
+    from random import Random
+    from jpoke import Battle, Player
+    from jpoke.model import Pokemon
+
+from dataclasses import dataclass, field
+
+from jpoke.model import Move
+from jpoke.model.ability import Ability
+from jpoke.model.item import Item
+from jpoke.types import AbilityName, ItemName, MoveName, Nature, PokemonName
+
+__all__ = [
+    "OpponentPrior",
+    "sample_opponent",
+]
+
+K = TypeVar("K", bound=Hashable)
+
+
+@dataclass
+class OpponentPrior:
+    """相手ポケモンの非公開情報の事前分布。
+
+    ポケモン名ごとに、候補とその重み（使用率など。合計が1である必要はない）を指定する。
+    指定のないポケモン・項目は、技は覚えられる技（`Pokemon.learnset`）、特性は図鑑の
+    特性からの一様分布とし、持ち物・性格と努力値は観測のまま（持ち物なし・無補正）とする。
+
+    Attributes:
+        moves: ポケモン名ごとの技の重み。公開済みの技と合わせて `n_moves` 個になるまで、
+            公開済みの技以外から重みに比例して重複なく選ぶ
+        abilities: ポケモン名ごとの特性の重み
+        items: ポケモン名ごとの持ち物の重み。観測で持ち物が空（未公開、または持ち物なし）の
+            ポケモンにだけ適用する
+        spreads: ポケモン名ごとの (性格, 努力値6要素) の組の重み
+        n_moves: 1体あたりの技の数
+    """
+    moves: dict[PokemonName, dict[MoveName, float]] = field(default_factory=dict)
+    abilities: dict[PokemonName, dict[AbilityName, float]] = field(default_factory=dict)
+    items: dict[PokemonName, dict[ItemName, float]] = field(default_factory=dict)
+    spreads: dict[PokemonName, dict[tuple[Nature, tuple[int, ...]], float]] = field(default_factory=dict)
+    n_moves: int = 4
+
+    def move_weights(self, mon: Pokemon) -> dict[MoveName, float]:
+        """mon の技の候補と重みを返す（指定がなければ覚えられる技の一様分布）。"""
+        if mon.name in self.moves:
+            return self.moves[mon.name]
+        return {name: 1.0 for name in sorted(mon.learnset)}
+
+    def ability_weights(self, mon: Pokemon) -> dict[AbilityName, float]:
+        """mon の特性の候補と重みを返す（指定がなければ図鑑の特性の一様分布）。"""
+        if mon.name in self.abilities:
+            return self.abilities[mon.name]
+        return {name: 1.0 for name in mon.data.abilities}
+
+
+def sample_opponent(battle: Battle, opponent: Player, prior: OpponentPrior, rng: Random) -> None:
+    """opponent の隠蔽された情報を prior からサンプリングし、battle に書き込む。
+
+    battle は観測の複製であること（観測そのものや実際の対戦に書き込まないこと）。
+    選出は、公開済みの選出に、未公開のポケモンから選出数に達するまで一様に選んで加える。
+
+    Args:
+        battle: 書き込み先の盤面
+        opponent: 決定化する相手プレイヤー
+        prior: 非公開情報の事前分布
+        rng: サンプリングに使う乱数生成器
+    """
+    state = battle.player_states[opponent]
+    active = state.team[state.active_index] if state.active_index is not None else None
+    for mon in state.team:
+        _sample_pokemon(battle, mon, mon is active, prior, rng)
+
+    n_missing = battle.n_selected - len(state.selected_indexes)
+    if n_missing > 0:
+        candidates = [i for i in range(len(state.team)) if i not in state.selected_indexes]
+        state.selected_indexes += rng.sample(candidates, min(n_missing, len(candidates)))
+
+
+def _sample_pokemon(battle: Battle, mon: Pokemon, is_active: bool, prior: OpponentPrior, rng: Random) -> None:
+    """ポケモン1体の隠蔽された技・特性・持ち物・性格と努力値をサンプリングする。"""
+    n_missing = prior.n_moves - len(mon.moves)
+    if n_missing > 0:
+        known = {move.name for move in mon.moves}
+        weights = {name: w for name, w in prior.move_weights(mon).items() if name not in known}
+        mon.moves += [Move(name) for name in _weighted_sample(weights, n_missing, rng)]
+
+    # 観測では、公開前の特性・持ち物は名前のない（空の）インスタンスに差し替えられている
+    if not mon.ability.name:
+        names = _weighted_sample(prior.ability_weights(mon), 1, rng)
+        if names:
+            # 場のポケモンはハンドラの登録を差し替える（observation_builder._mask_ability と同様）
+            if is_active:
+                mon.ability.unregister_handlers(battle.events, mon)
+            mon.ability = Ability(names[0])
+            if is_active:
+                mon.ability.register_handlers(battle.events, mon)
+
+    if not mon.item.name and mon.name in prior.items:
+        names = _weighted_sample(prior.items[mon.name], 1, rng)
+        if names:
+            if is_active:
+                mon.item.unregister_handlers(battle.events, mon)
+            mon.item = Item(names[0])
+            if is_active:
+                mon.item.register_handlers(battle.events, mon)
+
+    if mon.name in prior.spreads:
+        spreads = _weighted_sample(prior.spreads[mon.name], 1, rng)
+        if spreads:
+            nature, evs = spreads[0]
+            mon.set_nature(nature, hp_policy="keep_ratio")
+            mon.set_evs(list(evs), hp_policy="keep_ratio")
+
+
+def _weighted_sample(weights: dict[K, float], k: int, rng: Random) -> list[K]:
+    """重みに比例して、候補から重複なく最大 k 個を選ぶ。"""
+    candidates = {key: w for key, w in weights.items() if w > 0}
+    chosen: list[K] = []
+    while candidates and len(chosen) < k:
+        keys = list(candidates)
+        key = rng.choices(keys, weights=[candidates[key] for key in keys])[0]
+        chosen.append(key)
+        del candidates[key]
+    return chosen
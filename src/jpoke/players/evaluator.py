@@ -0,0 +1,84 @@
+"""葉ノードの盤面をまとめて評価する評価器。
+
+木探索の葉ノードを1つずつ `evaluate()` で評価する代わりに、同じ親ノードから展開した
+盤面をまとめて `BatchEvaluator.evaluate_batch()` に渡す（`TreeSearchPlayer(evaluator=...)`）。
+ニューラルネットワーク等の1回の呼び出しに固定のコストがかかる評価関数を、盤面の数だけ
+呼ばずに済む。
+
+`FeatureEvaluator` は盤面を `jpoke.core.features.extract_features()` で特徴量ベクトルに
+変換してから評価する評価器の基底クラスで、`score_features()` に特徴量の行列（盤面ごとの
+行のリスト）が渡される。`LinearEvaluator` は特徴量の重み付き和で評価する最小の実装。
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Sequence
+if TYPE_CHECKING:
+    from jpoke import Battle, Player
+
+from abc import ABC, abstractmethod
+
+from jpoke.core.features import N_FEATURES, extract_features
+
+__all__ = [
+    "BatchEvaluator",
+    "FeatureEvaluator",
+    "LinearEvaluator",
+]
+
+
+class BatchEvaluator(ABC):
+    """盤面のリストをまとめて評価する評価器の基底クラス。
+
+    決着がついた盤面は `TreeSearchPlayer` 側で ±inf として扱い、評価器には渡さない。
+    """
+
+    @abstractmethod
+    def evaluate_batch(self, battles: list[Battle], player: Player) -> list[float]:
+        """各盤面の player から見た評価値を返す（値が大きいほど player に有利）。
+
+        Args:
+            battles: 評価する盤面のリスト
+            player: 視点のプレイヤー
+
+        Returns:
+            battles と同じ順の評価値のリスト
+        """
+
+
+class FeatureEvaluator(BatchEvaluator):
+    """盤面を特徴量ベクトルに変換してから評価する評価器の基底クラス。
+
+    サブクラスは `score_features()` を実装する。
+    """
+
+    def evaluate_batch(self, battles: list[Battle], player: Player) -> list[float]:
+        return self.score_features([extract_features(battle, player) for battle in battles])
+
+    @abstractmethod
+    def score_features(self, features: list[list[float]]) -> list[float]:
+        """特徴量ベクトルの行列（盤面ごとの行のリスト）から評価値を求める。
+
+        Args:
+            features: 各行が `jpoke.core.features.FEATURE_NAMES` の順に並んだ特徴量
+
+        Returns:
+            行と同じ順の評価値のリスト
+        """
+
+
+class LinearEvaluator(FeatureEvaluator):
+    """特徴量の重み付き和で評価する評価器。
+
+    Attributes:
+        weights: 特徴量ごとの重み（長さ `N_FEATURES`）
+        bias: 評価値に加える定数
+    """
+
+    def __init__(self, weights: Sequence[float], bias: float = 0.0):
+        if len(weights) != N_FEATURES:
+            raise ValueError(f"weights の長さは {N_FEATURES} である必要があります: {len(weights)}")
+        self.weights: list[float] = list(weights)
+        self.bias: float = bias
+
+    def score_features(self, features: list[list[float]]) -> list[float]:
+        weights, bias = self.weights, self.bias
+        return [bias + sum(w * x for w, x in zip(weights, row) if x) for row in features]
@@ -5,6 +5,36 @@ from jpoke import Battle, Player
 from jpoke.enums import Command
 
 
+def min_damage(battle: Battle, player: Player, command: Command) -> int:
+    """コマンドの技で相手の場のポケモンに与える最低保証ダメージ（乱数下振れ）を返す。
+
+    `MaxDamagePlayer` の選択基準。木探索の手の並べ替えやロールアウト方策からも使う。
+
+    Args:
+        battle: 対象のバトル
+        player: コマンドを出すプレイヤー
+        command: 評価するコマンド
+
+    Returns:
+        最低保証ダメージ。技以外のコマンド（交代等）や、場にポケモンがいない場合は -1
+    """
+    if not command.is_move:
+        return -1
+    attacker = battle.get_active(player)
+    defender = battle.get_active(battle.opponent(player))
+    if attacker is None or defender is None:
+        return -1
+
+    move = battle.command_to_move(player, command)
+    damages = battle.calc_damages(
+        attacker=attacker,
+        defender=defender,
+        move=move,
+        critical=move.guaranteed_crit,  # 確定急所を考慮する
+    )
+    return damages[0] if damages else 0  # 0: 最低ダメージ
+
+
 class MaxDamagePlayer(Player):
     """自分の場のポケモンが繰り出せる技のうち、相手の場のポケモンに与える
     最低保証ダメージ（乱数下振れ）が最大になる技を選ぶプレイヤー。
@@ -21,15 +51,4 @@ class MaxDamagePlayer(Player):
 
     def _damage(self, battle: Battle, command: Command) -> int:
         """コマンドが技でない場合は選ばれないよう -1 を返す。"""
-        if not command.is_move:
-            return -1
-
-        move = battle.command_to_move(self, command)
-        opponent = battle.opponent(self)
-        damages = battle.calc_damages(
-            attacker=battle.get_active(self),
-            defender=battle.get_active(opponent),
-            move=move,
-            critical=move.guaranteed_crit,  # 確定急所を考慮する
-        )
-        return damages[0]  # 0: 最低ダメージ
+        return min_damage(battle, self, command)
@@ -0,0 +1,524 @@
+"""モンテカルロ木探索（MCTS）による木探索プレイヤー。
+
+ポケモンの対戦は両者が同時に行動を選ぶ同時手番ゲームのため、各ノードで自分と相手が
+それぞれ独立に手を選ぶ分離型（decoupled）の選択を使う。各ノードは自分・相手の
+コマンドごとの訪問回数と報酬の合計を別々に持ち、UCT（UCB1）または Exp3 で選んだ
+手の組 (自分の手, 相手の手) の子ノードへ進む。
+
+木のノードは盤面を保持せず、反復のたびに探索の最上位の盤面を複製して、木の中の手順を
+`sim.step()` で進め直す（オープンループ）。命中・急所・ダメージ乱数によって同じ手順でも
+盤面が変わるため、ノードは「手順」に対する統計を表す。
+"""
+from __future__ import annotations
+
+import math
+import pickle
+import time
+from typing import Literal
+
+from jpoke import Battle, Player
+from jpoke.enums import Command
+
+from .determinization import OpponentPrior
+from .evaluator import BatchEvaluator
+from .search_stats import SearchStats
+from .max_damage_player import min_damage
+from .tree_search_player import TreeSearchPlayer
+
+SelectionMode = Literal["uct", "exp3"]
+RolloutPolicy = Literal["random", "max_damage"]
+
+# コマンドごとの統計 [訪問回数, 報酬の合計, Exp3 の推定累積報酬]
+_VISITS, _TOTAL, _GAIN = 0, 1, 2
+
+
+class _Node:
+    """探索木の1ノード（自分・相手の手の選択の統計と子ノード）。"""
+
+    __slots__ = ("visits", "stats", "children")
+
+    def __init__(self):
+        self.visits: int = 0
+        # stats[0]: 自分の手の統計、stats[1]: 相手の手の統計
+        self.stats: tuple[dict[Command, list[float]], dict[Command, list[float]]] = ({}, {})
+        self.children: dict[tuple[Command, Command], _Node] = {}
+
+
+class MCTSPlayer(TreeSearchPlayer):
+    """分離型 UCT / Exp3 によるモンテカルロ木探索プレイヤー。
+
+    1回の反復では、探索の最上位の盤面を複製し、木の中では各ノードで自分と相手の手を
+    それぞれ選んで盤面を進め、木の外に出たら子ノードを1つ追加し、ロールアウト方策で
+    `rollout_depth` ターン進めた盤面を `evaluate()` で評価する。評価値はロジスティック
+    関数で 0〜1 の報酬（自分の勝ちが1、負けが0）に変換し、通った各ノードの自分の手には
+    報酬を、相手の手には 1 - 報酬を加算する。探索後は、探索の最上位で最も多く選ばれた
+    自分の手を返す。
+
+    `TreeSearchPlayer` のフック（`evaluate`/`fallback`/`estimate_opponent` 系/
+    `configure_sim`）はそのまま使える。`max_plies` は木の深さ（ターン数）の上限、
+    `max_nodes` / `time_budget_ms` は `n_iterations` と並ぶ探索の打ち切り条件として働く。
+    `use_rollback` / `tt_size` は使わない。
+
+    Attributes:
+        n_iterations:
+            1回の探索で行う反復の回数の上限。
+        selection:
+            各ノードでの手の選び方。"uct" は UCB1（未選択の手を優先し、以降は
+            平均報酬 + exploration * sqrt(ln N / n) が最大の手）、"exp3" は Exp3
+            （推定累積報酬の指数重みと一様分布を exp3_gamma で混ぜた確率で選ぶ）。
+            Exp3 は同時手番で混合戦略に収束しやすい。
+        exploration:
+            UCT の探索係数。
+        exp3_gamma:
+            Exp3 の一様分布の混合率（0〜1）。
+        rollout:
+            ロールアウトで両者の手を選ぶ方策。"random" は合法手からランダム、
+            "max_damage" は `MaxDamagePlayer` と同じく最低保証ダメージが最大の技。
+        rollout_depth:
+            ロールアウトで進めるターン数。0 なら子ノードの盤面をそのまま評価する。
+        reuse_tree:
+            True の場合、次のターンの探索で、前のターンの木のうち実際に選ばれた
+            (自分の手, 相手の手) の子ノードを探索の最上位として使い回す。相手の行動を
+            特定できない場合や、相手の技・ポケモンが新たに公開された場合
+            （コマンドと技の対応が変わるため）は木を作り直す。
+        iterations:
+            直近の探索で行った反復の回数。診断用。
+        reused_visits:
+            直近の探索の開始時に、使い回した木の最上位が持っていた訪問回数
+            （使い回さなかった場合は0）。診断用。
+        n_workers:
+            2以上を指定すると、探索の最上位から独立した木を `n_workers` 個の
+            プロセスでそれぞれ探索し、最上位の自分の手の訪問回数と報酬の合計を
+            足し合わせて手を選ぶ（ルート並列化）。`n_iterations` / `max_nodes` /
+            `time_budget_ms` はプロセスごとに適用し、`iterations` /
+            `nodes_expanded` は全プロセスの合計になる。各プロセスの木は異なる
+            乱数系列で探索する。木はプロセス側に残らないため、`reuse_tree` は
+            働かない。プロセスプールの扱いは `TreeSearchPlayer` と同じ。
+        n_determinizations:
+            1以上を指定すると、相手の隠蔽された情報をサンプリングした
+            `n_determinizations` 通りの盤面（`TreeSearchPlayer` の決定化と同じ）を
+            反復ごとに順番に使い、1つの木を共有して探索する（情報集合 MCTS）。
+            相手の合法手は盤面ごとに異なりうるため、各ノードでは、その反復の盤面で
+            選べる手の中から選ぶ。決定化した盤面で探索した木は使い回さない。
+    """
+
+    def __init__(self,
+                 username: str,
+                 n_iterations: int = 200,
+                 time_budget_ms: float | None = None,
+                 max_nodes: int | None = None,
+                 max_plies: int = 10,
+                 selection: SelectionMode = "uct",
+                 exploration: float = math.sqrt(2),
+                 exp3_gamma: float = 0.1,
+                 rollout: RolloutPolicy = "random",
+                 rollout_depth: int = 3,
+                 reuse_tree: bool = True,
+                 n_workers: int | None = None,
+                 n_determinizations: int = 0,
+                 opponent_prior: OpponentPrior | None = None,
+                 evaluator: BatchEvaluator | None = None,
+                 profile: bool = False):
+        super().__init__(username=username, max_plies=max_plies, max_nodes=max_nodes,
+                         time_budget_ms=time_budget_ms, n_workers=n_workers,
+                         n_determinizations=n_determinizations, opponent_prior=opponent_prior,
+                         evaluator=evaluator, profile=profile)
+        if selection not in ("uct", "exp3"):
+            raise ValueError(f"selection は 'uct' または 'exp3' で指定してください: {selection}")
+        if rollout not in ("random", "max_damage"):
+            raise ValueError(f"rollout は 'random' または 'max_damage' で指定してください: {rollout}")
+        self.n_iterations: int = n_iterations
+        self.selection: SelectionMode = selection
+        self.exploration: float = exploration
+        self.exp3_gamma: float = exp3_gamma
+        self.rollout: RolloutPolicy = rollout
+        self.rollout_depth: int = rollout_depth
+        self.reuse_tree: bool = reuse_tree
+        self.iterations: int = 0
+        self.reused_visits: int = 0
+        # 前のターンの探索の木と、次のターンに子ノードを特定するための情報
+        self._tree: _Node | None = None
+        self._tree_turn: tuple[int, int] | None = None
+        self._tree_command: Command | None = None
+        self._tree_opponent_labels: dict[Command, tuple[str, str]] = {}
+        self._tree_opponent_active: str | None = None
+        self._tree_revealed: tuple | None = None
+
+    def __getstate__(self) -> dict:
+        # 子プロセスでは前のターンの木を使わないため送らない
+        state = super().__getstate__()
+        state["_tree"] = None
+        return state
+
+    def choose_command(self, battle: Battle) -> Command:
+        # 割り込み交代はフォールバック方策で即決する。
+        if self._searching:
+            return self.fallback(battle)
+
+        self._searching = True
+        try:
+            with self._profiling():
+                return self._choose_command(battle)
+        finally:
+            self._searching = False
+
+    def _choose_command(self, battle: Battle) -> Command:
+        """探索して手を選び、次のターンに使い回す木を記録する。"""
+        positions = self._root_positions(battle)
+        if not positions:
+            self._tree = None
+            return self.fallback(battle)
+        my_commands, opp_commands = positions[0][1], positions[0][2]
+
+        if self._parallel() or self.n_determinizations:
+            # 木は子プロセス・決定化した盤面に依存するため使い回さない
+            self.reused_visits = 0
+            self._tree = None
+            if self._parallel():
+                root = self._search_parallel(positions)
+            else:
+                root = self._search(positions, _Node())
+            return self._most_visited(root, my_commands)
+
+        root = self._reused_root(battle) if self.reuse_tree else None
+        self.reused_visits = root.visits if root is not None else 0
+        root = self._search(positions, root or _Node())
+        command = self._most_visited(root, my_commands)
+
+        if battle.phase != "action":
+            # 交代フェーズの探索は1手目の後を葉として評価するため、使い回さない
+            self._tree = None
+            return command
+        self._tree = root
+        self._tree_turn = (battle.seed, battle.turn)
+        self._tree_command = command
+        self._tree_opponent_labels = {
+            cmd: self._command_label(battle, battle.opponent(self), cmd) for cmd in opp_commands
+        }
+        self._tree_opponent_active = battle.get_active(battle.opponent(self)).name
+        self._tree_revealed = self._revealed_signature(battle)
+        return command
+
+    def evaluate_commands(self, battle: Battle) -> dict[Command, float]:
+        """現在の盤面で探索し、自分の各合法手の平均報酬（0〜1）を返す（デバッグ用）。
+
+        前のターンの木は使わず、`choose_command()` の木の使い回しにも影響しない。
+        相手の合法手が未公開で空の場合は空の辞書を返す。
+        """
+        positions = self._root_positions(battle)
+        if not positions:
+            return {}
+
+        saved = (self.nodes_expanded, self.iterations, self._searching)
+        self._searching = True
+        try:
+            if self._parallel():
+                root = self._search_parallel(positions)
+            else:
+                root = self._search(positions, _Node())
+        finally:
+            self.nodes_expanded, self.iterations, self._searching = saved
+        stats = root.stats[0]
+        return {
+            cmd: stats[cmd][_TOTAL] / stats[cmd][_VISITS]
+            for cmd in positions[0][1] if cmd in stats and stats[cmd][_VISITS]
+        }
+
+    def _root_positions(self, battle: Battle) -> list[tuple[Battle, list[Command], list[Command]]]:
+        """探索の最上位の盤面と、各盤面の自分・相手の合法手を返す（合法手が空なら空のリスト）。
+
+        `n_determinizations` を指定した場合は決定化した盤面、それ以外は battle のみ。
+        """
+        if self.n_determinizations:
+            return self._determinized_positions(battle)
+        my_commands, opp_commands = self._toplevel_commands(battle)
+        if not my_commands or not opp_commands:
+            return []
+        return [(battle, my_commands, opp_commands)]
+
+    def _search(self,
+                positions: list[tuple[Battle, list[Command], list[Command]]],
+                root: _Node) -> _Node:
+        """root を探索の最上位として、打ち切り条件まで反復を繰り返す。
+
+        反復ごとに positions の盤面を順番に使う。
+        """
+        self.nodes_expanded = 0
+        self.iterations = 0
+        self._deadline = (
+            None if self.time_budget_ms is None
+            else time.perf_counter() + self.time_budget_ms / 1000
+        )
+        try:
+            while self.iterations < self.n_iterations and not self._node_limit_reached():
+                battle, my_commands, opp_commands = positions[self.iterations % len(positions)]
+                self._iterate(battle, my_commands, opp_commands, root)
+                self.iterations += 1
+        finally:
+            self._deadline = None
+        return root
+
+    def _parallel(self) -> bool:
+        """ルート並列化で探索するかを返す。"""
+        return bool(self.n_workers and self.n_workers > 1)
+
+    def _search_parallel(self, positions: list[tuple[Battle, list[Command], list[Command]]]) -> _Node:
+        """`n_workers` 個のプロセスで独立に探索し、最上位の自分の手の統計を足し合わせた
+        ノードを返す（子ノード・相手の手の統計は持たない）。"""
+        blob = pickle.dumps((self, positions))
+        futures = [
+            self._process_pool().submit(_search_in_worker, blob, i) for i in range(self.n_workers)
+        ]
+        root = _Node()
+        stats = root.stats[0]
+        self.nodes_expanded = 0
+        self.iterations = 0
+        for future in futures:
+            my_stats, visits, iterations, nodes_expanded, search_stats = future.result()
+            if search_stats is not None and self._stats is not None:
+                self._stats.merge(search_stats)
+            root.visits += visits
+            self.iterations += iterations
+            self.nodes_expanded += nodes_expanded
+            for cmd, (cmd_visits, total) in my_stats.items():
+                entry = stats.setdefault(cmd, [0, 0.0, 0.0])
+                entry[_VISITS] += cmd_visits
+                entry[_TOTAL] += total
+        return root
+
+    def _iterate(self,
+                 battle: Battle,
+                 my_commands: list[Command],
+                 opp_commands: list[Command],
+                 root: _Node) -> None:
+        """選択・展開・ロールアウト・逆伝播の1回の反復を行う。"""
+        opponent = battle.opponent(self)
+        with self._measure(0, "copy"):
+            sim = battle.copy(reseed=True, copy_logs=False, omniscient=True, copy_on_write=True)
+        self.configure_sim(sim)
+        # 手の選択には反復ごとの sim の行動選択用乱数を使う（実盤面の乱数を消費しない）
+        rng = sim.decision_random
+
+        node = root
+        path: list[tuple[_Node, Command, Command, float, float]] = []
+        depth = 0
+        while True:
+            if sim.judge_winner() is not None:
+                break
+            if depth == 0:
+                mine, theirs = my_commands, opp_commands
+            else:
+                with self._measure(depth, "commands"):
+                    mine, theirs = self._sim_commands(sim, opponent)
+                if not mine or not theirs:
+                    # 葉として評価する（子ノードは展開しない）
+                    break
+            self._record_branching(depth, mine, theirs)
+            my_cmd, my_prob = self._select(node.stats[0], mine, rng)
+            opp_cmd, opp_prob = self._select(node.stats[1], theirs, rng)
+            path.append((node, my_cmd, opp_cmd, my_prob, opp_prob))
+
+            with self._measure(depth, "step"):
+                sim.step({self: my_cmd, opponent: opp_cmd})
+            self.nodes_expanded += 1
+            depth += 1
+
+            child = node.children.get((my_cmd, opp_cmd))
+            if child is None:
+                # 木の外に出たら子ノードを1つ追加し、ロールアウトで評価する
+                node.children[(my_cmd, opp_cmd)] = _Node()
+                depth = self._rollout(sim, opponent, rng, depth)
+                break
+            node = child
+            if depth >= self.max_plies:
+                depth = self._rollout(sim, opponent, rng, depth)
+                break
+
+        with self._measure(depth, "evaluate"):
+            reward = self._reward(sim)
+        for node, my_cmd, opp_cmd, my_prob, opp_prob in path:
+            node.visits += 1
+            self._update(node.stats[0], my_cmd, reward, my_prob)
+            self._update(node.stats[1], opp_cmd, 1.0 - reward, opp_prob)
+        if not path:
+            root.visits += 1
+
+    def _sim_commands(self, sim: Battle, opponent: Player) -> tuple[list[Command], list[Command]]:
+        """sim.step() 完了直後の自分・相手の合法手を返す。
+
+        探索の最上位が交代フェーズ（瀕死交代等）の場合、sim は交代フェーズのまま
+        進むため、1手目の後の盤面を葉として評価する（空のリストを返す）。
+        """
+        if sim.phase != "action":
+            return [], []
+        sim.player_states[self].required_command_type = "any"
+        sim.player_states[opponent].required_command_type = "any"
+        return sim.available_commands(self), sim.available_commands(opponent)
+
+    def _select(self, stats: dict[Command, list[float]], commands: list[Command], rng) -> tuple[Command, float]:
+        """ノードの一方のプレイヤーの手を選び、(手, 選んだ確率) を返す。
+
+        確率は Exp3 の重要度重み付けに使う（UCT では 1.0）。
+        """
+        if self.selection == "exp3":
+            return self._select_exp3(stats, commands, rng)
+
+        untried = [cmd for cmd in commands if cmd not in stats]
+        if untried:
+            return rng.choice(untried), 1.0
+        log_total = math.log(sum(stats[cmd][_VISITS] for cmd in commands))
+        c = self.exploration
+
+        def ucb(cmd: Command) -> float:
+            visits, total, _ = stats[cmd]
+            return total / visits + c * math.sqrt(log_total / visits)
+
+        return max(commands, key=ucb), 1.0
+
+    def _select_exp3(self, stats: dict[Command, list[float]], commands: list[Command], rng) -> tuple[Command, float]:
+        """Exp3 で手を選ぶ。"""
+        k = len(commands)
+        gamma = self.exp3_gamma
+        eta = gamma / k
+        gains = [stats[cmd][_GAIN] if cmd in stats else 0.0 for cmd in commands]
+        top = max(gains)
+        weights = [math.exp(eta * (gain - top)) for gain in gains]
+        total = sum(weights)
+        probs = [(1 - gamma) * w / total + gamma / k for w in weights]
+
+        r = rng.random()
+        for cmd, prob in zip(commands, probs):
+            r -= prob
+            if r < 0:
+                return cmd, prob
+        return commands[-1], probs[-1]
+
+    def _update(self, stats: dict[Command, list[float]], command: Command, reward: float, prob: float) -> None:
+        """手の統計に報酬を加算する。"""
+        entry = stats.setdefault(command, [0, 0.0, 0.0])
+        entry[_VISITS] += 1
+        entry[_TOTAL] += reward
+        entry[_GAIN] += reward / prob
+
+    def _rollout(self, sim: Battle, opponent: Player, rng, depth: int) -> int:
+        """ロールアウト方策で両者の手を選び、sim を rollout_depth ターン進める。
+
+        depth は sim の探索の最上位からの深さで、ロールアウト後の深さを返す（計測用）。
+        """
+        for _ in range(self.rollout_depth):
+            if sim.judge_winner() is not None:
+                break
+            with self._measure(depth, "commands"):
+                mine, theirs = self._sim_commands(sim, opponent)
+            if not mine or not theirs:
+                break
+            commands = {
+                self: self._rollout_command(sim, self, mine, rng),
+                opponent: self._rollout_command(sim, opponent, theirs, rng),
+            }
+            with self._measure(depth, "step"):
+                sim.step(commands)
+            self.nodes_expanded += 1
+            depth += 1
+        return depth
+
+    def _rollout_command(self, sim: Battle, player: Player, commands: list[Command], rng) -> Command:
+        """ロールアウト方策でプレイヤーの手を選ぶ。"""
+        if self.rollout == "max_damage":
+            with sim.damage_calculator.cache_scope():
+                return max(commands, key=lambda cmd: min_damage(sim, player, cmd))
+        return rng.choice(commands)
+
+    def _reward(self, sim: Battle) -> float:
+        """`evaluate()` の評価値をロジスティック関数で 0〜1 の報酬に変換する（±inf は 1 / 0）。"""
+        value = self.evaluate(sim)
+        if value >= 0:
+            return 1.0 / (1.0 + math.exp(-value))
+        return math.exp(value) / (1.0 + math.exp(value))
+
+    def _most_visited(self, root: _Node, my_commands: list[Command]) -> Command:
+        """探索の最上位で最も多く選ばれた自分の手を返す（同数なら平均報酬、次いで先の手）。"""
+        stats = root.stats[0]
+
+        def key(cmd: Command) -> tuple[float, float]:
+            if cmd not in stats:
+                return (0, 0.0)
+            visits, total, _ = stats[cmd]
+            return (visits, total / visits)
+
+        return max(my_commands, key=key)
+
+    def _reused_root(self, battle: Battle) -> _Node | None:
+        """前のターンの木から、実際に選ばれた手の組の子ノードを探す（見つからなければ None）。"""
+        tree, self._tree = self._tree, None
+        if tree is None or self._tree_turn is None:
+            return None
+        seed, turn = self._tree_turn
+        if battle.phase != "action" or battle.seed != seed or battle.turn != turn + 1:
+            return None
+        if self._revealed_signature(battle) != self._tree_revealed:
+            return None
+        label = self._observed_opponent_label(battle)
+        if label is None:
+            return None
+        for (my_cmd, opp_cmd), child in tree.children.items():
+            if my_cmd == self._tree_command and self._tree_opponent_labels.get(opp_cmd) == label:
+                return child if child.visits else None
+        return None
+
+    def _observed_opponent_label(self, battle: Battle) -> tuple[str, str] | None:
+        """直前のターンに相手が実際に選んだ行動を (コマンドの種類, 技名 / ポケモン名) で返す。
+
+        コマンドの記録は相手の本来の技の並びのインデックスで、観測の技の並び（公開済みの
+        技のみ）とは対応しないため、技は前のターンに場にいたポケモンの最後に使った技から
+        特定する。特定できない場合は None を返す。
+        """
+        opponent = battle.opponent(self)
+        index = battle.players.index(opponent)
+        record = next((
+            r for r in reversed(battle.command_log)
+            if r.player_index == index and r.phase == "action"
+        ), None)
+        if record is None or record.turn != battle.turn:
+            return None
+        kind = record.command.name.split("_")[0]
+        team = battle.player_states[opponent].team
+        if record.command.is_switch:
+            return kind, team[record.command.index].name
+        mon = next((m for m in team if m.name == self._tree_opponent_active), None)
+        if mon is None or mon.last_move is None:
+            return None
+        return kind, mon.last_move.name
+
+    def _command_label(self, battle: Battle, player: Player, command: Command) -> tuple[str, str]:
+        """コマンドを (コマンドの種類, 技名 / ポケモン名) で表す。"""
+        kind = command.name.split("_")[0]
+        if command.is_switch:
+            return kind, battle.player_states[player].team[command.index].name
+        return kind, battle.command_to_move(player, command).name
+
+    def _revealed_signature(self, battle: Battle) -> tuple:
+        """相手の公開済みのポケモンと技の一覧（観測のコマンドと技の対応を決める情報）。"""
+        team = battle.player_states[battle.opponent(self)].team
+        return tuple(
+            (mon.name, mon.revealed, tuple(move.name for move in mon.moves)) for mon in team
+        )
+
+
+def _search_in_worker(blob: bytes, index: int) -> tuple[dict[Command, tuple[int, float]], int, int, int,
+                                                      SearchStats | None]:
+    """探索の最上位から独立した木を探索する（子プロセスで呼ばれる）。
+
+    Returns:
+        (最上位の自分の手ごとの (訪問回数, 報酬の合計), 最上位の訪問回数, 反復の回数,
+        展開したノード数, 計測結果（計測しない場合は None）)
+    """
+    player, positions = pickle.loads(blob)
+    player.n_workers = None
+    # プロセスごとに異なる乱数系列で反復するよう、複製時の派生乱数の位置を
+    # 反復回数より十分大きな間隔でずらす
+    for battle, _, _ in positions:
+        battle._reseed_count += index << 32
+    root = player._search(positions, _Node())
+    my_stats = {cmd: (int(entry[_VISITS]), entry[_TOTAL]) for cmd, entry in root.stats[0].items()}
+    return my_stats, root.visits, player.iterations, player.nodes_expanded, player._stats
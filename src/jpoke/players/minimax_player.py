@@ -1,9 +1,16 @@
 """ミニマックス評価による木探索プレイヤー。"""
 from __future__ import annotations
 
+import math
+import time
+
 from jpoke import Battle, Player
+from jpoke.core.chance import expand_chance_outcomes
 from jpoke.enums import Command
 
+from .determinization import OpponentPrior
+from .evaluator import BatchEvaluator
+from .max_damage_player import min_damage
 from .tree_search_player import TreeSearchPlayer
 
 
@@ -14,16 +21,150 @@ class MinimaxPlayer(TreeSearchPlayer):
     `TreeSearchPlayer` が提供する `evaluate`/`fallback`/`estimate_opponent`/
     `configure_sim` の4フックはそのまま利用できる。詳細は `TreeSearchPlayer`
     のクラスdocstringを参照。
+
+    Attributes:
+        alpha_beta:
+            True の場合、アルファベータ法で枝刈りする。自分の手の評価中に、相手の
+            応手によってその手がそれまでの最善手を上回れないと分かった時点で残りの
+            応手の展開を打ち切る（深い階層でも同様）。自分・相手の手は技の最低
+            ダメージの大きい順（`MaxDamagePlayer` と同じ指標）に並べ替えて展開し、
+            早い段階で枝刈りが起きるようにする。探索の最上位では評価値が同じ手も
+            正確に評価するため、選ぶ手は枝刈りしない場合と同じになる。ただし分岐の
+            乱数の派生は展開順に依存するため、命中・急所・ダメージ乱数の絡む局面では
+            展開順が変わることで評価値が変わりうる（`configure_sim` で決定論化した
+            盤面では一致する）。`evaluate_commands()` は最上位の全ての手の正確な
+            評価値を返す。`time_budget_ms` による反復深化では、最上位の自分の手は
+            1つ浅い深さの評価値の高い順に展開する（最善手の候補を先に評価するため、
+            以降の手の枝刈りが起きやすい）。
+        chance_nodes:
+            True の場合、(自分の手, 相手の手) ごとに1回だけ乱数で盤面を進める代わりに、
+            命中・急所・ダメージ乱数・追加効果の結果ごとの盤面を列挙し（確率分岐）、
+            各盤面の評価値を確率で重み付けした期待値をその手の組の評価値とする
+            （エクスペクティマックス）。1回の乱数の当たり外れで手の評価が決まるのを防ぐ。
+            列挙した結果ごとに1ノードと数える。確率分岐では盤面を結果ごとに複製するため
+            `use_rollback` は使わず、期待値は探索窓で枝刈りしない（自分・相手の手の
+            選択では `alpha_beta` の枝刈りが働く）。`evaluate()` が決着を ±inf で返す
+            既定実装では、決着しうる結果を含む手の組の期待値は ±inf になる（勝ちと負けの
+            両方を含む場合は確率の高い方）。確率を反映させたい場合は有限の評価値を返す
+            よう `evaluate()` をオーバーライドする。詳細は `jpoke.core.chance` を参照。
+        damage_buckets:
+            確率分岐でダメージ乱数（16段階）をまとめる区間の数。
+        chance_min_probability:
+            確率分岐で展開する結果の確率の下限。これ未満の結果は展開せず、展開した
+            結果の確率の合計で正規化して期待値を求める。
     """
 
+    def __init__(self,
+                 username: str,
+                 max_plies: int = 1,
+                 max_nodes: int | None = None,
+                 use_rollback: bool = False,
+                 tt_size: int | None = None,
+                 time_budget_ms: float | None = None,
+                 alpha_beta: bool = False,
+                 n_workers: int | None = None,
+                 chance_nodes: bool = False,
+                 damage_buckets: int = 4,
+                 chance_min_probability: float = 0.005,
+                 n_determinizations: int = 0,
+                 opponent_prior: OpponentPrior | None = None,
+                 evaluator: BatchEvaluator | None = None,
+                 profile: bool = False):
+        super().__init__(username=username, max_plies=max_plies, max_nodes=max_nodes,
+                         use_rollback=use_rollback, tt_size=tt_size,
+                         time_budget_ms=time_budget_ms, n_workers=n_workers,
+                         n_determinizations=n_determinizations, opponent_prior=opponent_prior,
+                         evaluator=evaluator, profile=profile)
+        self.alpha_beta: bool = alpha_beta
+        self.chance_nodes: bool = chance_nodes
+        self.damage_buckets: int = damage_buckets
+        self.chance_min_probability: float = chance_min_probability
+
+    def _score_commands(self,
+                         battle: Battle,
+                         my_commands: list[Command],
+                         opponent: Player,
+                         opp_commands: list[Command],
+                         plies: int,
+                         *,
+                         respect_node_limit: bool,
+                         alpha: float = -math.inf,
+                         beta: float = math.inf) -> dict[Command, float]:
+        """自分の各合法手の評価値を求める。
+
+        `alpha_beta=True` の場合は手を並べ替えて展開し、評価値が beta 以上の手が
+        見つかった時点で残りの手を打ち切る（親ノードの相手はこの局面を選ばない）。
+        枝刈りした手の評価値は真の値の上界になる。返す辞書は元の合法手の順に並べる
+        （同点の手は元の順で先の手が選ばれる）。
+        """
+        if not self.alpha_beta:
+            return super()._score_commands(
+                battle, my_commands, opponent, opp_commands, plies,
+                respect_node_limit=respect_node_limit,
+            )
+
+        # 探索の最上位では、同点の手を枝刈りせずに正確に評価し、beta による打ち切りも
+        # 行わない（選ぶ手を変えないため）。evaluate_commands() では全ての手を正確に評価する。
+        toplevel = plies == self.max_plies
+        opp_ordered = self._order_commands(battle, opponent, opp_commands)
+        scores: dict[Command, float] = {}
+        best = -math.inf
+        if toplevel and self._root_order is not None:
+            # 反復深化では1つ浅い深さの評価値の順（呼び出し元で並べ替え済み）を使う
+            my_ordered = list(my_commands)
+        else:
+            my_ordered = self._order_commands(battle, self, my_commands)
+        for my_cmd in my_ordered:
+            if respect_node_limit and self._node_limit_reached():
+                break
+            if toplevel and not respect_node_limit:
+                floor = alpha
+            elif toplevel:
+                floor = math.nextafter(max(alpha, best), -math.inf)
+            else:
+                floor = max(alpha, best)
+            score = self._score_command(
+                battle, my_cmd, opponent, opp_ordered, plies, alpha=floor, beta=beta,
+            )
+            scores[my_cmd] = score
+            best = max(best, score)
+            if best >= beta and not toplevel:
+                break
+        return {cmd: scores[cmd] for cmd in my_commands if cmd in scores}
+
+    def _order_commands(self, battle: Battle, player: Player, commands: list[Command]) -> list[Command]:
+        """枝刈りが起きやすいよう、技の最低ダメージの大きい順に並べ替える。
+
+        技以外のコマンド（交代等）は元の順のまま後ろに置く。
+        """
+        if len(commands) <= 1:
+            return list(commands)
+        with battle.damage_calculator.cache_scope():
+            keys = {command: min_damage(battle, player, command) for command in commands}
+        return sorted(commands, key=lambda command: -keys[command])
+
     def _score_command(self,
                         battle: Battle,
                         my_cmd: Command,
                         opponent: Player,
                         opp_commands: list[Command],
-                        plies: int) -> float:
-        """相手が自分にとって最も不利な手を選ぶと仮定し、その評価値を返す。"""
+                        plies: int,
+                        *,
+                        alpha: float = -math.inf,
+                        beta: float = math.inf) -> float:
+        """相手が自分にとって最も不利な手を選ぶと仮定し、その評価値を返す。
+
+        `alpha_beta=True` の場合、評価値が alpha 以下になった時点で残りの応手を
+        打ち切る（この手は既に見つかっている手を上回れない）。このとき返す値は
+        真の値の上界になる。
+        """
+        if plies <= 1 and self.evaluator is not None and not (self.chance_nodes or self.use_rollback):
+            return self._score_command_batched(battle, my_cmd, opponent, opp_commands)
+
         worst = float("inf")
+        sim: Battle | None = None
+        checkpoint = None
+        depth = self.max_plies - plies
 
         # 相手の各合法手について、相手が最善に対抗した場合の評価値を求める
         for opp_cmd in opp_commands:
@@ -31,7 +172,26 @@ class MinimaxPlayer(TreeSearchPlayer):
             if self._node_limit_reached():
                 break
 
-            sim = battle.copy(reseed=True, copy_logs=False, omniscient=True)
+            if self.chance_nodes:
+                score = self._expected_score(battle, my_cmd, opponent, opp_cmd, plies)
+                worst = min(worst, score)
+                if self.alpha_beta and worst <= alpha:
+                    break
+                continue
+
+            with self._measure(depth, "copy"):
+                if self.use_rollback:
+                    # 複製は最初の分岐だけで行い、以降は巻き戻して使い回す
+                    if sim is None:
+                        sim = battle.copy(copy_logs=False, omniscient=True, copy_on_write=True)
+                        checkpoint = sim.checkpoint()
+                    else:
+                        sim.rollback(checkpoint)
+                    sim.reseed_from(battle)
+                else:
+                    # 分岐ごとの複製は構造共有（コピーオンライト）で作成し、複製コストを抑える
+                    sim = battle.copy(reseed=True, copy_logs=False, omniscient=True,
+                                      copy_on_write=True)
 
             # 探索専用の決定論化オプション（例: 命中固定・平均ダメージ）を
             # sim にだけ設定する。実盤面（battle）には影響しない。
@@ -41,8 +201,87 @@ class MinimaxPlayer(TreeSearchPlayer):
             self.configure_sim(sim)
 
             # コマンドを指定して盤面を進める。
-            sim.step({self: my_cmd, opponent: opp_cmd})
+            with self._measure(depth, "step"):
+                sim.step({self: my_cmd, opponent: opp_cmd})
             self.nodes_expanded += 1
-            score = self._evaluate_node(sim, plies)
-            worst = min(worst, score)
+            if self.alpha_beta:
+                score = self._evaluate_node(sim, plies, alpha, min(beta, worst))
+                worst = min(worst, score)
+                if worst <= alpha:
+                    break
+            else:
+                score = self._evaluate_node(sim, plies)
+                worst = min(worst, score)
         return worst
+
+    def _score_command_batched(self,
+                               battle: Battle,
+                               my_cmd: Command,
+                               opponent: Player,
+                               opp_commands: list[Command]) -> float:
+        """最後の1手で、相手の各応手の盤面を展開してからまとめて評価し、最小の評価値を返す。
+
+        葉ノードの評価を `evaluate_batch()` の1回の呼び出しにまとめるため、この階層では
+        `alpha_beta` による応手の打ち切りを行わない（評価値は打ち切らない場合と同じ）。
+        """
+        sims: list[Battle] = []
+        depth = self.max_plies - 1
+        for opp_cmd in opp_commands:
+            if self._node_limit_reached():
+                break
+            with self._measure(depth, "copy"):
+                sim = battle.copy(reseed=True, copy_logs=False, omniscient=True, copy_on_write=True)
+            self.configure_sim(sim)
+            with self._measure(depth, "step"):
+                sim.step({self: my_cmd, opponent: opp_cmd})
+            self.nodes_expanded += 1
+            sims.append(sim)
+        with self._measure(depth + 1, "evaluate"):
+            scores = self.evaluate_batch(sims)
+        return min(scores, default=float("inf"))
+
+    def _expected_score(self,
+                        battle: Battle,
+                        my_cmd: Command,
+                        opponent: Player,
+                        opp_cmd: Command,
+                        plies: int) -> float:
+        """手の組 (my_cmd, opp_cmd) の確率分岐の結果ごとの評価値の期待値を返す。
+
+        ノード上限に達した場合は、それまでに評価した結果だけで期待値を求める。
+        """
+        # 結果ごとの複製は乱数の状態を引き継ぐため、分岐元は通常の分岐と同じく派生シードで作る
+        depth = self.max_plies - plies
+        with self._measure(depth, "copy"):
+            base = battle.copy(reseed=True, copy_logs=False, omniscient=True, copy_on_write=True)
+        outcomes = expand_chance_outcomes(
+            base, {self: my_cmd, opponent: opp_cmd},
+            damage_buckets=self.damage_buckets,
+            min_probability=self.chance_min_probability,
+            prepare=self.configure_sim,
+        )
+        weighted_scores = []
+        leaves: list[tuple[float, Battle]] = []
+        stats = self._stats
+        while True:
+            # 結果ごとの盤面の複製と step() は、まとめて step の時間として計測する
+            start = time.perf_counter()
+            outcome = next(outcomes, None)
+            if outcome is None:
+                break
+            if stats is not None:
+                stats.add(depth, "step", time.perf_counter() - start)
+            probability, sim = outcome
+            self.nodes_expanded += 1
+            if plies <= 1 and self.evaluator is not None:
+                # 最後の1手の結果の盤面はまとめて評価する
+                leaves.append((probability, sim))
+            else:
+                weighted_scores.append((probability, self._evaluate_node(sim, plies)))
+            if self._node_limit_reached():
+                break
+        if leaves:
+            with self._measure(depth + 1, "evaluate"):
+                scores = self.evaluate_batch([sim for _, sim in leaves])
+            weighted_scores += [(p, score) for (p, _), score in zip(leaves, scores)]
+        return self._expected_value(weighted_scores)
@@ -0,0 +1,165 @@
+"""木探索の計測（プロファイリング）結果。
+
+`TreeSearchPlayer(profile=True)` は `choose_command()` の1回の探索ごとに `SearchStats` を
+作り、探索の最上位からの深さ（プライ。最上位が0）ごとに、盤面の複製（`Battle.copy()`・
+巻き戻し）・`sim.step()`・葉ノードの評価（`evaluate()` / `evaluate_batch()`）・合法手の
+列挙（`available_commands()` 等）にかかった時間と回数、合法手を列挙した局面の数と
+(自分の手, 相手の手) の組の数を記録する。ノード上限・期限による打ち切りの回数も数える。
+
+`to_dict()` / `to_json()` で書き出し、`SearchStats.aggregate()` で複数の探索（複数の対戦）の
+結果を足し合わせられる。
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator
+
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+__all__ = [
+    "PlyStats",
+    "SearchStats",
+]
+
+# 時間を計測する処理の種類
+_KINDS = ("copy", "step", "evaluate", "commands")
+
+
+@dataclass
+class PlyStats:
+    """探索の1つの深さの計測結果。
+
+    "copy" / "step" / "commands" はその深さの局面から分岐する処理（"step" の回数は
+    その深さの局面から展開した子ノードの数）、"evaluate" はその深さの葉ノードの評価
+    （`evaluate_batch()` はまとめて1回）を数える。
+
+    Attributes:
+        times: 処理の種類（"copy" / "step" / "evaluate" / "commands"）ごとの合計時間（秒）
+        counts: 処理の種類ごとの回数
+        positions: 合法手を列挙した局面の数
+        branches: 列挙した局面の (自分の手, 相手の手) の組の数の合計
+    """
+    times: dict[str, float] = field(default_factory=lambda: dict.fromkeys(_KINDS, 0.0))
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(_KINDS, 0))
+    positions: int = 0
+    branches: int = 0
+
+    @property
+    def branching_factor(self) -> float:
+        """局面あたりの (自分の手, 相手の手) の組の数の平均（0件なら0）。"""
+        return self.branches / self.positions if self.positions else 0.0
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """局面あたりに実際に展開した子ノードの数の平均（枝刈り・打ち切り後。0件なら0）。"""
+        return self.counts["step"] / self.positions if self.positions else 0.0
+
+    def merge(self, other: PlyStats) -> None:
+        """other の計測結果を足し合わせる。"""
+        for kind in _KINDS:
+            self.times[kind] += other.times[kind]
+            self.counts[kind] += other.counts[kind]
+        self.positions += other.positions
+        self.branches += other.branches
+
+    def to_dict(self) -> dict:
+        """辞書に変換する（JSON に書き出せる値のみ）。"""
+        return {
+            "times": dict(self.times),
+            "counts": dict(self.counts),
+            "positions": self.positions,
+            "branches": self.branches,
+            "branching_factor": self.branching_factor,
+            "effective_branching_factor": self.effective_branching_factor,
+        }
+
+
+@dataclass
+class SearchStats:
+    """探索の計測結果（1回の探索、または `aggregate()` で足し合わせた複数の探索）。
+
+    Attributes:
+        plies: 探索の最上位からの深さ（0始まり）ごとの計測結果
+        decisions: 計測した探索の回数
+        elapsed: 探索全体にかかった時間（秒）
+        nodes_expanded: 展開したノード数
+        cutoffs: ノード上限・期限に達して展開を打ち切った回数
+    """
+    plies: dict[int, PlyStats] = field(default_factory=dict)
+    decisions: int = 0
+    elapsed: float = 0.0
+    nodes_expanded: int = 0
+    cutoffs: int = 0
+
+    def ply(self, depth: int) -> PlyStats:
+        """深さ depth の計測結果を返す（なければ作成する）。"""
+        stats = self.plies.get(depth)
+        if stats is None:
+            stats = self.plies[depth] = PlyStats()
+        return stats
+
+    @contextmanager
+    def measure(self, depth: int, kind: str) -> Iterator[None]:
+        """with ブロックの実行時間を、深さ depth の処理 kind の時間として加算する。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(depth, kind, time.perf_counter() - start)
+
+    def add(self, depth: int, kind: str, seconds: float) -> None:
+        """深さ depth の処理 kind を1回、seconds 秒として記録する。"""
+        stats = self.ply(depth)
+        stats.times[kind] += seconds
+        stats.counts[kind] += 1
+
+    def record_branching(self, depth: int, n_my_commands: int, n_opp_commands: int) -> None:
+        """深さ depth で合法手を列挙した局面を1つ記録する。"""
+        stats = self.ply(depth)
+        stats.positions += 1
+        stats.branches += n_my_commands * n_opp_commands
+
+    def merge(self, other: SearchStats) -> None:
+        """other の計測結果を足し合わせる。"""
+        for depth, stats in other.plies.items():
+            self.ply(depth).merge(stats)
+        self.decisions += other.decisions
+        self.elapsed += other.elapsed
+        self.nodes_expanded += other.nodes_expanded
+        self.cutoffs += other.cutoffs
+
+    @classmethod
+    def aggregate(cls, stats: Iterable[SearchStats]) -> SearchStats:
+        """複数の計測結果を足し合わせた計測結果を返す。
+
+        Args:
+            stats: 足し合わせる計測結果（各対戦・各探索の `SearchStats`）
+
+        Returns:
+            新しい `SearchStats`（引数は変更しない）
+        """
+        total = cls()
+        for s in stats:
+            total.merge(s)
+        return total
+
+    def to_dict(self) -> dict:
+        """辞書に変換する（JSON に書き出せる値のみ）。深さは昇順に並べる。"""
+        return {
+            "decisions": self.decisions,
+            "elapsed": self.elapsed,
+            "nodes_expanded": self.nodes_expanded,
+            "cutoffs": self.cutoffs,
+            "plies": [
+                {"depth": depth, **self.plies[depth].to_dict()} for depth in sorted(self.plies)
+            ],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """JSON 文字列に変換する。
+
+        Args:
+            **kwargs: `json.dumps()` に渡す引数（indent 等）
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
@@ -10,9 +10,23 @@
 """
 from __future__ import annotations
 
+import math
+import pickle
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Executor, ProcessPoolExecutor
+
 from jpoke import Battle, Player
 from jpoke.enums import Command
 
+from .determinization import OpponentPrior, sample_opponent
+from .evaluator import BatchEvaluator
+from .search_stats import SearchStats
+
+# 計測しない場合に `_measure()` が返す何もしないコンテキストマネージャー
+_NO_MEASURE = nullcontext()
+
 
 def total_hp_ratio(battle: Battle, target: Player) -> float:
     """指定プレイヤーの残りHP割合の合計を返す。"""
@@ -54,23 +68,141 @@ class TreeSearchPlayer(Player):
             None なら無制限。到達すると以降の展開を打ち切り、その時点で見つかっている最善手を返す。
         nodes_expanded:
             直近の探索で展開したノード数。診断用。
+        use_rollback:
+            True の場合、分岐ごとに盤面を複製せず、1つのシミュレーション用 Battle を
+            `checkpoint()` / `rollback()` で巻き戻しながら使い回す。乱数の派生規則は
+            複製する場合と同じため、探索結果は変わらない。
+        tt_size:
+            置換表（transposition table）に保持する局面数の上限。None または0なら
+            置換表を使わない。途中ノードの評価値を (`Battle.state_hash()`, 残りプライ数)
+            をキーに記録し、異なる手順で同じ局面に到達したときは再探索せずに使い回す
+            （上限を超えたら最も長く参照されていない局面から捨てる）。局面が同じでも
+            乱数の系列は分岐ごとに異なるため、命中・急所・ダメージ乱数の絡む局面では
+            置換表を使わない場合と評価値が変わりうる。置換表は探索の最上位のたびに空にする。
+        tt_hits / tt_misses:
+            直近の探索で置換表を参照して見つかった回数・見つからなかった回数。診断用。
+        time_budget_ms:
+            1回の `choose_command()` の探索に使う時間（ミリ秒）。None なら時間で
+            打ち切らない。指定すると、1手読み・2手読み…と `max_plies` まで深さを
+            1ずつ増やして探索を繰り返し（反復深化）、期限を過ぎた時点で打ち切って、
+            最後まで探索できた深さのうち最も深いものの最善手を返す。各深さでは、
+            1つ浅い深さの評価値の高い順に自分の手を展開する。1手読みすら期限内に
+            終わらなかった場合は、それまでに評価できた手の中の最善手を返す。
+            `max_plies` は深さの上限として働く。
+        completed_plies:
+            直近の探索で、打ち切られずに最後まで探索できた深さ（0 なら1手読みも
+            打ち切られた）。診断用。
+        n_workers:
+            探索の最上位の自分の手を分散して評価するプロセス数。None または1なら
+            現在のプロセスで順に評価する。2以上を指定すると、盤面とプレイヤーを
+            pickle して `ProcessPoolExecutor` の各プロセスに送り、自分の手ごとの
+            評価値を集める。各手の分岐の乱数は、手の並び順から逐次探索と同じ規則で
+            派生させるため、打ち切り・枝刈りのない探索では逐次探索と同じ評価値になる。
+            `max_nodes` は残りのノード数を自分の手の数で等分して各プロセスに割り当て、
+            置換表はプロセスごとに持つ。プロセスプールは最初の探索で作成して以降の
+            探索で使い回すため、不要になったら `close()` で終了させる。プレイヤー
+            （`evaluate` 等をオーバーライドしたサブクラス）は pickle できる必要がある
+            （モジュールのトップレベルで定義したクラスのインスタンスであること）。
+        n_determinizations:
+            1以上を指定すると、相手の隠蔽された情報（未公開の技・特性・持ち物・
+            性格と努力値・選出）を `opponent_prior` から `n_determinizations` 通り
+            サンプリングした盤面（決定化）でそれぞれ探索し、自分の各手の評価値を
+            平均して手を選ぶ。決定化した盤面は観測を複製して作り（観測を作り直さない）、
+            1回の `choose_command()` の中では反復深化の各深さで使い回す。サンプリングには
+            `battle.decision_random` を使う。`estimate_opponent` 系のフックは決定化した
+            盤面ごとに、サンプリングの後で呼ばれる（フックが書き込んだ推定が優先される）。
+            0（既定）なら決定化しない。
+        opponent_prior:
+            決定化に使う相手の非公開情報の事前分布。None なら既定の `OpponentPrior()`
+            （技は覚えられる技・特性は図鑑の特性の一様分布）。
+        evaluator:
+            葉ノードの盤面をまとめて評価する評価器（`jpoke.players.evaluator.BatchEvaluator`）。
+            指定すると、既定の `evaluate()` は残りHP割合の差の代わりにこの評価器の評価値を
+            返し、`MinimaxPlayer` は最後の1手の相手の応手ごとの盤面を展開してから
+            `evaluate_batch()` でまとめて評価する。None（既定）なら使わない。
+        profile:
+            True の場合、`choose_command()` の探索ごとに、探索の最上位からの深さ別の
+            盤面の複製・`sim.step()`・葉ノードの評価・合法手の列挙の時間と回数、分岐数、
+            ノード上限・期限による打ち切りの回数を計測する（`jpoke.players.search_stats`）。
+            計測しない場合（既定）の探索への影響はない。
+        search_stats:
+            直近の探索の計測結果（`SearchStats`）。`profile=False` なら None。
+        total_search_stats:
+            `profile=True` で計測した全ての探索の計測結果の合計。複数の対戦の結果は
+            `SearchStats.aggregate()` で足し合わせる。
     """
 
     def __init__(self,
                  username: str,
                  max_plies: int = 1,
-                 max_nodes: int | None = None):
+                 max_nodes: int | None = None,
+                 use_rollback: bool = False,
+                 tt_size: int | None = None,
+                 time_budget_ms: float | None = None,
+                 n_workers: int | None = None,
+                 n_determinizations: int = 0,
+                 opponent_prior: OpponentPrior | None = None,
+                 evaluator: BatchEvaluator | None = None,
+                 profile: bool = False):
         super().__init__(username=username)
         self.max_plies: int = max_plies
         self.max_nodes: int | None = max_nodes
+        self.use_rollback: bool = use_rollback
+        self.tt_size: int | None = tt_size
+        self.time_budget_ms: float | None = time_budget_ms
         self.nodes_expanded: int = 0
+        self.tt_hits: int = 0
+        self.tt_misses: int = 0
+        self.completed_plies: int = 0
+        self.n_workers: int | None = n_workers
+        self._executor: Executor | None = None
+        self.n_determinizations: int = n_determinizations
+        self.opponent_prior: OpponentPrior = opponent_prior or OpponentPrior()
+        # 直近の探索で決定化した盤面と、各盤面の自分・相手の合法手
+        self._positions: list[tuple[Battle, list[Command], list[Command]]] | None = None
+        # 決定化した盤面の合法手を求めている間だけ True にする
+        self._determinizing: bool = False
+        self.evaluator: BatchEvaluator | None = evaluator
+        self.profile: bool = profile
+        self.search_stats: SearchStats | None = None
+        self.total_search_stats: SearchStats = SearchStats()
+        # 探索中の計測結果（計測しない場合と探索中以外は None）
+        self._stats: SearchStats | None = None
+        self._tt: OrderedDict[tuple[int, int], float] = OrderedDict()
         self._searching: bool = False
+        # 探索の期限（time.perf_counter() の値）。反復深化中のみ設定する
+        self._deadline: float | None = None
+        # 探索がノード上限・期限で打ち切られたか
+        self._interrupted: bool = False
+        # 反復深化で1つ浅い深さの評価値から決めた、探索の最上位での自分の手の展開順
+        self._root_order: list[Command] | None = None
+        # 直近の探索の最上位で求めた自分の各合法手の評価値
+        self._root_scores: dict[Command, float] = {}
+
+    def __getstate__(self) -> dict:
+        # プロセスプールは pickle できず、置換表は送り先で作り直すため送らない
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_tt"] = OrderedDict()
+        state["_positions"] = None
+        # 子プロセスでは計測結果を空の状態から記録し、呼び出し元で足し合わせる
+        state["_stats"] = None if self._stats is None else SearchStats()
+        state["search_stats"] = None
+        state["total_search_stats"] = SearchStats()
+        return state
+
+    def close(self) -> None:
+        """`n_workers` で作成したプロセスプールを終了する（作成していなければ何もしない）。"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
     def evaluate(self, battle: Battle) -> float:
         """葉ノード（盤面）の評価値を返す。
 
         値が大きいほど自分に有利。
-        既定は自分と相手の残りHP割合の差。決着がついている場合は勝敗を最優先する（±inf）。
+        既定は自分と相手の残りHP割合の差（`evaluator` を指定した場合はその評価値）。
+        決着がついている場合は勝敗を最優先する（±inf）。
         """
         winner = battle.judge_winner()
         opponent = battle.opponent(self)
@@ -78,8 +210,33 @@ class TreeSearchPlayer(Player):
             return float("inf")
         if winner is opponent:
             return float("-inf")
+        if self.evaluator is not None:
+            return self.evaluator.evaluate_batch([battle], self)[0]
         return total_hp_ratio(battle, self) - total_hp_ratio(battle, opponent)
 
+    def evaluate_batch(self, battles: list[Battle]) -> list[float]:
+        """複数の葉ノードの評価値をまとめて返す。
+
+        `evaluator` を指定し、かつ `evaluate()` をオーバーライドしていない場合は、
+        決着のついていない盤面をまとめて `evaluator.evaluate_batch()` に渡す。
+        それ以外は盤面ごとに `evaluate()` を呼ぶ。
+        """
+        if self.evaluator is None or type(self).evaluate is not TreeSearchPlayer.evaluate:
+            return [self.evaluate(battle) for battle in battles]
+        scores: list[float] = [0.0] * len(battles)
+        pending: list[int] = []
+        for i, battle in enumerate(battles):
+            winner = battle.judge_winner()
+            if winner is None:
+                pending.append(i)
+            else:
+                scores[i] = float("inf") if winner is self else float("-inf")
+        if pending:
+            values = self.evaluator.evaluate_batch([battles[i] for i in pending], self)
+            for i, value in zip(pending, values):
+                scores[i] = value
+        return scores
+
     def fallback(self, battle: Battle) -> Command:
         """探索の再入時（割り込み交代など）や、相手の合法手が空で推定できない場合に使われる既定の方策。
 
@@ -172,36 +329,129 @@ class TreeSearchPlayer(Player):
 
         self._searching = True
         self.nodes_expanded = 0
+        self.tt_hits = self.tt_misses = 0
+        self.completed_plies = 0
+        self._tt.clear()
+        self._interrupted = False
+        self._positions = None
         try:
-            command, _ = self._best_command(battle, self.max_plies)
-            return command
+            with self._profiling():
+                if self.time_budget_ms is not None:
+                    return self._iterative_deepening(battle)
+                command, _ = self._best_command(battle, self.max_plies)
+                if not self._interrupted:
+                    self.completed_plies = self.max_plies
+                return command
         finally:
             self._searching = False
-
-    def _best_command(self, battle: Battle, plies: int) -> tuple[Command, float]:
+            self._positions = None
+
+    @contextmanager
+    def _profiling(self):
+        """`profile=True` の場合、with ブロックの探索を計測して `search_stats` に記録する。"""
+        if not self.profile:
+            yield
+            return
+        stats = self._stats = SearchStats(decisions=1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.elapsed = time.perf_counter() - start
+            stats.nodes_expanded = self.nodes_expanded
+            self._stats = None
+            self.search_stats = stats
+            self.total_search_stats.merge(stats)
+
+    def _measure(self, depth: int, kind: str):
+        """計測中なら深さ depth の処理 kind の時間を計測するコンテキストマネージャーを返す。"""
+        if self._stats is None:
+            return _NO_MEASURE
+        return self._stats.measure(depth, kind)
+
+    def _record_branching(self, depth: int, my_commands: list[Command], opp_commands: list[Command]) -> None:
+        """計測中なら、深さ depth で合法手を列挙した局面を記録する。"""
+        if self._stats is not None:
+            self._stats.record_branching(depth, len(my_commands), len(opp_commands))
+
+    def _iterative_deepening(self, battle: Battle) -> Command:
+        """`time_budget_ms` の期限まで、探索の深さを1から `max_plies` まで増やしながら探索する。
+
+        探索の最上位の判定（`plies == self.max_plies`）を各深さで使えるよう、探索中は
+        `max_plies` を現在の深さに置き換え、終了時に元に戻す。置換表は深さを跨いで
+        使い回す（キーに残りプライ数を含むため、異なる深さの評価値は混ざらない）。
+        """
+        max_plies = self.max_plies
+        self._deadline = time.perf_counter() + self.time_budget_ms / 1000
+        best_command: Command | None = None
+        try:
+            for plies in range(1, max_plies + 1):
+                self.max_plies = plies
+                self._interrupted = False
+                command, score = self._best_command(battle, plies)
+                if math.isnan(score):
+                    # 探索できない局面（fallback に委譲した）
+                    return command
+                if self._interrupted:
+                    # 打ち切られた深さの結果は、1手読みの場合を除いて捨てる
+                    return command if best_command is None else best_command
+                best_command = command
+                self.completed_plies = plies
+                scores = self._root_scores
+                self._root_order = sorted(scores, key=lambda cmd: scores[cmd], reverse=True)
+            return best_command
+        finally:
+            self.max_plies = max_plies
+            self._deadline = None
+            self._root_order = None
+
+    def _best_command(self,
+                      battle: Battle,
+                      plies: int,
+                      alpha: float = -math.inf,
+                      beta: float = math.inf) -> tuple[Command, float]:
         """自分の各合法手について `_score_command()` でスコアを求め、
         その中で最大のスコアを持つ手を返す。
+
+        alpha / beta は枝刈りを行うサブクラス（`MinimaxPlayer(alpha_beta=True)`）に
+        渡す探索窓で、`_score_commands` へそのまま引き渡す。
         """
         opponent = battle.opponent(self)
 
+        if plies == self.max_plies and self.n_determinizations:
+            return self._best_command_determinized(battle, plies, alpha, beta)
         if plies == self.max_plies:
             # 探索の最上位
-            my_commands, opp_commands = self._toplevel_commands(battle)
+            with self._measure(0, "commands"):
+                my_commands, opp_commands = self._toplevel_commands(battle)
+            self._record_branching(0, my_commands, opp_commands)
             if not my_commands or not opp_commands:
                 return self.fallback(battle), float("nan")
+            my_commands = self._ordered_root_commands(my_commands)
         else:
             # 2手目以降。sim.step()完了直後の全知シミュレーションかつ新規ターン開始
             # 直後（中断的な交代は再入した choose_command 側のfallbackで既に解決済み）
             # であるため、phaseは必ず"action"であり、battle.available_commands()の
             # phase分岐に委ねてよい。
-            my_commands = battle.available_commands(self)
-            opp_commands = battle.available_commands(opponent)
+            depth = self.max_plies - plies
+            with self._measure(depth, "commands"):
+                my_commands = battle.available_commands(self)
+                opp_commands = battle.available_commands(opponent)
+            self._record_branching(depth, my_commands, opp_commands)
             battle.player_states[self].required_command_type = "any"
             battle.player_states[opponent].required_command_type = "any"
 
-        scores = self._score_commands(
-            battle, my_commands, opponent, opp_commands, plies, respect_node_limit=True
-        )
+        if plies == self.max_plies:
+            scores = self._score_root_commands(
+                battle, my_commands, opponent, opp_commands, plies, respect_node_limit=True,
+                alpha=alpha, beta=beta,
+            )
+            self._root_scores = scores
+        else:
+            scores = self._score_commands(
+                battle, my_commands, opponent, opp_commands, plies, respect_node_limit=True,
+                alpha=alpha, beta=beta,
+            )
         best_command = my_commands[0]
         best_score = float("-inf")
         for my_cmd, score in scores.items():
@@ -209,6 +459,150 @@ class TreeSearchPlayer(Player):
                 best_command, best_score = my_cmd, score
         return best_command, best_score
 
+    def _best_command_determinized(self,
+                                   battle: Battle,
+                                   plies: int,
+                                   alpha: float,
+                                   beta: float) -> tuple[Command, float]:
+        """決定化した各盤面で自分の各合法手の評価値を求め、平均が最大の手を返す。
+
+        ノード上限・期限に達した場合は、それまでに探索できた盤面の評価値だけで平均する。
+        """
+        if self._positions is None:
+            self._positions = self._determinized_positions(battle)
+        values: dict[Command, list[float]] = {}
+        for position, my_commands, opp_commands in self._positions:
+            if self._node_limit_reached():
+                break
+            scores = self._score_root_commands(
+                position, self._ordered_root_commands(my_commands), position.opponent(self),
+                opp_commands, plies, respect_node_limit=True, alpha=alpha, beta=beta,
+            )
+            for cmd, score in scores.items():
+                values.setdefault(cmd, []).append(score)
+        if not values:
+            return self.fallback(battle), float("nan")
+
+        my_commands = self._ordered_root_commands(self._positions[0][1])
+        scores = {
+            cmd: self._expected_value([(1.0, score) for score in values[cmd]])
+            for cmd in my_commands if cmd in values
+        }
+        self._root_scores = scores
+        best_command = next(iter(scores))
+        for my_cmd, score in scores.items():
+            if score > scores[best_command]:
+                best_command = my_cmd
+        return best_command, scores[best_command]
+
+    def _determinized_positions(self, battle: Battle) -> list[tuple[Battle, list[Command], list[Command]]]:
+        """相手の隠蔽された情報を `n_determinizations` 通りサンプリングした盤面と、
+        各盤面の自分・相手の合法手を返す（合法手が空の盤面は除く）。
+
+        各盤面は観測 battle の複製で、観測と同様に相手の合法手は公開済みのコマンドに
+        サンプリングした情報から列挙したコマンドを加えたものになる。
+        """
+        positions = []
+        self._determinizing = True
+        try:
+            for _ in range(self.n_determinizations):
+                position = battle.copy(copy_logs=False, copy_on_write=True)
+                sample_opponent(position, position.opponent(self), self.opponent_prior,
+                                battle.decision_random)
+                with self._measure(0, "commands"):
+                    my_commands, opp_commands = self._toplevel_commands(position)
+                self._record_branching(0, my_commands, opp_commands)
+                if my_commands and opp_commands:
+                    positions.append((position, my_commands, opp_commands))
+        finally:
+            self._determinizing = False
+        return positions
+
+    def _ordered_root_commands(self, my_commands: list[Command]) -> list[Command]:
+        """反復深化では、探索の最上位の自分の手を1つ浅い深さの評価値の高い順に並べる
+        （同点なら先の手を選ぶ）。"""
+        if self._root_order is None:
+            return my_commands
+        rank = {cmd: i for i, cmd in enumerate(self._root_order)}
+        return sorted(my_commands, key=lambda cmd: rank.get(cmd, len(rank)))
+
+    @staticmethod
+    def _expected_value(weighted_scores: list[tuple[float, float]]) -> float:
+        """(重み, 評価値) の組から評価値の加重平均を求める。
+
+        決着を表す ±inf の評価値は平均に含めず、勝ち（+inf）と負け（-inf）の重みの
+        合計が多い方を結果とする（同じなら有限の評価値の加重平均）。
+        """
+        total = weight = 0.0
+        decisive = {math.inf: 0.0, -math.inf: 0.0}
+        for w, score in weighted_scores:
+            if math.isinf(score):
+                decisive[score] += w
+            else:
+                total += w * score
+                weight += w
+        win, loss = decisive[math.inf], decisive[-math.inf]
+        if win > loss:
+            return math.inf
+        if loss > win:
+            return -math.inf
+        return total / weight if weight else 0.0
+
+    def _score_root_commands(self,
+                             battle: Battle,
+                             my_commands: list[Command],
+                             opponent: Player,
+                             opp_commands: list[Command],
+                             plies: int,
+                             *,
+                             respect_node_limit: bool,
+                             alpha: float = -math.inf,
+                             beta: float = math.inf) -> dict[Command, float]:
+        """探索の最上位の自分の各合法手の評価値を求める。
+
+        `n_workers` が2以上で自分の手が複数ある場合は、手ごとに子プロセスで
+        `_score_commands()` を呼んで評価し、元の合法手の順に集める。それ以外は
+        現在のプロセスで `_score_commands()` を呼ぶ。子プロセスでは他の手の評価値を
+        参照できないため、`MinimaxPlayer(alpha_beta=True)` の最上位での手を跨いだ
+        枝刈りは起きない（選ぶ手は変わらない）。
+        """
+        if not self.n_workers or self.n_workers <= 1 or len(my_commands) <= 1:
+            return self._score_commands(
+                battle, my_commands, opponent, opp_commands, plies,
+                respect_node_limit=respect_node_limit, alpha=alpha, beta=beta,
+            )
+
+        max_nodes = None
+        if respect_node_limit and self.max_nodes is not None:
+            max_nodes = max(self.max_nodes - self.nodes_expanded, 0) // len(my_commands)
+        time_left = None if self._deadline is None else self._deadline - time.perf_counter()
+        blob = pickle.dumps((self, battle, my_commands, opp_commands))
+        futures = [
+            self._process_pool().submit(
+                _score_root_command, blob, i, plies, respect_node_limit, alpha, beta,
+                max_nodes, time_left,
+            )
+            for i in range(len(my_commands))
+        ]
+        scores: dict[Command, float] = {}
+        for my_cmd, future in zip(my_commands, futures):
+            score, nodes_expanded, tt_hits, tt_misses, interrupted, search_stats = future.result()
+            if search_stats is not None and self._stats is not None:
+                self._stats.merge(search_stats)
+            self.nodes_expanded += nodes_expanded
+            self.tt_hits += tt_hits
+            self.tt_misses += tt_misses
+            self._interrupted |= interrupted
+            if score is not None:
+                scores[my_cmd] = score
+        return scores
+
+    def _process_pool(self) -> Executor:
+        """`n_workers` 個のプロセスを持つプロセスプールを返す（初回に作成する）。"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        return self._executor
+
     def _score_commands(self,
                          battle: Battle,
                          my_commands: list[Command],
@@ -216,13 +610,16 @@ class TreeSearchPlayer(Player):
                          opp_commands: list[Command],
                          plies: int,
                          *,
-                         respect_node_limit: bool) -> dict[Command, float]:
+                         respect_node_limit: bool,
+                         alpha: float = -math.inf,
+                         beta: float = math.inf) -> dict[Command, float]:
         """自分の各合法手について、`_score_command()` で評価値を求める。
 
         `respect_node_limit=True` の場合、ノード上限に達した時点でそれ以降の
         合法手の評価を打ち切る（`_best_command` の探索用）。`False` の場合は
         `max_nodes` を無視して全ての合法手を評価する（`evaluate_commands` の
-        デバッグ用）。
+        デバッグ用）。alpha / beta（探索窓）は既定実装では使わず、全ての合法手を
+        評価する。
         """
         scores: dict[Command, float] = {}
         for my_cmd in my_commands:
@@ -249,7 +646,14 @@ class TreeSearchPlayer(Player):
         raise NotImplementedError
 
     def _node_limit_reached(self) -> bool:
-        return self.max_nodes is not None and self.nodes_expanded >= self.max_nodes
+        """ノード上限または探索の期限に達したかを返す（達していれば打ち切りを記録する）。"""
+        if ((self.max_nodes is not None and self.nodes_expanded >= self.max_nodes)
+                or (self._deadline is not None and time.perf_counter() >= self._deadline)):
+            self._interrupted = True
+            if self._stats is not None:
+                self._stats.cutoffs += 1
+            return True
+        return False
 
     def _toplevel_commands(self, battle: Battle) -> tuple[list[Command], list[Command]]:
         """探索の最上位（実際のゲームエンジンから呼ばれた局面）で使う
@@ -275,6 +679,7 @@ class TreeSearchPlayer(Player):
         opponent_commands = list(battle.available_commands(opponent))
         if self._has_estimate_opponent():
             self.estimate_opponent(battle)
+        if self._has_estimate_opponent() or self._determinizing:
             for cmd in self._resolve_estimated_commands(battle, opponent):
                 if cmd not in opponent_commands:
                     opponent_commands.append(cmd)
@@ -317,12 +722,39 @@ class TreeSearchPlayer(Player):
             if mon is not active and mon.alive
         ]
 
-    def _evaluate_node(self, sim: Battle, plies: int) -> float:
-        """探索木の葉ノード（盤面）を評価する。"""
+    def _evaluate_node(self,
+                       sim: Battle,
+                       plies: int,
+                       alpha: float = -math.inf,
+                       beta: float = math.inf) -> float:
+        """探索木の葉ノード（盤面）を評価する。
+
+        途中ノードは、置換表が有効なら再帰する前に置換表を参照する。
+        ノード上限で打ち切られた不完全な評価値と、探索窓 (alpha, beta) の外で
+        枝刈りされた評価値（真の値の上界・下界でしかない）は置換表に記録しない。
+        """
         if sim.judge_winner() is not None or plies <= 1:
-            return self.evaluate(sim)
-        # 残りプライ数分だけ自分の視点で再帰する。
-        _, score = self._best_command(sim, plies - 1)
+            with self._measure(self.max_plies - plies + 1, "evaluate"):
+                return self.evaluate(sim)
+        if not self.tt_size:
+            # 残りプライ数分だけ自分の視点で再帰する。
+            _, score = self._best_command(sim, plies - 1, alpha, beta)
+            return score
+
+        tt = self._tt
+        key = (sim.state_hash(), plies)
+        score = tt.get(key)
+        if score is not None:
+            tt.move_to_end(key)
+            self.tt_hits += 1
+            return score
+        self.tt_misses += 1
+        _, score = self._best_command(sim, plies - 1, alpha, beta)
+        exact = (alpha == -math.inf or score > alpha) and (beta == math.inf or score < beta)
+        if exact and not self._node_limit_reached():
+            tt[key] = score
+            if len(tt) > self.tt_size:
+                tt.popitem(last=False)
         return score
 
     def _has_estimate_opponent(self) -> bool:
@@ -374,19 +806,69 @@ class TreeSearchPlayer(Player):
         `choose_command` の呼び出しごと（毎ターン）にこのメソッドも呼ぶような
         デバッグ表示などに組み込む場合は、探索コストが `max_nodes` で
         抑えられないことに注意すること。
+        `n_determinizations` を指定した場合は、決定化した各盤面での評価値の平均を返す。
         """
-        opponent = battle.opponent(self)
-        my_commands, opponent_commands = self._toplevel_commands(battle)
-        if not opponent_commands:
+        if self.n_determinizations:
+            positions = self._determinized_positions(battle)
+        else:
+            positions = [(battle, *self._toplevel_commands(battle))]
+        positions = [position for position in positions if position[2]]
+        if not positions:
             return {}
 
         saved_nodes, saved_max_nodes = self.nodes_expanded, self.max_nodes
+        saved_tt = (self._tt, self.tt_hits, self.tt_misses)
         self.nodes_expanded, self.max_nodes = 0, None
+        self._tt = OrderedDict()
         try:
-            return self._score_commands(
-                battle, my_commands, opponent, opponent_commands, self.max_plies,
-                respect_node_limit=False,
-            )
+            # 決定化した場合は、各盤面の評価値を平均する
+            values: dict[Command, list[float]] = {}
+            for position, my_commands, opponent_commands in positions:
+                scores = self._score_root_commands(
+                    position, my_commands, position.opponent(self), opponent_commands,
+                    self.max_plies, respect_node_limit=False,
+                )
+                for cmd, score in scores.items():
+                    values.setdefault(cmd, []).append(score)
+            return {
+                cmd: self._expected_value([(1.0, score) for score in values[cmd]])
+                for cmd in positions[0][1] if cmd in values
+            }
         finally:
             self.nodes_expanded, self.max_nodes = saved_nodes, saved_max_nodes
+            self._tt, self.tt_hits, self.tt_misses = saved_tt
+
 
+
+def _score_root_command(blob: bytes,
+                        index: int,
+                        plies: int,
+                        respect_node_limit: bool,
+                        alpha: float,
+                        beta: float,
+                        max_nodes: int | None,
+                        time_left: float | None) -> tuple[float | None, int, int, int, bool,
+                                                          SearchStats | None]:
+    """探索の最上位の自分の手 `my_commands[index]` を評価する（子プロセスで呼ばれる）。
+
+    Returns:
+        (評価値, 展開したノード数, 置換表の参照で見つかった回数・見つからなかった回数,
+        打ち切られたか, 計測結果（計測しない場合は None）)。評価する前に打ち切られた場合、
+        評価値は None
+    """
+    player, battle, my_commands, opp_commands = pickle.loads(blob)
+    player.n_workers = None
+    player.nodes_expanded = player.tt_hits = player.tt_misses = 0
+    player.max_nodes = max_nodes
+    player._deadline = None if time_left is None else time.perf_counter() + time_left
+    player._interrupted = False
+    # 逐次探索では、手1つにつき相手の手の数だけ複製元の派生乱数を進める。
+    # 同じ位置から派生させ、逐次探索と同じ乱数系列で分岐を評価する。
+    battle._reseed_count += index * len(opp_commands)
+    my_cmd = my_commands[index]
+    scores = player._score_commands(
+        battle, [my_cmd], battle.opponent(player), opp_commands, plies,
+        respect_node_limit=respect_node_limit, alpha=alpha, beta=beta,
+    )
+    return (scores.get(my_cmd), player.nodes_expanded, player.tt_hits, player.tt_misses,
+            player._interrupted, player._stats)
@@ -0,0 +1,206 @@
+"""複数の対戦をプロセス並列で実行する補助機能。
+
+`Player.battle_against()` は対戦を1つずつ順に進めるため、評価用に多数の対戦を
+回すとCPUコア1つしか使わない。`run_battles()` は N 回の対戦を
+`ProcessPoolExecutor` の各プロセスに分散して実行し、結果を対戦通番の順に集める。
+
+- 各対戦のシードは基準シードと対戦通番から決定的に派生させる（`derive_seed()`）。
+  プロセス数・割り当て順によらず、同じ基準シードなら同じ結果になる。
+- プレイヤーは親プロセスで1度だけ pickle し、各対戦の開始時にそこから復元する。
+  対戦ごとに独立したプレイヤーを使うため、プレイヤーが対戦を跨いで内部状態を
+  持っていても結果は対戦の割り当て方に依存しない。
+- 子プロセスから返すのは、対戦を再現するための `BattleReplayData` と勝敗・ターン数
+  だけ（`Battle` 本体は返さない）。個々の対戦の経過は `replay_battle()` で再現できる。
+
+プレイヤーは pickle できる必要がある（モジュールのトップレベルで定義したクラスの
+インスタンスであること）。
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from jpoke import Battle, Player
+from jpoke.core.player import MAX_TURNS
+from jpoke.core.replay import BattleReplayData
+
+__all__ = [
+    "BattleOutcome",
+    "BatchResult",
+    "derive_seed",
+    "run_battles",
+]
+
+
+@dataclass(frozen=True)
+class BattleOutcome:
+    """1回の対戦の結果。
+
+    Attributes:
+        index: 対戦通番（0始まり）
+        seed: この対戦に使ったシード（`derive_seed(基準シード, index)`）
+        winner_index: 勝者のプレイヤーインデックス（0 / 1）。ターン上限で
+            決着しなかった場合は None
+        turns: 対戦終了時のターン数
+        replay: 対戦を再現するためのリプレイデータ
+    """
+    index: int
+    seed: int
+    winner_index: int | None
+    turns: int
+    replay: BattleReplayData
+
+
+@dataclass
+class BatchResult:
+    """`run_battles()` の結果（対戦通番の順）と勝敗の集計。
+
+    Attributes:
+        seed: 各対戦のシードの派生元になった基準シード
+        usernames: 2人のプレイヤーのユーザー名
+        outcomes: 各対戦の結果（対戦通番の順）
+    """
+    seed: int
+    usernames: tuple[str, str]
+    outcomes: list[BattleOutcome] = field(default_factory=list)
+
+    @property
+    def n_battles(self) -> int:
+        """実行した対戦数。"""
+        return len(self.outcomes)
+
+    @property
+    def n_finished(self) -> int:
+        """決着がついた対戦数（ターン上限で決着しなかった対戦を除く）。"""
+        return sum(outcome.winner_index is not None for outcome in self.outcomes)
+
+    @property
+    def wins(self) -> tuple[int, int]:
+        """各プレイヤーの勝利数。"""
+        counts = [0, 0]
+        for outcome in self.outcomes:
+            if outcome.winner_index is not None:
+                counts[outcome.winner_index] += 1
+        return counts[0], counts[1]
+
+    def win_rate(self, player_index: int = 0) -> float:
+        """決着がついた対戦に占める、指定したプレイヤーの勝率を返す。
+
+        Args:
+            player_index: プレイヤーインデックス（0 / 1）
+
+        Returns:
+            勝率（0.0〜1.0）。決着がついた対戦がなければ 0.0
+        """
+        n_finished = self.n_finished
+        if n_finished == 0:
+            return 0.0
+        return self.wins[player_index] / n_finished
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """基準シードと対戦通番から、その対戦のシードを派生させる。
+
+    int のタプルの hash は PYTHONHASHSEED によらずプロセスを跨いで同じ値になるため、
+    子プロセスでも親プロセスと同じシードが得られる（`Battle.reseed_from()` と同じ方式）。
+
+    Args:
+        seed: 基準シード
+        index: 対戦通番
+
+    Returns:
+        32bit のシード
+    """
+    return hash((seed, index)) & 0xFFFFFFFF
+
+
+def _run_one(players_blob: bytes,
+             index: int,
+             seed: int,
+             max_turns: int,
+             battle_kwargs: dict[str, Any]) -> BattleOutcome:
+    """1回の対戦を実行する（子プロセスで呼ばれる）。"""
+    player1, player2 = pickle.loads(players_blob)
+    battle = Battle(player1, player2, seed=seed, **battle_kwargs)
+    battle.play_out(max_turns=max_turns)
+    winner = battle.winner
+    return BattleOutcome(
+        index=index,
+        seed=seed,
+        winner_index=None if winner is None else battle.players.index(winner),
+        turns=battle.turn,
+        replay=battle.build_replay_data(),
+    )
+
+
+def run_battles(player1: Player,
+                player2: Player,
+                n_battles: int,
+                seed: int | None = None,
+                max_workers: int | None = None,
+                max_turns: int = MAX_TURNS,
+                chunksize: int = 1,
+                **battle_kwargs: Any) -> BatchResult:
+    """player1 と player2 の対戦を n_battles 回、プロセス並列で実行する。
+
+    `Player.battle_against()` と同様、決着がついた対戦は両者の戦績
+    （`n_finished_battles` / `n_won_battles` 等）に加算し、ターン上限で決着しなかった
+    対戦は数えない。
+
+    Args:
+        player1: 1人目のプレイヤー（pickle できること）
+        player2: 2人目のプレイヤー（pickle できること）
+        n_battles: 対戦数
+        seed: 基準シード。各対戦は `derive_seed(seed, 対戦通番)` をシードに使う。
+            None の場合はOSの乱数源から生成し、`BatchResult.seed` に記録する
+        max_workers: プロセス数。None の場合は CPU コア数。1 の場合はプロセスを
+            作らずに現在のプロセスで順に実行する（結果は並列実行と同じ）
+        max_turns: 1対戦あたりの最大ターン数
+        chunksize: 1回に子プロセスへ渡す対戦数（`Executor.map` の chunksize）
+        **battle_kwargs: `Battle.__init__` へ素通しするキーワード引数
+            （`n_selected`, `mega_evolution` 等。`seed` は指定できない）
+
+    Returns:
+        対戦通番の順に並んだ各対戦の結果と勝敗の集計
+
+    Raises:
+        ValueError: n_battles が負の場合
+    """
+    if n_battles < 0:
+        raise ValueError(f"n_battles は 0 以上で指定してください: {n_battles}")
+    if seed is None:
+        seed = secrets.randbits(32)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    players_blob = pickle.dumps((player1, player2))
+    indexes = range(n_battles)
+    seeds = [derive_seed(seed, i) for i in indexes]
+    args = (
+        [players_blob] * n_battles, indexes, seeds,
+        [max_turns] * n_battles, [battle_kwargs] * n_battles,
+    )
+
+    if max_workers == 1 or n_battles <= 1:
+        outcomes = list(map(_run_one, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, n_battles)) as executor:
+            outcomes = list(executor.map(_run_one, *args, chunksize=chunksize))
+
+    for outcome in outcomes:
+        if outcome.winner_index is None:
+            continue
+        for i, player in enumerate((player1, player2)):
+            player.n_finished_battles += 1
+            if i == outcome.winner_index:
+                player.n_won_battles += 1
+
+    return BatchResult(
+        seed=seed,
+        usernames=(player1.username, player2.username),
+        outcomes=outcomes,
+    )
@@ -14,6 +14,7 @@ from .literals import (
     HPChangeReason,
     ItemDisabledReason,
     LethalSubject,
+    LethalBackend,
     MoveCategory,
     MoveFlag,
     MoveTarget,
@@ -56,6 +57,7 @@ __all__ = [
     "ItemDisabledReason",
     "ItemName",
     "LethalSubject",
+    "LethalBackend",
     "MoveCategory",
     "MoveFlag",
     "MoveName",
@@ -16,6 +16,7 @@ HpPolicy = Literal["keep_absolute", "keep_ratio", "reset"]
 
 
 LethalSubject = Literal["attacker", "defender"]
+LethalBackend = Literal["dict", "array"]
 
 AbilityDisabledReason = Literal[
     "consumed", "かがくへんかガス", "かたやぶり", "シャドーレイ", "とくせいなし", "フォトンゲイザー", "メテオドライブ",
@@ -6,18 +6,23 @@
 from copy import deepcopy
 
 
-def fast_copy(old, new, keys_to_deepcopy: list[str] | None = None):
+def fast_copy(old, new,
+              keys_to_deepcopy: list[str] | None = None,
+              keys_to_skip: tuple[str, ...] = ()):
     """指定されたkeyのみdeep copyし、それ以外はshallow copyする
 
     Args:
         old: コピー元オブジェクト
         new: コピー先オブジェクト
         keys_to_deepcopy: deep copyする属性名のリスト
+        keys_to_skip: コピーしない属性名（呼び出し側でコピー先に設定する）
 
     Returns:
         コピー先オブジェクト
     """
     for key, val in old.__dict__.items():
+        if key in keys_to_skip:
+            continue
         if keys_to_deepcopy and key in keys_to_deepcopy:
             setattr(new, key, deepcopy(val))
         else:
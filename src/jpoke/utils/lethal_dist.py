@@ -1,12 +1,24 @@
 """致死率計算で使うHP分布（StateDist）の演算ロジック。
 
 Battle・Pokemon・Move に依存しない純粋な分布演算のみを提供する。
+
+分布の加算・減算（畳み込み）には2つの実装（バックエンド）がある。
+
+- "dict": State の組ごとに新しい State を作って集計する（既定）。
+- "array": 分布を状態タグ（HP値以外の State の属性）ごとのバケットに分け、
+  各バケットを「最小HP値 + HP値ごとの出現頻度の整数配列」として畳み込む。
+  State の生成はバケットの組ごとの結果を StateDist に戻すときだけになるため、
+  HP値の種類が多い分布（多段技・複数ターンの計算）で速い。結果は "dict" と同じ。
 """
 
 from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from jpoke.types import LethalBackend
 
 from collections import defaultdict, Counter
 from dataclasses import dataclass
+from operator import add
 
 
 @dataclass(frozen=True)
@@ -91,6 +103,103 @@ def _clip_dist(dist: StateDist,
     return dict(result)
 
 
+# State のうち HP値以外の属性（"array" バックエンドのバケットのキー）
+_Tag = tuple[bool, bool,
+             tuple[tuple[str, int], ...] | None, str | None,
+             tuple[tuple[str, int], ...] | None, str | None]
+
+
+def _to_buckets(dist: StateDist) -> dict[_Tag, tuple[int, list[int]]]:
+    """分布を状態タグごとの (最小HP値, HP値ごとの出現頻度の配列) に変換する。"""
+    values: dict[_Tag, list[tuple[int, int]]] = defaultdict(list)
+    for state, freq in dist.items():
+        tag = (state.ability_enabled, state.item_enabled,
+               state.attacker_boosts, state.attacker_ailment,
+               state.defender_boosts, state.defender_ailment)
+        values[tag].append((state.value, freq))
+
+    buckets = {}
+    for tag, pairs in values.items():
+        offset = min(value for value, _ in pairs)
+        counts = [0] * (max(value for value, _ in pairs) - offset + 1)
+        for value, freq in pairs:
+            counts[value - offset] += freq
+        buckets[tag] = (offset, counts)
+    return buckets
+
+
+def _convolve_counts(a: list[int], b: list[int]) -> list[int]:
+    """出現頻度の配列どうしの畳み込み（a の各要素を b の各要素の位置へずらして加算する）。"""
+    if len(a) < len(b):
+        a, b = b, a
+    n = len(a)
+    result = [0] * (n + len(b) - 1)
+    for shift, freq in enumerate(b):
+        if freq:
+            result[shift:shift + n] = map(add, result[shift:shift + n], [v * freq for v in a])
+    return result
+
+
+def _clip_counts(offset: int,
+                 counts: list[int],
+                 minimum: int | None,
+                 maximum: int | None) -> tuple[int, list[int]]:
+    """出現頻度の配列の HP値を [minimum, maximum] にクランプする（範囲外は端に集約する）。"""
+    if minimum is not None and offset < minimum:
+        k = minimum - offset
+        if k >= len(counts):
+            counts = [sum(counts)]
+        else:
+            head = sum(counts[:k])
+            counts = counts[k:]
+            counts[0] += head
+        offset = minimum
+    if maximum is not None and offset + len(counts) - 1 > maximum:
+        m = maximum - offset
+        if m < 0:
+            return maximum, [sum(counts)]
+        tail = sum(counts[m + 1:])
+        counts = counts[:m + 1]
+        counts[m] += tail
+    return offset, counts
+
+
+def _convolve_array(a: StateDist | list[int] | int,
+                    b: StateDist | list[int] | int,
+                    minimum: int | None = None,
+                    maximum: int | None = None) -> StateDist:
+    """`_convolve` + `_clip_dist` と同じ結果を、状態タグごとの整数配列の畳み込みで計算する。"""
+    x = _to_buckets(to_dist(a))
+    y = _to_buckets(to_dist(b))
+
+    merged: dict[_Tag, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for tx, (ox, cx) in x.items():
+        for ty, (oy, cy) in y.items():
+            tag = (
+                tx[0] and ty[0],
+                tx[1] and ty[1],
+                ty[2] if ty[2] is not None else tx[2],
+                ty[3] if ty[3] is not None else tx[3],
+                ty[4] if ty[4] is not None else tx[4],
+                ty[5] if ty[5] is not None else tx[5],
+            )
+            offset, counts = _clip_counts(ox + oy, _convolve_counts(cx, cy), minimum, maximum)
+            bucket = merged[tag]
+            for i, freq in enumerate(counts):
+                if freq:
+                    bucket[offset + i] += freq
+
+    result = {}
+    for tag, bucket in merged.items():
+        ability_enabled, item_enabled, attacker_boosts, attacker_ailment, defender_boosts, defender_ailment = tag
+        for value, freq in bucket.items():
+            key = State(value=value, ability_enabled=ability_enabled, item_enabled=item_enabled,
+                        attacker_boosts=attacker_boosts, attacker_ailment=attacker_ailment,
+                        defender_boosts=defender_boosts, defender_ailment=defender_ailment)
+            result[key] = freq
+    return result
+
+
 def _convolve(a: StateDist | list[int] | int,
               b: StateDist | list[int] | int) -> StateDist:
     """2つの分布の畳み込みを計算する（HP を加算、フラグは AND）。
@@ -124,8 +233,14 @@ def _convolve(a: StateDist | list[int] | int,
 def add_dist(a: StateDist | list[int] | int,
              b: StateDist | list[int] | int,
              minimum: int | None = None,
-             maximum: int | None = None) -> StateDist:
-    """HP 分布 a に b を加算し、結果を [minimum, maximum] にクランプする。"""
+             maximum: int | None = None,
+             backend: LethalBackend = "dict") -> StateDist:
+    """HP 分布 a に b を加算し、結果を [minimum, maximum] にクランプする。
+
+    backend は畳み込みの実装（"dict" / "array"、モジュールのdocstring参照）で、結果は変わらない。
+    """
+    if backend == "array":
+        return _convolve_array(a, b, minimum=minimum, maximum=maximum)
     result = _convolve(a, b)
     return _clip_dist(result, minimum=minimum, maximum=maximum)
 
@@ -133,8 +248,14 @@ def add_dist(a: StateDist | list[int] | int,
 def subtract_dist(a: StateDist | list[int] | int,
                   b: StateDist | list[int] | int,
                   minimum: int | None = None,
-                  maximum: int | None = None) -> StateDist:
-    """HP 分布 a から b を減算し、結果を [minimum, maximum] にクランプする。"""
-    y = to_dist(b)
-    result = _convolve(a, flip_dist(y))
+                  maximum: int | None = None,
+                  backend: LethalBackend = "dict") -> StateDist:
+    """HP 分布 a から b を減算し、結果を [minimum, maximum] にクランプする。
+
+    backend は畳み込みの実装（"dict" / "array"、モジュールのdocstring参照）で、結果は変わらない。
+    """
+    y = flip_dist(to_dist(b))
+    if backend == "array":
+        return _convolve_array(a, y, minimum=minimum, maximum=maximum)
+    result = _convolve(a, y)
     return _clip_dist(result, minimum=minimum, maximum=maximum)
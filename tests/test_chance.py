@@ -0,0 +1,62 @@
+"""jpoke.core.chance（確率分岐の列挙）の単体テスト"""
+import pytest
+
+from jpoke import Pokemon
+from jpoke.core.chance import ChanceController, expand_chance_outcomes
+from jpoke.enums import Command
+
+from . import test_utils as t
+
+
+def test_ChanceController_ダメージ乱数を区間に分けて中央の乱数で代表させる():
+    controller = ChanceController(script=[0, 3], damage_buckets=4)
+    assert controller.choose_roll(16) == 1
+    assert controller.choose_roll(16) == 13
+    # 指定のない事象は最も確率の高い結果（同確率なら中央寄り）を選ぶ
+    assert controller.choose_roll(16) == 5
+    assert controller.check(0.9) is True
+    assert [choice for choice, _ in controller.trace] == [0, 3, 1, 0]
+    assert controller.trace[0][1] == (0.25, 0.25, 0.25, 0.25)
+    # 確率0・1の判定は事象として記録しない
+    assert controller.check(1.0) is True
+    assert controller.check(0.0) is False
+    assert len(controller.trace) == 4
+
+
+def test_expand_chance_outcomes_結果の確率の合計が1になり分岐元を変更しない():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["10まんボルト"])],
+        team1=[Pokemon("カビゴン", move_names=["のしかかり"])],
+    )
+    player0, player1 = battle.players
+    commands = {player0: Command.MOVE_0, player1: Command.MOVE_0}
+    hp_before = [mon.hp for mon in battle.actives]
+
+    outcomes = list(expand_chance_outcomes(battle, commands, damage_buckets=2))
+    assert len(outcomes) > 1
+    assert sum(p for p, _ in outcomes) == pytest.approx(1.0)
+    # 結果ごとに盤面が異なる（少なくともHPの組が2通り以上ある）
+    assert len({tuple(mon.hp for mon in sim.actives) for _, sim in outcomes}) > 1
+    assert all(sim.chance_controller is None for _, sim in outcomes)
+    assert [mon.hp for mon in battle.actives] == hp_before
+    assert battle.turn == 0
+
+    # 確率の低い結果を展開しないと、確率の合計は1を下回る
+    pruned = list(expand_chance_outcomes(battle, commands, damage_buckets=2, min_probability=0.05))
+    assert len(pruned) < len(outcomes)
+    assert sum(p for p, _ in pruned) < 1.0
+
+
+def test_expand_chance_outcomes_おうじゃのしるしのひるみを分岐として列挙する():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ", item_name="おうじゃのしるし", move_names=["でんこうせっか"])],
+        team1=[Pokemon("カビゴン", move_names=["たいあたり"])],
+    )
+    player0, player1 = battle.players
+    commands = {player0: Command.MOVE_0, player1: Command.MOVE_0}
+    max_hp = battle.actives[0].max_hp
+
+    outcomes = list(expand_chance_outcomes(battle, commands, damage_buckets=1))
+    # ひるんだ結果ではカビゴンが行動できず、ピカチュウのHPが減らない
+    flinched = sum(p for p, sim in outcomes if sim.actives[0].hp == max_hp)
+    assert flinched == pytest.approx(0.1)
@@ -88,10 +88,10 @@ def _find_shared_mutables(old, new, path="battle", seen=None, findings=None):
     return findings
 
 
-def test_copy_logsFalseでdeepcopy中に例外が発生しても複製元のログが復元される():
-    """copy_logs=False の実装は deepcopy 実行前に複製元の event_logger/command_log を
-    一時的に空へ差し替え、完了後に finally で復元する。deepcopy 自体が例外を送出した
-    場合でも、finally によって複製元のログが元通り復元されることを確認する（r7-8回帰）。"""
+def test_copy_logsFalseで複製中も複製元のログを差し替えない():
+    """copy_logs=False の複製は、複製元の event_logger/command_log を一時的にも
+    差し替えずに空の新規ログを持たせることを確認する（複製中に別スレッドが
+    複製元のログを読んでも履歴が欠けない）。"""
     old = t.start_battle(
         team0=[Pokemon("ピカチュウ", move_names=["たいあたり"])],
         team1=[Pokemon("フシギダネ")],
@@ -103,21 +103,23 @@ def test_copy_logsFalseでdeepcopy中に例外が発生しても複製元のロ
     orig_logs = list(old.event_logger.logs)
     assert orig_logs
 
-    def boom(*args, **kwargs):
-        raise RuntimeError("deepcopy failure (test)")
+    seen = []
+    real_fast_copy = battle_module.fast_copy
 
-    real_deepcopy = battle_module.deepcopy
-    battle_module.deepcopy = boom
+    def spy(src, *args, **kwargs):
+        seen.append((src.event_logger, src.command_log))
+        return real_fast_copy(src, *args, **kwargs)
+
+    battle_module.fast_copy = spy
     try:
-        with pytest.raises(RuntimeError):
-            old.copy(copy_logs=False)
+        new = old.copy(copy_logs=False)
     finally:
-        battle_module.deepcopy = real_deepcopy
+        battle_module.fast_copy = real_fast_copy
 
-    # 複製元のログは同一オブジェクトのまま、内容も変わっていない
-    assert old.event_logger is orig_event_logger
-    assert old.command_log is orig_command_log
+    assert seen == [(orig_event_logger, orig_command_log)]
     assert old.event_logger.logs == orig_logs
+    assert new.event_logger.logs == []
+    assert new.command_log == []
 
 
 def test_copy_logsFalseで複製元のログが変更されずかつ複製先への書き込みが波及しない():
@@ -162,6 +164,27 @@ def test_copy_logsFalseで複製先のログが空になる():
     assert new.command_log is not old.command_log
 
 
+def test_copy_on_writeでもcopy_logsFalseなら複製先のログが空になる():
+    """copy_on_write=True でも copy_logs=False の場合は、複製先の event_logger/command_log が
+    履歴を引き継がず、複製元と独立した空のログで始まることを確認する。"""
+    old = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["たいあたり"])],
+        team1=[Pokemon("フシギダネ")],
+        accuracy=100,
+    )
+    t.run_move(old, 0)
+    old_logs_before = list(old.event_logger.logs)
+    assert old_logs_before
+
+    new = old.copy(copy_logs=False, copy_on_write=True)
+
+    assert new.event_logger.logs == []
+    assert new.command_log == []
+    assert new.event_logger is not old.event_logger
+    t.run_move(new, 0)
+    assert old.event_logger.logs == old_logs_before
+
+
 def test_copy_logsTrueで従来通りログの全履歴が引き継がれる():
     """copy_logs=True（既定）の場合、event_logger/command_log の
     対戦開始からの全履歴が複製先に引き継がれることを確認する（r7-8回帰）。"""
@@ -314,5 +337,122 @@ def test_木探索用の観測でswitchフェーズ中の相手コマンドがre
     assert all(cmd.is_move for cmd in captured["commands"])
 
 
+def test_copy_on_writeのコピーで変更がコピー元に波及しない():
+    """copy_on_write=True で作ったコピーに HP・場・ハンドラ登録の変更を加えても、
+    コピー元の状態が変わらないことを確認する。"""
+    old = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["10まんボルト"])],
+        team1=[Pokemon("ゼニガメ", move_names=["たいあたり"])],
+        weather=("はれ", 5),
+        accuracy=100,
+    )
+    old_hp = old.actives[1].hp
+    old_count = old.weather_manager.get("はれ").count
+    old_n_handlers = sum(len(v) for v in old.events.handlers.values())
+
+    new = old.copy(reseed=True, copy_logs=False, copy_on_write=True)
+    new.modify_hp(new.actives[1], v=-10)
+    new.weather_manager.get("はれ").count -= 1
+    new.events.on(Event.ON_TURN_END, Handler(lambda *args: None, source="ability",
+                                              subject_spec="source:self"),
+                  new.actives[0])
+
+    assert old.actives[1].hp == old_hp
+    assert old.weather_manager.get("はれ").count == old_count
+    assert sum(len(v) for v in old.events.handlers.values()) == old_n_handlers
+    assert new.weather_manager.get("はれ").count == old_count - 1
+
+
+def test_copy_on_writeのコピーでハンドラの対象がコピー先の個体に解決される():
+    """共有されたハンドラ登録でも、対象はコピー先の個体に解決されることを確認する。"""
+    old = t.start_battle(
+        team0=[Pokemon("ピカチュウ", ability_name="せいでんき")],
+        team1=[Pokemon("ゼニガメ", ability_name="げきりゅう")],
+    )
+    new = old.copy(copy_on_write=True)
+
+    subjects = [new.events._registered_subject(rh)
+                for rhs in new.events.handlers.values() for rh in rhs]
+    subjects = [s for s in subjects if isinstance(s, Pokemon)]
+    assert subjects
+    for subject in subjects:
+        assert any(subject is mon for mon in new.actives)
+        assert all(subject is not mon for mon in old.actives)
+
+
+def test_copy_on_writeのコピーは場を具体化すれば可変オブジェクトを共有しない():
+    """場の遅延複製をすべて具体化した後は、コピー間で可変オブジェクトを
+    共有しないことを確認する（イベントハンドラ一覧とその並びのキャッシュは共有設計のため除く）。"""
+    old = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["10まんボルト"])],
+        team1=[Pokemon("ゼニガメ", move_names=["たいあたり"])],
+        weather=("はれ", 5),
+        terrain=("エレキフィールド", 5),
+        accuracy=100,
+    )
+    t.run_move(old, 0)
+
+    new = old.copy(copy_on_write=True)
+    for battle in (old, new):
+        for manager in [battle.weather_manager, battle.terrain_manager,
+                        battle.global_manager, *battle.side_managers]:
+            manager.materialize()
+        # copy_on_write() のログは索引を持たず、取得時に作り直す
+        battle.event_logger.get_turn(battle.turn)
+    # ハンドラ一覧とその並びのキャッシュは in-place で変更しない前提で共有する
+    new.events.handlers = {k: list(v) for k, v in new.events.handlers.items()}
+
+    # EventLog は不変（frozen）のため共有してよい
+    findings = [f for f in _find_shared_mutables(old, new)
+                if "events.handlers" not in f
+                and "events._sort_cache" not in f
+                and "event_logger.logs" not in f]
+    assert not findings, (
+        "コピー間で共有されている可変オブジェクト:\n" + "\n".join(findings)
+    )
+
+
+def test_copy_on_writeのミニマックス探索結果が通常コピーと一致する():
+    """MinimaxPlayer の探索結果（各コマンドの評価値）が、copy_on_write の有無に
+    よらず一致することを確認する。"""
+    from jpoke import Battle
+    from jpoke.players import MinimaxPlayer
+
+    def scores(copy_on_write: bool) -> dict:
+        player0 = MinimaxPlayer(username="SearchPlayer", max_plies=2)
+        player0.team = [
+            Pokemon("ピカチュウ", move_names=["10まんボルト", "でんこうせっか"]),
+            Pokemon("ライチュウ", move_names=["たいあたり"]),
+        ]
+        player1 = Player(username="Opponent")
+        player1.team = [
+            Pokemon("ゼニガメ", move_names=["たいあたり", "みずでっぽう"]),
+            Pokemon("カメックス", move_names=["なみのり"]),
+        ]
+        battle = Battle(player0, player1, n_selected=2, seed=1)
+        battle.test_option.accuracy = 100
+        battle.start()
+        for mon in battle.player_states[player1].team:
+            mon.revealed = True
+            for move in mon.moves:
+                move.revealed = True
+
+        original_copy = battle_module.Battle.copy
+
+        def patched_copy(self, *args, **kwargs):
+            kwargs["copy_on_write"] = copy_on_write
+            return original_copy(self, *args, **kwargs)
+
+        battle_module.Battle.copy = patched_copy
+        try:
+            with battle.phase_context("action"):
+                return player0.evaluate_commands(battle)
+        finally:
+            battle_module.Battle.copy = original_copy
+
+    expected = scores(False)
+    assert expected
+    assert scores(True) == expected
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
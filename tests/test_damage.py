@@ -2,6 +2,7 @@
 import pytest
 
 from jpoke import Pokemon
+from jpoke.enums import Event
 
 from . import test_utils as t
 
@@ -103,5 +104,110 @@ def test_急所_防御側の能力ランク上昇を無視する():
     assert critical_with_boost == critical_without_boost
 
 
+
+# ──────────────────────────────────────────────────────────────────
+# 乱数列のメモ化・区間キャッシュ
+# ──────────────────────────────────────────────────────────────────
+
+def test_cache_scope_区間中は補正イベントを発火せずに同じ結果を返す():
+    """区間中の2回目以降の同じ組の計算はキャッシュから返り、モニタリング用属性も
+    復元されること、区間を抜けるとキャッシュが破棄されることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["10まんボルト", "でんこうせっか"])],
+        team1=[Pokemon("ギャラドス")],
+    )
+    attacker, defender = battle.actives
+    calculator = battle.damage_calculator
+    thunderbolt, quick_attack = attacker.moves
+    expected = battle.calc_damages(attacker, defender, thunderbolt)
+
+    stats = battle.events.enable_stats()
+    with calculator.cache_scope():
+        assert battle.calc_damages(attacker, defender, thunderbolt) == expected
+        n_emits = stats[Event.ON_CALC_DAMAGE_MODIFIER].emits
+        battle.calc_damages(attacker, defender, quick_attack)
+        assert calculator.def_type_modifier == 4096
+        assert battle.calc_damages(attacker, defender, thunderbolt) == expected
+        assert calculator.def_type_modifier == 4096 * 4
+        # でんこうせっかの1回分だけ発火している
+        assert stats[Event.ON_CALC_DAMAGE_MODIFIER].emits == n_emits + 1
+
+    battle.calc_damages(attacker, defender, thunderbolt)
+    assert stats[Event.ON_CALC_DAMAGE_MODIFIER].emits == n_emits + 2
+
+
+
+def test_calc_damage_matrix_各組み合わせがcalc_damagesと一致する():
+    """控えを含む防御側の全員について、攻撃側の各技のダメージ乱数列が
+    calc_damages() を個別に呼んだ結果と一致することを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["10まんボルト", "なみのり", "でんじは"])],
+        team1=[Pokemon("ギャラドス"), Pokemon("フシギバナ"), Pokemon("カビゴン", ability_name="あついしぼう")],
+    )
+    player0, player1 = battle.players
+    attacker = battle.get_active(player0)
+    defenders = battle.player_states[player1].team
+
+    matrix = battle.calc_damage_matrix([attacker], defenders)
+
+    assert [move.name for _, move in matrix.rows] == ["10まんボルト", "なみのり", "でんじは"]
+    for i, (_, move) in enumerate(matrix.rows):
+        for j, defender in enumerate(defenders):
+            expected = battle.calc_damages(attacker, defender, move)
+            if not move.base_power:
+                expected = [0] * 16
+            assert matrix.damages(i, j) == expected
+            assert matrix.min_damage(i, j) == expected[0]
+            assert matrix.max_damage(i, j) == expected[-1]
+
+
+def test_calc_damage_matrix_控えの防御側は場に出た場合の特性で計算する():
+    """控えの防御側の列は、そのポケモンが場に出ている場合の calc_damages() と一致し
+    （あついしぼうの補正が反映される）、計算後の盤面とハンドラの登録は元に戻ることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("リザードン", move_names=["かえんほうしゃ"])],
+        team1=[Pokemon("フシギバナ"), Pokemon("カビゴン", ability_name="あついしぼう")],
+    )
+    player0, player1 = battle.players
+    attacker = battle.get_active(player0)
+    defenders = battle.player_states[player1].team
+    handlers = dict(battle.events.handlers)
+
+    matrix = battle.calc_damage_matrix([attacker], defenders)
+
+    assert battle.get_active(player1) is defenders[0]
+    assert battle.events.handlers == handlers
+    move = matrix.rows[0][1]
+    assert matrix.damages(0, 0) == battle.calc_damages(attacker, defenders[0], move)
+
+    lead = t.start_battle(
+        team0=[Pokemon("リザードン", move_names=["かえんほうしゃ"])],
+        team1=[Pokemon("カビゴン", ability_name="あついしぼう")],
+    )
+    expected = lead.calc_damages(lead.actives[0], lead.actives[1], lead.actives[0].moves[0])
+    assert matrix.damages(0, 1) == expected
+    # 控えのまま計算した場合（あついしぼうが反映されない）より小さい
+    assert matrix.max_damage(0, 1) < max(battle.calc_damages(attacker, defenders[1], move))
+
+
+def test_calc_damage_matrix_技を指定するとその技で計算する():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("ギャラドス"), Pokemon("ヌオー")],
+    )
+    player0, player1 = battle.players
+    attacker = battle.get_active(player0)
+    defenders = battle.player_states[player1].team
+
+    matrix = battle.calc_damage_matrix([attacker], defenders, moves=["10まんボルト"], critical=True)
+
+    assert len(matrix.rows) == 1
+    move = matrix.rows[0][1]
+    assert move.name == "10まんボルト"
+    assert matrix.damages(0, 0) == battle.calc_damages(attacker, defenders[0], move, critical=True)
+    # ヌオー（じめんタイプ）にでんき技は効果がない
+    assert matrix.max_damage(0, 1) == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
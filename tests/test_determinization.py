@@ -0,0 +1,39 @@
+"""jpoke.players.determinization（相手の非公開情報の決定化）の単体テスト。"""
+import random
+
+import pytest
+
+from jpoke import Battle, Player, Pokemon
+from jpoke.players.determinization import OpponentPrior, sample_opponent
+
+
+def test_sample_opponent_公開済みの情報を残して未公開の技と特性を補う():
+    player = Player(username="Player")
+    player.team = [Pokemon("ピカチュウ", move_names=["たいあたり"])]
+    opponent = Player(username="Opponent")
+    opponent.team = [Pokemon("ゼニガメ", move_names=["たいあたり", "みずでっぽう"])]
+    battle = Battle(player, opponent, n_selected=1, seed=1)
+    battle.start()
+    battle.player_states[opponent].team[0].moves[0].revealed = True
+    observation = battle.build_observation(player)
+    mon = observation.player_states[observation.opponent(player)].team[0]
+    assert [move.name for move in mon.moves] == ["たいあたり"]
+
+    prior = OpponentPrior(
+        moves={"ゼニガメ": {"たいあたり": 1.0, "あわ": 1.0, "かたくなる": 1.0}},
+        abilities={"ゼニガメ": {"あめうけざら": 1.0}},
+        n_moves=3,
+    )
+    sample_opponent(observation, observation.opponent(player), prior, random.Random(0))
+
+    # 公開済みの技は先頭に残り、残りは候補から重複なく選ばれる
+    assert mon.moves[0].name == "たいあたり"
+    assert sorted(move.name for move in mon.moves[1:]) == sorted(["あわ", "かたくなる"])
+    assert mon.ability.name == "あめうけざら"
+    # 観測の元になった実際の対戦は変更されない
+    real = battle.player_states[opponent].team[0]
+    assert [move.name for move in real.moves] == ["たいあたり", "みずでっぽう"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -2,8 +2,10 @@
 
 回帰テストの由来: .internal/review/code/event_log_audit.md
 """
-from jpoke import Pokemon
+from jpoke import Battle, Pokemon
+from jpoke.core.event_logger import EventLogger, NullEventLogger
 from jpoke.enums import LogCode
+from jpoke.players import RandomPlayer
 
 from . import test_utils as t
 
@@ -44,3 +46,109 @@ def test_seqが記録順に連番で採番される():
     seqs = [log.seq for log in logs]
     assert seqs == sorted(seqs)
     assert seqs == list(range(len(logs)))
+
+
+def _linear_get(logger: EventLogger, turn: int | None, idx: int | None = None,
+                log: LogCode | None = None) -> list:
+    """索引を使わずに全ログを走査した結果（比較用）。"""
+    return [
+        entry for entry in logger.logs
+        if (turn is None or entry.turn == turn)
+        and (idx is None or entry.idx == idx)
+        and (log is None or entry.log == log)
+    ]
+
+
+def test_索引による取得が全ログの走査と一致する():
+    """EventLogger.get/get_turn/get_player/get_by_code: ターンが戻る記録や
+    truncate・複製の後も、索引を使った取得結果が全ログの走査と一致すること"""
+    logger = EventLogger()
+    codes = [LogCode.HP_CHANGED, LogCode.STAT_CHANGED, LogCode.SWITCHED_IN]
+    # ターン1は2つの区間に分かれる（ターン2の後にターン1の記録が来る）
+    turns = [0, 0, 1, 1, 1, 2, 2, 1, 3, 3, 3, 3]
+    for i, turn in enumerate(turns):
+        logger.add(turn, i % 2, codes[i % 3])
+
+    def check(logger: EventLogger):
+        for turn in range(5):
+            assert logger.get_turn(turn) == _linear_get(logger, turn)
+            for idx in (0, 1):
+                assert logger.get(turn, idx) == _linear_get(logger, turn, idx)
+            for code in codes:
+                assert logger.get_by_code(code, turn) == _linear_get(logger, turn, log=code)
+        for idx in (0, 1):
+            assert logger.get_player(idx) == _linear_get(logger, None, idx)
+        for code in codes:
+            assert logger.get_by_code(code) == _linear_get(logger, None, log=code)
+
+    check(logger)
+    assert len(logger.get_turn(1)) == 4
+
+    copied = logger.copy_on_write()
+    logger.truncate(6)
+    check(logger)
+    assert logger.get_turn(3) == []
+    # 索引を作成した後の記録・複製先への記録も索引に反映される
+    logger.add(3, 0, LogCode.HP_CHANGED)
+    copied.add(4, 1, LogCode.SWITCHED_IN)
+    check(logger)
+    check(copied)
+    assert len(copied.get_turn(3)) == 4
+    assert [log.seq for log in logger.logs] == list(range(len(logger.logs)))
+
+    # 複製先は索引を作り直す前に truncate・記録しても、取得時に全ログから作り直す
+    truncated = copied.copy_on_write()
+    truncated.truncate(4)
+    truncated.add(2, 1, LogCode.STAT_CHANGED)
+    check(truncated)
+    assert [log.seq for log in truncated.logs] == list(range(5))
+
+
+def _play(seed: int, **kwargs) -> Battle:
+    """RandomPlayer 同士の3vs3を決着まで進めた Battle を返す。"""
+    teams = [
+        [Pokemon("ピカチュウ", move_names=["10まんボルト", "でんじは", "かげぶんしん"]),
+         Pokemon("リザードン", move_names=["かえんほうしゃ", "にほんばれ", "つるぎのまい"]),
+         Pokemon("カビゴン", item_name="たべのこし", move_names=["のしかかり", "あくび"])],
+        [Pokemon("カメックス", move_names=["なみのり", "からにこもる"]),
+         Pokemon("フシギバナ", move_names=["ギガドレイン", "どくどく", "やどりぎのタネ"]),
+         Pokemon("ゲンガー", item_name="オボンのみ", move_names=["シャドーボール", "さいみんじゅつ"])],
+    ]
+    players = []
+    for i, team in enumerate(teams):
+        player = RandomPlayer(f"Player{i + 1}")
+        player.team = team
+        players.append(player)
+    battle = Battle(*players, seed=seed, **kwargs)
+    battle.play_out()
+    return battle
+
+
+def test_log_codesで記録するログを絞っても対戦の進行は変わらない():
+    """Battle(log_codes=...): 指定した LogCode のログだけを記録し（空なら何も記録しない）、
+    記録の有無によらず同じシードの対戦が同じ経過をたどること。設定は複製にも引き継がれる"""
+    full = _play(seed=3)
+    only_hp = _play(seed=3, log_codes=[LogCode.HP_CHANGED])
+    silent = _play(seed=3, log_codes=())
+
+    for battle in (only_hp, silent):
+        assert battle.turn == full.turn
+        assert battle.winner is not None and battle.winner.username == full.winner.username
+        assert battle.random.getstate() == full.random.getstate()
+        assert battle.command_log == full.command_log
+
+    expected = [
+        (log.turn, log.idx, log.payload, log.pokemon)
+        for log in full.event_logger.logs if log.log == LogCode.HP_CHANGED
+    ]
+    assert expected
+    assert [(log.turn, log.idx, log.payload, log.pokemon) for log in only_hp.event_logger.logs] == expected
+    assert isinstance(silent.event_logger, NullEventLogger)
+    assert silent.event_logger.logs == []
+
+    for copy_logs in (True, False):
+        for copy_on_write in (True, False):
+            copied = only_hp.copy(copy_logs=copy_logs, copy_on_write=copy_on_write)
+            assert copied.event_logger.codes == frozenset([LogCode.HP_CHANGED])
+            assert isinstance(silent.copy(copy_logs=copy_logs, copy_on_write=copy_on_write).event_logger,
+                              NullEventLogger)
@@ -0,0 +1,126 @@
+"""EventManager のハンドラ並び替えキャッシュと発火回数の集計の単体テスト"""
+import pytest
+
+from jpoke import Pokemon
+from jpoke.core import EventContext, Handler, HandlerReturn
+from jpoke.enums import Event
+
+from . import test_utils as t
+
+
+def _register_recorder(battle, calls: list, mon, priority: int = 100,
+                       skip_subject_check: bool = True) -> Handler:
+    """呼ばれたときに主体を calls に記録するハンドラを ON_TURN_END に登録する。"""
+    def func(battle, ctx, value):
+        calls.append(mon)
+        return HandlerReturn(value=value)
+
+    handler = Handler(func, source="ability", subject_spec="source:self",
+                      priority=priority, skip_subject_check=skip_subject_check)
+    battle.events.on(Event.ON_TURN_END, handler, mon)
+    return handler
+
+
+def test_sort_handlers_キャッシュ利用時も素早さの変化を反映する():
+    """同じ優先度のハンドラは、並びのキャッシュを使う2回目以降の発火でも
+    その時点の素早さ順に実行されることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ゲンガー")],
+        team1=[Pokemon("カメックス")],
+    )
+    fast, slow = battle.actives
+    calls = []
+    _register_recorder(battle, calls, slow)
+    _register_recorder(battle, calls, fast)
+
+    battle.events.emit(Event.ON_TURN_END)
+    assert calls == [fast, slow]
+
+    calls.clear()
+    battle.set_ailment(fast, "まひ")
+    stats = battle.events.enable_stats()
+    battle.events.emit(Event.ON_TURN_END)
+    assert stats[Event.ON_TURN_END].sort_cache_hits == 1
+    assert calls == [slow, fast]
+
+
+def test_sort_handlers_ハンドラの登録解除でキャッシュを作り直す():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    fast, slow = battle.actives
+    calls = []
+    handler = _register_recorder(battle, calls, fast)
+    battle.events.emit(Event.ON_TURN_END)
+
+    # 優先度の高い（値の小さい）ハンドラを追加すると、素早さによらず先に実行される
+    _register_recorder(battle, calls, slow, priority=10)
+    calls.clear()
+    battle.events.emit(Event.ON_TURN_END)
+    assert calls == [slow, fast]
+
+    battle.events.off(Event.ON_TURN_END, handler, fast)
+    calls.clear()
+    battle.events.emit(Event.ON_TURN_END)
+    assert calls == [slow]
+
+
+def test_enable_stats_イベントごとの発火回数を集計する():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    fast, slow = battle.actives
+    calls = []
+    _register_recorder(battle, calls, fast)
+    _register_recorder(battle, calls, slow)
+    n_handlers = len(battle.events.handlers[Event.ON_TURN_END])
+
+    stats = battle.events.enable_stats()
+    for _ in range(3):
+        battle.events.emit(Event.ON_TURN_END)
+
+    turn_end = stats[Event.ON_TURN_END]
+    assert turn_end.emits == 3
+    assert turn_end.handler_calls >= 2 * 3
+    assert turn_end.handler_calls <= n_handlers * 3
+    # 1回目はキャッシュを作り、2回目以降はキャッシュを使う
+    assert turn_end.sort_cache_hits == 2
+    # 主体の異なる同じ優先度のハンドラがあるため、発火ごとに2体分の素早さを計算する
+    assert turn_end.speed_evaluations == 2 * 3
+
+    # 複製には集計を引き継がない
+    assert battle.copy().events.stats is None
+    assert battle.copy(copy_on_write=True).events.stats is None
+
+    battle.events.disable_stats()
+    battle.events.emit(Event.ON_TURN_END)
+    assert battle.events.stats is None
+
+
+def test_emit_コンテキストのロールに一致しない主体のハンドラは有効判定しない():
+    """コンテキストを与えて発火すると、主体の索引で対象外のハンドラを除外し、
+    プレイヤーを主体とするハンドラは場のポケモンに一致する場合だけ実行されることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ゲンガー")],
+        team1=[Pokemon("カメックス")],
+    )
+    mon0, mon1 = battle.actives
+    player0, player1 = battle.players
+    calls = []
+    for subject in (mon0, mon1, player0, player1):
+        _register_recorder(battle, calls, subject, skip_subject_check=False)
+    n_handlers = len(battle.events.handlers[Event.ON_TURN_END])
+
+    stats = battle.events.enable_stats()
+    battle.events.emit(Event.ON_TURN_END, EventContext(source=mon1))
+
+    assert calls == [mon1, player1]
+    turn_end = stats[Event.ON_TURN_END]
+    assert turn_end.validity_checks + turn_end.index_skips == n_handlers
+    assert turn_end.index_skips >= 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""jpoke.core.features（盤面の特徴量ベクトル）と jpoke.players.evaluator の単体テスト"""
+import pytest
+
+from jpoke import Pokemon
+from jpoke.core.features import FEATURE_NAMES, N_FEATURES, extract_features
+from jpoke.players.evaluator import BatchEvaluator, FeatureEvaluator, LinearEvaluator
+
+from . import test_utils as t
+
+
+def test_extract_features_盤面の状態を名前に対応する位置に書き込む():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ"), Pokemon("カビゴン")],
+        team1=[Pokemon("ギャラドス")],
+        ailment1=("まひ", None),
+        weather=("あめ", 5),
+        side0={"リフレクター": 3},
+        field={"トリックルーム": 4},
+    )
+    player, opponent = battle.players
+    battle.modify_stats(battle.get_active(player), {"atk": 2})
+    battle.get_active(opponent).hp //= 2
+
+    features = extract_features(battle, player)
+    assert len(features) == N_FEATURES == len(FEATURE_NAMES)
+    values = dict(zip(FEATURE_NAMES, features))
+    assert values["self.slot0.active"] == 1.0
+    assert values["self.slot1.hp"] == 1.0
+    assert values["self.slot1.active"] == 0.0
+    assert values["self.boost.atk"] == pytest.approx(2 / 6)
+    assert values["self.side_field.リフレクター"] == 3
+    assert values["opponent.slot0.hp"] == pytest.approx(battle.get_active(opponent).hp_fraction)
+    assert values["opponent.slot0.ailment.まひ"] == 1.0
+    # チームにいない枠は0で埋める
+    assert values["opponent.slot1.hp"] == 0.0
+    assert values["weather.あめ"] == 1.0
+    assert values["weather.count"] == 5
+    assert values["global_field.トリックルーム"] == 4
+    # でんき → みず・ひこう は4倍、みず・ひこう → でんき は最大でも等倍
+    assert values["offense.super_effective"] == 1.0
+    assert [values[f"defense.{name}"] for name in ("super_effective", "resisted", "immune")] == [0.0] * 3
+
+    # 相手の視点では自分と相手の項目が入れ替わる
+    mirrored = dict(zip(FEATURE_NAMES, extract_features(battle, opponent)))
+    assert mirrored["self.slot0.ailment.まひ"] == 1.0
+    assert mirrored["opponent.boost.atk"] == pytest.approx(2 / 6)
+
+
+def test_extract_features_構造共有の複製の場の状態を複製しない():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("ギャラドス")],
+        weather=("あめ", 5),
+        terrain=("エレキフィールド", 5),
+        side0={"リフレクター": 3},
+    )
+    copied = battle.copy(copy_on_write=True)
+    player = copied.players[0]
+
+    values = dict(zip(FEATURE_NAMES, extract_features(copied, player)))
+    assert values["weather.あめ"] == 1.0
+    assert values["terrain.エレキフィールド"] == 1.0
+    assert values["terrain.count"] == 5
+    for manager in copied._field_managers():
+        assert manager._shared == set(manager._fields)
+
+
+def test_LinearEvaluator_特徴量の重み付き和で盤面をまとめて評価する():
+    weights = [0.0] * N_FEATURES
+    weights[FEATURE_NAMES.index("self.slot0.hp")] = 1.0
+    weights[FEATURE_NAMES.index("opponent.slot0.hp")] = -1.0
+    evaluator = LinearEvaluator(weights, bias=0.5)
+    battle = t.start_battle(team0=[Pokemon("ピカチュウ")], team1=[Pokemon("カビゴン")])
+    player, opponent = battle.players
+    damaged = battle.copy()
+    damaged.get_active(opponent).hp //= 2
+
+    scores = evaluator.evaluate_batch([battle, damaged], player)
+    assert scores[0] == pytest.approx(0.5)
+    assert scores[1] == pytest.approx(0.5 + 1 - damaged.get_active(opponent).hp_fraction)
+
+    with pytest.raises(ValueError):
+        LinearEvaluator([1.0])
+
+
+def test_評価器の基底クラスは評価メソッドを実装しないとインスタンス化できない():
+    with pytest.raises(TypeError):
+        BatchEvaluator()
+    with pytest.raises(TypeError):
+        FeatureEvaluator()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
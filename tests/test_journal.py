@@ -0,0 +1,167 @@
+"""Battle.checkpoint() / rollback()（巻き戻しによる木探索）の単体テスト"""
+import pytest
+
+from jpoke import Battle, Player, Pokemon
+from jpoke.enums import Command
+from jpoke.players import MinimaxPlayer
+
+from . import test_utils as t
+
+
+def _start_search_battle(search_player: Player) -> Battle:
+    """探索プレイヤーと技・控えが公開済みの相手による2vs2のバトルを開始する。"""
+    search_player.team = [
+        Pokemon("ピカチュウ", ability_name="せいでんき",
+                move_names=["10まんボルト", "でんこうせっか", "かげぶんしん"]),
+        Pokemon("リザードン", ability_name="もうか", move_names=["かえんほうしゃ", "にほんばれ"]),
+    ]
+    opponent = Player(username="Opponent")
+    opponent.team = [
+        Pokemon("カメックス", ability_name="げきりゅう", move_names=["なみのり", "あまごい"]),
+        Pokemon("フシギバナ", ability_name="しんりょく", move_names=["やどりぎのタネ", "どくどく"]),
+    ]
+    battle = Battle(search_player, opponent, n_selected=2, seed=3)
+    battle.test_option.accuracy = 100
+    battle.start()
+    for mon in battle.player_states[opponent].team:
+        mon.revealed = True
+        for move in mon.moves:
+            move.revealed = True
+    return battle
+
+
+def test_rollback_状態変更APIによる変更を取り消す():
+    """modify_hp/modify_stats/set_ailment/set_volatile/set_weather による変更が
+    巻き戻し地点の状態に戻ることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    mon = battle.actives[1]
+    hp = mon.hp
+    handler_lists = dict(battle.events.handlers)
+
+    checkpoint = battle.checkpoint()
+    battle.modify_hp(mon, v=-30)
+    battle.modify_stats(mon, {"atk": 2, "spe": -1})
+    battle.set_ailment(mon, "まひ")
+    battle.set_volatile(mon, "こんらん", count=3)
+    battle.set_weather("すなあらし")
+    battle.rollback(checkpoint)
+
+    assert mon.hp == hp
+    assert mon.boosts["atk"] == 0 and mon.boosts["spe"] == 0
+    assert not mon.ailment.is_active
+    assert "こんらん" not in mon.volatiles
+    assert not battle.weather.is_active
+    assert battle.events.handlers == handler_lists
+
+
+def test_rollback_ターン進行後に同じ結果を再現できる():
+    """step() の前に作った巻き戻し地点へ戻すと、複製した盤面と同じ結果で
+    同じターンを何度でも進め直せることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["10まんボルト", "でんこうせっか"]),
+               Pokemon("ライチュウ", move_names=["たいあたり"])],
+        team1=[Pokemon("ゼニガメ", move_names=["たいあたり", "みずでっぽう"]),
+               Pokemon("カメックス", move_names=["なみのり"])],
+        weather=("あめ", 5),
+    )
+    player0, player1 = battle.players
+    commands = {player0: Command.MOVE_0, player1: Command.MOVE_1}
+
+    reference = battle.copy()
+    reference.step(commands)
+    expected_logs = [(log.log, log.payload) for log in reference.event_logger.logs]
+    expected_hp = [mon.hp for mon in reference.actives]
+
+    checkpoint = battle.checkpoint()
+    for _ in range(2):
+        battle.step(commands)
+        assert [(log.log, log.payload) for log in battle.event_logger.logs] == expected_logs
+        assert [mon.hp for mon in battle.actives] == expected_hp
+        battle.rollback(checkpoint)
+
+    assert battle.turn == reference.turn - 1
+    assert battle.weather.count == 5
+
+
+def test_rollback_入れ子の巻き戻し地点を逆順に使える():
+    """内側の巻き戻し地点へ戻した後に外側の巻き戻し地点へ戻せること、
+    外側へ戻した後は内側の巻き戻し地点が使えないことを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    mon = battle.actives[1]
+    hp = mon.hp
+
+    outer = battle.checkpoint()
+    battle.modify_hp(mon, v=-10)
+    inner = battle.checkpoint()
+    battle.modify_hp(mon, v=-20)
+    battle.set_terrain("エレキフィールド")
+
+    battle.rollback(inner)
+    assert mon.hp == hp - 10
+    assert not battle.terrain.is_active
+
+    battle.rollback(outer)
+    assert mon.hp == hp
+
+    with pytest.raises(ValueError):
+        battle.rollback(inner)
+
+
+def test_rollback_別のBattleの巻き戻し地点は使えない():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    other = battle.copy()
+    checkpoint = battle.checkpoint()
+
+    with pytest.raises(ValueError):
+        other.rollback(checkpoint)
+
+
+def test_rollback_構造共有コピーの複製元の場を変更しない():
+    """copy_on_write で作った複製の上で巻き戻しを繰り返しても、
+    複製元と共有している Field が書き換えられないことを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ", move_names=["たいあたり"])],
+        team1=[Pokemon("ゼニガメ", move_names=["たいあたり"])],
+        weather=("はれ", 5),
+        accuracy=100,
+    )
+    player0, player1 = battle.players
+    sim = battle.copy(copy_on_write=True)
+
+    checkpoint = sim.checkpoint()
+    for _ in range(2):
+        sim.step({player0: Command.MOVE_0, player1: Command.MOVE_0})
+        assert sim.weather.count == 4
+        sim.rollback(checkpoint)
+        # 巻き戻し後の複製からさらに複製しても複製元には影響しない
+        sim.copy(copy_on_write=True).weather_manager.get("はれ").count = 1
+
+    assert battle.weather.count == 5
+    assert sim.weather.count == 5
+
+
+def test_MinimaxPlayer_use_rollbackでも探索結果が変わらない():
+    """use_rollback=True（分岐を巻き戻しで使い回す）の評価値が、分岐ごとに
+    複製する場合と一致することを確認する。"""
+    results = []
+    for use_rollback in (False, True):
+        player = MinimaxPlayer(username="SearchPlayer", max_plies=2, use_rollback=use_rollback)
+        battle = _start_search_battle(player)
+        with battle.phase_context("action"):
+            results.append(player.evaluate_commands(battle))
+
+    assert results[0]
+    assert results[0] == results[1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
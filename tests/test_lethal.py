@@ -24,15 +24,28 @@
 """
 import pytest
 
-from jpoke import Pokemon, Move
+from jpoke import Battle, Pokemon, Move
 from jpoke.core import lethal as core_lethal
 from jpoke.core.lethal import LethalContext
 from jpoke.handlers import lethal as l
-from jpoke.utils.lethal_dist import State, to_dist
+from jpoke.utils.lethal_dist import State, add_dist, subtract_dist, to_dist
 
 from . import test_utils as t
 
 
+@pytest.fixture(autouse=True, params=["dict", "array"])
+def lethal_backend(request, monkeypatch):
+    """このファイルの全テストを、HP分布の演算の両方の実装（backend）で実行する。"""
+    calc_lethal = Battle.calc_lethal
+
+    def calc_lethal_with_backend(self, *args, **kwargs):
+        kwargs.setdefault("backend", request.param)
+        return calc_lethal(self, *args, **kwargs)
+
+    monkeypatch.setattr(Battle, "calc_lethal", calc_lethal_with_backend)
+    return request.param
+
+
 def test_Gのちから_ぼうぎょダウン_secondary有り():
     """Gのちから: secondary=True のとき相手のぼうぎょが1段階下がり、2発目のダメージが増加する"""
     battle = t.start_battle(
@@ -1855,3 +1868,127 @@ def test_複数技_順に使用():
     assert results[1].move.name == "ドラゴンクロー"
     assert results[-1].attack_count == 1
     assert results[-1].lethal_probability == pytest.approx(0.9453, abs=0.001)
+
+
+def test_lethal_dist_arrayバックエンドの加減算がdictバックエンドと一致する():
+    """状態タグ（特性・道具の有効フラグ、ランク補正・状態異常）が混在する分布の
+    加算・減算とクランプが、両方の実装で同じ分布になることを確認する。"""
+    boosts = (("atk", 1),)
+    hp_dist = {
+        State(100): 3,
+        State(97, ability_enabled=False): 2,
+        State(60, item_enabled=False, defender_boosts=boosts, defender_ailment="どく"): 1,
+        State(12, defender_boosts=boosts, defender_ailment="どく"): 5,
+    }
+    damage_dist = {
+        State(10): 1,
+        State(13): 4,
+        State(40, ability_enabled=False, attacker_boosts=boosts, attacker_ailment=""): 2,
+    }
+
+    for minimum, maximum in [(None, None), (0, None), (None, 98), (0, 98), (50, 60)]:
+        for op in (add_dist, subtract_dist):
+            expected = op(hp_dist, damage_dist, minimum=minimum, maximum=maximum)
+            assert op(hp_dist, damage_dist, minimum=minimum, maximum=maximum, backend="array") == expected
+        assert subtract_dist(hp_dist, [20, 21, 21], minimum=minimum, maximum=maximum, backend="array") \
+            == subtract_dist(hp_dist, [20, 21, 21], minimum=minimum, maximum=maximum)
+
+
+def test_calc_lethal_近似計算の致死率の誤差がerror_bound以下になる():
+    """prune_threshold / max_states で枝を切り捨てると状態数が上限以下になり、
+    厳密な計算との致死率の差が error_bound 以下に収まることを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ガブリアス")],
+        team1=[Pokemon("カイリュー")],
+    )
+    attacker = battle.actives[0]
+    exact = battle.calc_lethal(attacker, Move("たいあたり"), max_attack=10)
+    assert all(result.error_bound == 0.0 for result in exact)
+
+    # 閾値 0 は厳密な計算と同じ
+    no_pruning = battle.calc_lethal(attacker, Move("たいあたり"), max_attack=10, prune_threshold=0.0)
+    assert [r.hp_dist for r in no_pruning] == [r.hp_dist for r in exact]
+
+    for kwargs in (dict(prune_threshold=0.02), dict(max_states=5)):
+        approx = battle.calc_lethal(attacker, Move("たいあたり"), max_attack=10, **kwargs)
+        assert approx[-1].error_bound > 0.0
+        for e, a in zip(exact, approx):
+            assert abs(a.lethal_probability - e.lethal_probability) <= a.error_bound
+        if "max_states" in kwargs:
+            assert all(len(r.hp_dist) <= kwargs["max_states"] for r in approx)
+
+    with pytest.raises(ValueError):
+        battle.calc_lethal(attacker, Move("たいあたり"), prune_threshold=1.0)
+    with pytest.raises(ValueError):
+        battle.calc_lethal(attacker, Move("たいあたり"), max_states=0)
+
+
+def test_prune_dist_HP0の状態も含めて上限以下に束ねる():
+    """HP=0 の状態は1つにまとめて max_states に数え、それ以外の残さない状態は
+    HP 以外のタグが同じで HP が最も近い状態に合算することを確認する。"""
+    from jpoke.core.lethal import _prune_dist
+    from jpoke.utils.lethal_dist import State
+
+    hp_dist = {
+        State(0, item_enabled=False): 3,
+        State(0): 1,
+        State(50): 10,
+        State(48): 2,
+        State(30): 1,
+        State(40, item_enabled=False): 4,
+        State(10, item_enabled=False): 1,
+    }
+    total = sum(hp_dist.values())
+
+    pruned, moved = _prune_dist(hp_dist, 0.0, 3)
+    assert pruned == {
+        State(0, item_enabled=False): 3 + 1,
+        State(50): 10 + 2 + 1,
+        State(40, item_enabled=False): 4 + 1,
+    }
+    # HP=0 の状態どうしの合算は誤差に数えない
+    assert moved == pytest.approx((2 + 1 + 1) / total)
+
+    # 上限1では HP=0 の状態だけが残り、合算先のない状態は切り捨てる
+    pruned, moved = _prune_dist(hp_dist, 0.0, 1)
+    assert pruned == {State(0, item_enabled=False): 4}
+    assert moved == pytest.approx((total - 4) / total)
+
+
+def test_calc_lethal_複製元のバトル状態を変更しない():
+    """持ち物の消費・ランク変化・天候のある計算の後も、複製元のポケモン・場・
+    ハンドラの登録・ログが変わらないことを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("ガブリアス")],
+        team1=[Pokemon("カイリュー", item_name="オボンのみ")],
+        weather=("すなあらし", 5),
+    )
+    attacker, defender = battle.actives
+    handlers = dict(battle.events.handlers)
+    n_logs = len(battle.event_logger.logs)
+    hp = defender.hp
+
+    battle.calc_lethal(attacker, [(Move("スケイルショット"), 5)], max_attack=3, move_secondary=True)
+
+    assert defender.hp == hp
+    assert defender.item.name == "オボンのみ"
+    assert attacker.boosts["def"] == 0 and attacker.boosts["spe"] == 0
+    assert battle.weather.count == 5
+    assert battle.events.handlers == handlers
+    assert len(battle.event_logger.logs) == n_logs
+
+
+def test_calc_lethal_呼び出し後に取得し直したFieldへの書き込みが複製元に反映される():
+    battle = t.start_battle(
+        team0=[Pokemon("ガブリアス")],
+        team1=[Pokemon("カイリュー")],
+        weather=("すなあらし", 5),
+    )
+    attacker = battle.actives[0]
+
+    battle.calc_lethal(attacker, Move("たいあたり"), max_attack=2)
+
+    weather = battle.weather_manager.get("すなあらし")
+    weather.count = 2
+    assert battle.weather_manager.get("すなあらし") is weather
+    assert battle.weather.count == 2
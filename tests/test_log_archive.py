@@ -0,0 +1,117 @@
+"""jpoke.core.log_archive（イベントログの列指向のバイナリ形式）の単体テスト"""
+import io
+import json
+
+import pytest
+
+from jpoke import Battle, Pokemon
+from jpoke.core.log_archive import COLUMNS, LogArchiveWriter, read_log_archive
+from jpoke.core.log_payload import HPChangePayload, StatChangePayload
+from jpoke.enums import LogCode
+from jpoke.players import RandomPlayer
+
+
+def _play(seed: int) -> Battle:
+    """RandomPlayer 同士の3vs3を決着まで進めた Battle を返す。"""
+    teams = [
+        [Pokemon("ピカチュウ", move_names=["10まんボルト", "でんじは", "かげぶんしん"]),
+         Pokemon("リザードン", move_names=["かえんほうしゃ", "にほんばれ", "つるぎのまい"]),
+         Pokemon("カビゴン", item_name="たべのこし", move_names=["のしかかり", "あくび"])],
+        [Pokemon("カメックス", move_names=["なみのり", "からにこもる"]),
+         Pokemon("フシギバナ", move_names=["ギガドレイン", "どくどく", "やどりぎのタネ"]),
+         Pokemon("ゲンガー", item_name="オボンのみ", move_names=["シャドーボール", "さいみんじゅつ"])],
+    ]
+    players = []
+    for i, team in enumerate(teams):
+        player = RandomPlayer(f"Player{i + 1}")
+        player.team = team
+        players.append(player)
+    battle = Battle(*players, seed=seed)
+    battle.play_out()
+    return battle
+
+
+def test_書き出したログを対戦ごとに列として読み込める():
+    battles = [_play(seed) for seed in (1, 2)]
+    buffer = io.BytesIO()
+    with LogArchiveWriter(buffer) as writer:
+        for battle in battles:
+            writer.write(battle)
+    buffer.seek(0)
+
+    blocks = list(read_log_archive(buffer))
+    assert len(blocks) == 2
+    for battle, block in zip(battles, blocks):
+        logs = battle.event_logger.logs
+        assert block.seed == battle.seed
+        assert block.turn_count == battle.turn
+        assert block.winner == battle.players.index(battle.winner)
+        assert len(block) == len(logs)
+        assert set(block.columns) == set(COLUMNS)
+        assert list(block["turn"]) == [log.turn for log in logs]
+        assert list(block["idx"]) == [log.idx for log in logs]
+        assert block.decode_codes() == [log.log for log in logs]
+        assert block.decode("pokemon") == [log.pokemon for log in logs]
+
+        for i, log in enumerate(logs):
+            if isinstance(log.payload, HPChangePayload):
+                assert (block["value"][i], block["hp"][i], block["max_hp"][i]) == (
+                    log.payload.value, log.payload.hp, log.payload.max_hp)
+                assert block.decode("source")[i] == log.payload.source
+            elif isinstance(log.payload, StatChangePayload):
+                for stat, v in log.payload.stats.items():
+                    assert block[stat][i] == v
+            elif log.log == LogCode.PP_CONSUMED:
+                assert block.decode("name")[i] == log.payload.move
+                assert block["value"][i] == log.payload.value
+        assert any(isinstance(log.payload, HPChangePayload) for log in logs)
+
+    # JSON（to_dict()）より小さい
+    size_json = sum(len(json.dumps([log.to_dict() for log in b.event_logger.logs])) for b in battles)
+    assert len(buffer.getvalue()) < size_json / 5
+
+
+def test_形式の異なるファイル_途中で切れたファイルは例外を送出する():
+    with pytest.raises(ValueError):
+        list(read_log_archive(io.BytesIO(b"JSON{}")))
+
+    buffer = io.BytesIO()
+    with LogArchiveWriter(buffer) as writer:
+        writer.write(_play(1))
+    with pytest.raises(ValueError):
+        list(read_log_archive(io.BytesIO(buffer.getvalue()[:-10])))
+
+
+@pytest.mark.parametrize("seed", [-1, -2**63, 2**63 - 1])
+def test_負のシードもそのまま書き出して読み込める(seed):
+    logs = _play(1).event_logger.logs
+    buffer = io.BytesIO()
+    with LogArchiveWriter(buffer) as writer:
+        writer.write_logs(logs, seed=seed)
+    buffer.seek(0)
+
+    (block,) = read_log_archive(buffer)
+    assert block.seed == seed
+    assert len(block) == len(logs)
+
+
+def test_LogCodeは値ではなく名前から読み込む():
+    """code 列はブロックのコード表の番号で、LogCode の値ではなく名前から戻すことを確認する。"""
+    battle = _play(1)
+    logs = battle.event_logger.logs
+    buffer = io.BytesIO()
+    with LogArchiveWriter(buffer) as writer:
+        writer.write(battle)
+    buffer.seek(0)
+    (block,) = read_log_archive(buffer)
+
+    assert sorted(block.code_names) == sorted({log.log.name for log in logs})
+    hp_changed = block.code_id(LogCode.HP_CHANGED)
+    assert [i for i, code in enumerate(block["code"]) if code == hp_changed] == [
+        i for i, log in enumerate(logs) if log.log == LogCode.HP_CHANGED]
+
+    # 現在の LogCode にない名前（削除・改名された列挙子）は None になる
+    removed = block.code_names[0]
+    block.code_names[0] = "REMOVED_CODE"
+    assert block.code_id(LogCode[removed]) == -1
+    assert block.decode_codes() == [None if log.log.name == removed else log.log for log in logs]
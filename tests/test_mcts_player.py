@@ -0,0 +1,141 @@
+"""jpoke.players.MCTSPlayer の単体テスト。"""
+import pytest
+
+from jpoke import Battle, Player, Pokemon
+from jpoke.enums import Command
+from jpoke.players import MCTSPlayer
+from jpoke.players.determinization import OpponentPrior
+
+
+def _start_battle(player: MCTSPlayer, move_names: list[str], opponent_move_names: list[str]) -> tuple[Battle, Player]:
+    """1vs1のバトルを開始し、相手の技を全て公開した盤面を返す（テラスタルなし）。"""
+    player.team = [Pokemon("ピカチュウ", item_name="", move_names=move_names)]
+    opponent = Player(username="Opponent")
+    opponent.team = [Pokemon("ゼニガメ", item_name="", move_names=opponent_move_names)]
+    battle = Battle(player, opponent, n_selected=1, seed=1, terastal=False)
+    battle.test_option.accuracy = 100
+    battle.start()
+    for move in battle.player_states[opponent].team[0].moves:
+        move.revealed = True
+    return battle, opponent
+
+
+@pytest.mark.parametrize("selection", ["uct", "exp3"])
+def test_相手を倒せる技を選ぶ(selection: str):
+    player = MCTSPlayer(username="MCTSPlayer", n_iterations=100, selection=selection)
+    battle, opponent = _start_battle(player, ["なきごえ", "たいあたり"], ["たいあたり"])
+    # 先に動ける自分が倒さなければ、相手に倒される
+    battle.get_active(player).hp = 1
+    battle.get_active(opponent).hp = 1
+
+    with battle.phase_context("action"):
+        assert player.choose_command(battle) == Command.MOVE_1
+    assert player.iterations == 100
+    assert player._searching is False
+
+
+def test_time_budget_msで反復を打ち切る():
+    player = MCTSPlayer(username="MCTSPlayer", n_iterations=10**9, time_budget_ms=50)
+    battle, _ = _start_battle(player, ["なきごえ", "たいあたり"], ["なきごえ", "たいあたり"])
+
+    with battle.phase_context("action"):
+        player.choose_command(battle)
+    assert 0 < player.iterations < 10**9
+
+
+def test_max_damageロールアウトで対戦を最後まで進められる():
+    player = MCTSPlayer(username="MCTSPlayer", n_iterations=20, rollout="max_damage")
+    battle, _ = _start_battle(player, ["なきごえ", "たいあたり"], ["たいあたり"])
+
+    battle.play_out(max_turns=30)
+
+    assert battle.winner is not None
+
+
+def test_reuse_treeで次のターンに実際の手順の部分木を使い回す():
+    """自分が選んだ手と相手が実際に選んだ手の組の子ノードを、次のターンの探索の
+    最上位として引き継ぐ。"""
+    results = []
+    for reuse_tree in (True, False):
+        player = MCTSPlayer(username="MCTSPlayer", n_iterations=50, reuse_tree=reuse_tree)
+        battle, _ = _start_battle(player, ["なきごえ", "しっぽをふる"], ["なきごえ", "しっぽをふる"])
+        battle.step()
+        assert player.reused_visits == 0
+        battle.step()
+        results.append(player.reused_visits)
+
+    reused, not_reused = results
+    assert reused > 0
+    assert not_reused == 0
+
+
+def test_evaluate_commandsが木の使い回しに影響しない():
+    player = MCTSPlayer(username="MCTSPlayer", n_iterations=30)
+    battle, opponent = _start_battle(player, ["なきごえ", "たいあたり"], ["たいあたり"])
+    # 先に動ける自分が倒さなければ、相手に倒される
+    battle.get_active(player).hp = 1
+    battle.get_active(opponent).hp = 1
+
+    with battle.phase_context("action"):
+        scores = player.evaluate_commands(battle)
+    assert set(scores) == {Command.MOVE_0, Command.MOVE_1}
+    assert scores[Command.MOVE_1] > scores[Command.MOVE_0]
+    assert player._tree is None
+    assert player.iterations == 0
+
+
+def test_n_workersで独立に探索した木の統計を足し合わせる():
+    player = MCTSPlayer(username="MCTSPlayer", n_iterations=30, n_workers=2)
+    battle, opponent = _start_battle(player, ["なきごえ", "たいあたり"], ["たいあたり"])
+    battle.get_active(player).hp = 1
+    battle.get_active(opponent).hp = 1
+
+    try:
+        with battle.phase_context("action"):
+            assert player.choose_command(battle) == Command.MOVE_1
+            scores = player.evaluate_commands(battle)
+    finally:
+        player.close()
+    assert player.iterations == 2 * 30
+    assert player._tree is None
+    assert scores[Command.MOVE_1] > scores[Command.MOVE_0]
+
+
+def test_n_determinizationsで決定化した盤面を順番に使って1つの木を探索する():
+    player = MCTSPlayer(
+        username="MCTSPlayer", n_iterations=30, n_determinizations=3,
+        opponent_prior=OpponentPrior(moves={"ゼニガメ": {"たいあたり": 1.0, "しっぽをふる": 1.0}}),
+    )
+    battle, opponent = _start_battle(player, ["なきごえ", "たいあたり"], ["たいあたり"])
+    battle.get_active(player).hp = 1
+    battle.get_active(opponent).hp = 1
+    # 相手の技を未公開に戻した観測で探索する
+    battle.player_states[opponent].team[0].moves[0].revealed = False
+    observation = battle.build_observation(player)
+
+    with observation.phase_context("action"):
+        assert player.choose_command(observation) == Command.MOVE_1
+    assert player.iterations == 30
+    assert player._tree is None
+
+
+def test_profileで反復ごとの複製とロールアウトの評価を計測する():
+    player = MCTSPlayer(username="MCTSPlayer", n_iterations=20, profile=True)
+    battle, _ = _start_battle(player, ["なきごえ", "たいあたり"], ["なきごえ", "たいあたり"])
+
+    with battle.phase_context("action"):
+        player.choose_command(battle)
+    stats = player.search_stats
+    root = stats.plies[0]
+    assert root.counts["copy"] == root.positions == 20
+    assert sum(ply.counts["step"] for ply in stats.plies.values()) == stats.nodes_expanded
+    assert sum(ply.counts["evaluate"] for ply in stats.plies.values()) == 20
+
+
+def test_不正なselectionを指定するとValueError():
+    with pytest.raises(ValueError):
+        MCTSPlayer(username="MCTSPlayer", selection="ucb")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,6 +4,8 @@
 observer 視点のコピーに相手の非公開情報（未公開の技・アイテム・特性・テラスタイプ・
 性格・努力値等）が含まれないことを保証する必要がある。
 """
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from jpoke.model import Pokemon
@@ -52,9 +54,8 @@ def test_観測でcopy_logsFalse指定時に複製元のログが変更されな
 def test_観測でcopy_logsFalse指定時に複製先のログが空になる():
     """build_observation(observer, copy_logs=False) の場合、複製先の
     event_logger/command_log は対戦開始からの履歴を引き継がず空で始まることを
-    確認する（r10-5回帰）。observation_builder.build() が Battle.copy() と同じ
-    「ログを一時的に空へ差し替えてから deepcopy する」最適化を再利用しているか
-    が検証対象。"""
+    確認する（r10-5回帰）。observation_builder.build() が構造共有の複製
+    （Battle.copy(copy_on_write=True)）に copy_logs を渡しているかが検証対象。"""
     battle = t.start_battle(
         team0=[Pokemon("ピカチュウ", move_names=["たいあたり"])],
         team1=[Pokemon("フシギダネ")],
@@ -217,6 +218,67 @@ def test_観測は自分自身の情報を隠蔽しない():
     assert own._nature == "ようき"
 
 
+def test_観測での隠蔽が構造共有している複製元に波及しない():
+    """観測は複製元とハンドラ登録・場の状態・ログを共有して構築されるが、隠蔽
+    （特性の差し替えに伴うハンドラの登録解除）や観測側での対戦の進行が複製元に
+    波及しないことを確認する。"""
+    battle = t.start_battle(
+        team0=[Pokemon("フシギダネ", move_names=["たいあたり"])],
+        team1=[_build_hidden_pokemon()],
+        accuracy=100,
+    )
+    observer, _ = battle.players
+    n_handlers = sum(len(v) for v in battle.events.handlers.values())
+    n_logs = len(battle.event_logger.logs)
+    hp = battle.actives[1].hp
+
+    obs = battle.build_observation(observer)
+    assert sum(len(v) for v in obs.events.handlers.values()) < n_handlers
+    t.run_move(obs, 0)
+    assert obs.actives[1].hp < hp
+
+    assert sum(len(v) for v in battle.events.handlers.values()) == n_handlers
+    assert len(battle.event_logger.logs) == n_logs
+    assert battle.actives[1].hp == hp
+    assert battle.actives[1].ability.name == "せいでんき"
+
+
+def test_観測を複数スレッドから同時に構築しても技の対応表が混ざらない():
+    """技のインデックスの新旧対応表は呼び出しごとに局所的に持つため、別々の対戦の
+    観測を複数スレッドから同時に構築しても、相手の合法手の付け替えが他の対戦の
+    対応表で壊れないことを確認する。"""
+    def build_battle(revealed_index: int):
+        battle = t.start_battle(
+            team0=[Pokemon("フシギダネ")],
+            team1=[Pokemon("ピカチュウ", move_names=["でんこうせっか", "10まんボルト", "でんじは"])],
+        )
+        _, opponent = battle.players
+        battle.actives[1].moves[revealed_index].revealed = True
+        battle.player_states[opponent].last_available_commands = (
+            battle.command_manager.available_action_commands(opponent)
+        )
+        return battle
+
+    def observe(args):
+        battle, revealed_index = args
+        observer, opponent = battle.players
+        results = set()
+        for _ in range(50):
+            obs = battle.build_observation(observer, copy_logs=False)
+            masked = obs.player_states[opponent]
+            results.add((
+                tuple(m.name for m in masked.team[0].moves),
+                tuple(cmd for cmd in masked.last_available_commands if not cmd.is_switch),
+            ))
+        return results
+
+    battles = [(build_battle(i % 3), i % 3) for i in range(6)]
+    expected = [observe(args) for args in battles]
+    assert all(len(r) == 1 for r in expected)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        assert list(executor.map(observe, battles)) == expected
+
+
 def test_観測済みの盤面でもcopy_logsが伝播する():
     """is_observation() が真の盤面（既に観測用コピー済みの Battle）に対して
     build_observation() を呼んだ場合、self.copy(copy_logs=copy_logs) 経由で
@@ -0,0 +1,59 @@
+"""jpoke.runner（対戦のプロセス並列実行）の単体テスト"""
+import pytest
+
+from jpoke import Pokemon
+from jpoke.core.replay import replay_battle
+from jpoke.players import RandomPlayer
+from jpoke.runner import derive_seed, run_battles
+
+
+def _build_players() -> tuple[RandomPlayer, RandomPlayer]:
+    player1 = RandomPlayer("Player1")
+    player1.team = [
+        Pokemon("ピカチュウ", move_names=["10まんボルト", "でんこうせっか"]),
+        Pokemon("リザードン", move_names=["かえんほうしゃ", "エアスラッシュ"]),
+    ]
+    player2 = RandomPlayer("Player2")
+    player2.team = [
+        Pokemon("カメックス", move_names=["なみのり", "かみくだく"]),
+        Pokemon("フシギバナ", move_names=["ギガドレイン", "ヘドロばくだん"]),
+    ]
+    return player1, player2
+
+
+def test_run_battles_並列実行でも順次実行と同じ結果になる():
+    """プロセス数によらず、同じ基準シードなら各対戦のシード・勝敗・リプレイが一致し、
+    リプレイから同じ勝者を再現できることを確認する。"""
+    sequential = run_battles(*_build_players(), n_battles=4, seed=7, max_workers=1, n_selected=2)
+    parallel = run_battles(*_build_players(), n_battles=4, seed=7, max_workers=2, n_selected=2)
+
+    assert [o.seed for o in sequential.outcomes] == [derive_seed(7, i) for i in range(4)]
+    assert [o.index for o in parallel.outcomes] == [0, 1, 2, 3]
+    assert [(o.seed, o.winner_index, o.turns) for o in parallel.outcomes] == \
+        [(o.seed, o.winner_index, o.turns) for o in sequential.outcomes]
+    assert [o.replay.to_dict() for o in parallel.outcomes] == \
+        [o.replay.to_dict() for o in sequential.outcomes]
+
+    for outcome in parallel.outcomes:
+        battle = replay_battle(outcome.replay)
+        winner = battle.winner
+        assert (None if winner is None else battle.players.index(winner)) == outcome.winner_index
+
+
+def test_run_battles_勝敗を集計して戦績に加算する():
+    player1, player2 = _build_players()
+    result = run_battles(player1, player2, n_battles=3, seed=1, max_workers=1, n_selected=2)
+
+    assert result.n_battles == 3
+    assert sum(result.wins) == result.n_finished
+    assert player1.n_finished_battles == player2.n_finished_battles == result.n_finished
+    assert (player1.n_won_battles, player2.n_won_battles) == result.wins
+    if result.n_finished:
+        assert result.win_rate(0) + result.win_rate(1) == pytest.approx(1.0)
+
+    with pytest.raises(ValueError):
+        run_battles(player1, player2, n_battles=-1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
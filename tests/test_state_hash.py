@@ -0,0 +1,112 @@
+"""Battle.state_hash()（局面の Zobrist ハッシュ）の単体テスト"""
+import pytest
+
+from jpoke import Battle, Pokemon
+from jpoke.core import compute_state_hash
+from jpoke.players import RandomPlayer
+
+from . import test_utils as t
+
+
+def test_state_hash_変更の順序によらず同じ局面なら同じ値になる():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ"), Pokemon("ライチュウ")],
+        team1=[Pokemon("カビゴン"), Pokemon("カメックス")],
+    )
+    mon0, mon1 = battle.actives
+    initial = battle.state_hash()
+
+    a = battle.copy()
+    a_mon0, a_mon1 = a.actives
+    a.modify_hp(a_mon1, v=-30)
+    a.modify_stats(a_mon0, {"atk": 1})
+    a.set_ailment(a_mon1, "まひ")
+
+    b = battle.copy()
+    b_mon0, b_mon1 = b.actives
+    b.set_ailment(b_mon1, "まひ")
+    b.modify_stats(b_mon0, {"atk": 1})
+    b.modify_hp(b_mon1, v=-30)
+
+    assert a.state_hash() == b.state_hash()
+    assert a.state_hash() != initial
+
+    # 変更を打ち消すと元の値に戻る
+    b.modify_stats(b_mon0, {"atk": -1})
+    b.modify_hp(b_mon1, v=30)
+    b.ailment_manager.remove(b_mon1)
+    assert b.state_hash() == initial
+
+
+def test_state_hash_差分更新の値が局面全体から計算した値と一致する():
+    """検査モードで対戦を進め、交代・瀕死・場の状態の変化を含む局面でも
+    差分更新した値が局面全体から計算した値・複製・巻き戻し後の値と一致することを確認する。"""
+    player1 = RandomPlayer("Player1")
+    player1.team = [
+        Pokemon("ピカチュウ", item_name="オボンのみ", move_names=["10まんボルト", "ボルトチェンジ", "でんじは"]),
+        Pokemon("リザードン", move_names=["かえんほうしゃ", "にほんばれ", "つるぎのまい"]),
+        Pokemon("カビゴン", item_name="たべのこし", move_names=["のしかかり", "あくび", "ねむる"]),
+    ]
+    player2 = RandomPlayer("Player2")
+    player2.team = [
+        Pokemon("カメックス", move_names=["なみのり", "からにこもる", "どくどく"]),
+        Pokemon("フシギバナ", move_names=["ギガドレイン", "やどりぎのタネ", "ねむりごな"]),
+        Pokemon("ゲンガー", item_name="きあいのタスキ", move_names=["シャドーボール", "さいみんじゅつ", "ステルスロック"]),
+    ]
+    battle = Battle(player1, player2, n_selected=3, seed=5)
+    battle.start()
+    battle.enable_state_hash(check=True)
+
+    hashes = set()
+    while battle.can_continue(max_turns=30):
+        checkpoint = battle.checkpoint()
+        before = battle.state_hash()
+        battle.step()
+        value = battle.state_hash()
+        assert value == compute_state_hash(battle)
+        assert battle.copy(copy_on_write=True).state_hash() == value
+        hashes.add(value)
+
+        battle.rollback(checkpoint)
+        assert battle.state_hash() == before
+        battle.clear_checkpoints()
+        battle.step()
+
+    assert len(hashes) > 1
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_state_hash_複製先の変更は複製元のハッシュに影響しない(copy_on_write):
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ"), Pokemon("ライチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    battle.enable_state_hash(check=True)
+    before = battle.state_hash()
+
+    copied = battle.copy(copy_on_write=copy_on_write)
+    copied_bench = copied.get_team(copied.players[0])[1]
+    copied.modify_hp(copied_bench, v=-10)
+    assert copied.state_hash() == compute_state_hash(copied)
+
+    assert battle.state_hash() == before == compute_state_hash(battle)
+
+
+def test_state_hash_検査モードは更新漏れを検出する():
+    battle = t.start_battle(
+        team0=[Pokemon("ピカチュウ"), Pokemon("ライチュウ")],
+        team1=[Pokemon("カビゴン")],
+    )
+    battle.enable_state_hash(check=True)
+    # マネージャーを経由せずに控えのHPを書き換えると差分更新に反映されない
+    bench = battle.get_team(battle.players[0])[1]
+    bench.hp -= 1
+    with pytest.raises(RuntimeError):
+        battle.state_hash()
+
+    battle.disable_state_hash()
+    assert battle.state_hash() == compute_state_hash(battle)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
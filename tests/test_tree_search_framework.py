@@ -10,12 +10,18 @@ ISSUE-1（探索中の割り込み交代による再帰呼び出しが copy_dept
 （`TreeSearchPlayer` 単体は `_score_command` 未実装のためインスタンス化はできても
 探索を実行できない）。
 """
+import json
+
 import pytest
 
 from jpoke import Battle, Player, Pokemon
 from jpoke.enums import Command
 from jpoke.model import Move
 from jpoke.players import MinimaxPlayer, TreeSearchPlayer
+from jpoke.players.determinization import OpponentPrior
+from jpoke.players.evaluator import BatchEvaluator
+from jpoke.players.search_stats import SearchStats
+from jpoke.players.tree_search_player import total_hp_ratio
 
 
 def test_configure_simが各分岐でsim_step実行前に呼ばれる():
@@ -585,6 +591,293 @@ def test_score_command未実装のTreeSearchPlayerはNotImplementedErrorにな
         battle.step()
 
 
+def _start_status_move_battle(search_player: Player) -> Battle:
+    """両者が命中判定のない自分対象の変化技だけを持つ1vs1のバトルを開始する
+    （テラスタルなし）。技を使う順序が違っても同じ局面（ランク補正・PP）に合流する。"""
+    search_player.team = [Pokemon("カイリキー", move_names=["つるぎのまい", "かたくなる"])]
+    opponent = Player(username="Opponent")
+    opponent.team = [Pokemon("ゴローニャ", move_names=["つるぎのまい", "かたくなる"])]
+    battle = Battle(search_player, opponent, n_selected=1, seed=1, terastal=False)
+    battle.start()
+    for move in battle.player_states[opponent].team[0].moves:
+        move.revealed = True
+    return battle
+
+
+def test_tt_sizeで手順違いの同一局面を置換表から使い回す():
+    """置換表を有効にすると、技の順序だけが異なる同一局面の再探索を省き、
+    評価値は置換表なしの探索と一致することを確認する。"""
+    results = []
+    for tt_size in (None, 1000):
+        player = MinimaxPlayer(username="SearchPlayer", max_plies=3, tt_size=tt_size)
+        battle = _start_status_move_battle(player)
+        with battle.phase_context("action"):
+            scores = player.evaluate_commands(battle)
+            player.choose_command(battle)
+        results.append((scores, player.nodes_expanded, player.tt_hits, player.tt_misses))
+
+    (plain_scores, plain_nodes, _, _), (tt_scores, tt_nodes, tt_hits, tt_misses) = results
+    assert tt_scores == plain_scores
+    assert tt_hits > 0
+    # 1手目の4局面と、2手目の16通りの手順が合流する
+    # (自分のランク補正3通り) x (相手のランク補正3通り) の局面だけを展開する
+    assert tt_misses == 4 + 9
+    assert tt_hits == 16 - 9
+    assert (plain_nodes, tt_nodes) == (4 + 16 + 64, 4 + 16 + 9 * 4)
+
+    # 上限を超えた局面は古いものから捨てる
+    player = MinimaxPlayer(username="SearchPlayer", max_plies=3, tt_size=2)
+    battle = _start_status_move_battle(player)
+    with battle.phase_context("action"):
+        player.choose_command(battle)
+    assert len(player._tt) == 2
+
+
+def test_time_budget_msで期限までに探索を終えた最も深い結果を返す():
+    """反復深化は期限内なら max_plies まで深さを増やし、期限を過ぎたら打ち切った
+    深さを捨てて、1つ浅い深さの最善手を返すことを確認する。"""
+
+    class TurnDependentPlayer(MinimaxPlayer):
+        """2ターン目の盤面ではこうげき、それ以外ではぼうぎょのランクを評価する
+        （2手読みと3手読みで最善手が変わる）。"""
+
+        def evaluate(self, battle: Battle) -> float:
+            boosts = battle.get_active(self).boosts
+            return boosts["atk"] if battle.turn == 2 else boosts["def"]
+
+    class ExpiringPlayer(TurnDependentPlayer):
+        """2手読みまでを終えた直後に探索の期限を切らす。"""
+
+        def configure_sim(self, sim: Battle) -> None:
+            if self.nodes_expanded >= 4 + (4 + 16):
+                self._deadline = 0.0
+
+    expected = {}
+    for max_plies in (2, 3):
+        player = TurnDependentPlayer(username="SearchPlayer", max_plies=max_plies)
+        battle = _start_status_move_battle(player)
+        with battle.phase_context("action"):
+            expected[max_plies] = player.choose_command(battle)
+        assert player.completed_plies == max_plies
+    assert expected[2] != expected[3]
+
+    # 期限内: 1手読み（4ノード）・2手読み（20ノード）・3手読み（84ノード）を順に終える
+    player = TurnDependentPlayer(username="SearchPlayer", max_plies=3, time_budget_ms=60_000)
+    battle = _start_status_move_battle(player)
+    with battle.phase_context("action"):
+        assert player.choose_command(battle) == expected[3]
+    assert player.completed_plies == 3
+    assert player.nodes_expanded == 4 + 20 + 84
+    assert player.max_plies == 3
+
+    # 3手読みの途中で期限切れ: 2手読みの最善手を返す
+    player = ExpiringPlayer(username="SearchPlayer", max_plies=3, time_budget_ms=60_000)
+    battle = _start_status_move_battle(player)
+    with battle.phase_context("action"):
+        assert player.choose_command(battle) == expected[2]
+    assert player.completed_plies == 2
+    assert player.nodes_expanded == 4 + 20 + 1
+    assert player.max_plies == 3
+
+
+@pytest.mark.parametrize("max_plies", [2, 3])
+def test_alpha_betaで全探索と同じ手を選びノード数が減る(max_plies: int):
+    """アルファベータ法の枝刈りは、乱数の絡まない盤面では全探索と同じ手・評価値を
+    返し、展開するノード数だけを減らすことを確認する。"""
+
+    class DeterministicMinimaxPlayer(MinimaxPlayer):
+        def configure_sim(self, sim: Battle) -> None:
+            sim.move_executor._check_critical = lambda ctx: False  # 急所を無効化する
+
+    results = []
+    for alpha_beta in (False, True):
+        player = DeterministicMinimaxPlayer(
+            username="SearchPlayer", max_plies=max_plies, alpha_beta=alpha_beta,
+        )
+        player.team = [Pokemon("カビゴン", move_names=["のしかかり", "じしん", "のろい"])]
+        opponent = Player(username="Opponent")
+        opponent.team = [Pokemon("ミミッキュ", move_names=["じゃれつく", "かげうち", "つるぎのまい"])]
+        # 命中・追加効果・ダメージ乱数を固定する
+        battle = Battle(player, opponent, n_selected=1, seed=1, terastal=False,
+                        damage_roll="average", accuracy_fix_threshold=0, effect_chance_threshold=1.0)
+        battle.start()
+        for move in battle.player_states[opponent].team[0].moves:
+            move.revealed = True
+        with battle.phase_context("action"):
+            scores = player.evaluate_commands(battle)
+            command = player.choose_command(battle)
+        results.append((command, scores, player.nodes_expanded))
+
+    (plain_command, plain_scores, plain_nodes), (ab_command, ab_scores, ab_nodes) = results
+    assert ab_command == plain_command
+    assert ab_scores == plain_scores
+    assert ab_nodes < plain_nodes
+
+
+def test_n_workersで最上位の手をプロセスに分散しても逐次探索と同じ評価値になる():
+    """各プロセスは逐次探索と同じ規則で分岐の乱数を派生させるため、命中・急所・
+    ダメージ乱数の絡む盤面でも逐次探索と同じ評価値・ノード数になることを確認する。"""
+    results = []
+    for n_workers in (None, 2):
+        player = MinimaxPlayer(username="SearchPlayer", max_plies=2, n_workers=n_workers)
+        player.team = [Pokemon("カビゴン", move_names=["のしかかり", "じしん", "のろい"])]
+        opponent = Player(username="Opponent")
+        opponent.team = [Pokemon("ミミッキュ", move_names=["じゃれつく", "かげうち", "つるぎのまい"])]
+        battle = Battle(player, opponent, n_selected=1, seed=1, terastal=False)
+        battle.start()
+        for move in battle.player_states[opponent].team[0].moves:
+            move.revealed = True
+        try:
+            with battle.phase_context("action"):
+                scores = player.evaluate_commands(battle)
+                command = player.choose_command(battle)
+        finally:
+            player.close()
+        results.append((command, scores, player.nodes_expanded))
+
+    assert results[1] == results[0]
+    assert player._executor is None
+
+
+class _NoCriticalMinimaxPlayer(MinimaxPlayer):
+    def configure_sim(self, sim: Battle) -> None:
+        sim.move_executor._check_critical = lambda ctx: False  # 急所を無効化する
+
+
+def _start_tackle_battle(player: MinimaxPlayer, accuracy: int | None, damage_roll: str) -> tuple[Battle, Player]:
+    """自分がたいあたり・かたくなる、相手がつるぎのまいだけを持つ1vs1のバトルを開始する。"""
+    player.team = [Pokemon("カイリキー", move_names=["たいあたり", "かたくなる"])]
+    opponent = Player(username="Opponent")
+    opponent.team = [Pokemon("ゴローニャ", move_names=["つるぎのまい"])]
+    battle = Battle(player, opponent, n_selected=1, seed=1, terastal=False, damage_roll=damage_roll)
+    battle.test_option.accuracy = accuracy
+    battle.start()
+    for move in battle.player_states[opponent].team[0].moves:
+        move.revealed = True
+    return battle, opponent
+
+
+def test_chance_nodesで命中とダメージ乱数の結果を確率で重み付けした期待値を返す():
+    """確率分岐では、命中・外れやダメージ乱数の結果ごとの評価値を確率で重み付けした
+    期待値を手の評価値とし、列挙した結果ごとに1ノードと数えることを確認する。"""
+    # 命中率70%: 命中した場合（命中率100%で固定した盤面）の評価値の0.7倍になる
+    scores = {}
+    for accuracy, chance_nodes in ((100, False), (70, True)):
+        player = _NoCriticalMinimaxPlayer(username="SearchPlayer", chance_nodes=chance_nodes)
+        battle, _ = _start_tackle_battle(player, accuracy, damage_roll="average")
+        with battle.phase_context("action"):
+            scores[accuracy] = player.evaluate_commands(battle)[Command.MOVE_0]
+            player.choose_command(battle)
+    assert scores[70] == pytest.approx(0.7 * scores[100])
+    # たいあたりの命中・外れの2通りと、かたくなるの1通り
+    assert player.nodes_expanded == 2 + 1
+
+    # ダメージ乱数を16区間に分けると、16段階の乱数の平均ダメージで評価する
+    player = _NoCriticalMinimaxPlayer(username="SearchPlayer", chance_nodes=True, damage_buckets=16)
+    battle, opponent = _start_tackle_battle(player, None, damage_roll="normal")
+    attacker, defender = battle.get_active(player), battle.get_active(opponent)
+    damages = battle.calc_damages(attacker, defender, "たいあたり")
+    with battle.phase_context("action"):
+        score = player.evaluate_commands(battle)[Command.MOVE_0]
+        player.choose_command(battle)
+    assert score == pytest.approx(sum(damages) / len(damages) / defender.max_hp)
+    assert player.nodes_expanded == 16 + 1
+
+
+def test_n_determinizationsで相手の技が未公開でも事前分布から補って探索する():
+    """相手の技が1つも公開されていない観測でも、事前分布からサンプリングした技で
+    決定化した盤面を探索し、fallback に委譲しないことを確認する。"""
+    player = MinimaxPlayer(
+        username="SearchPlayer", n_determinizations=3,
+        opponent_prior=OpponentPrior(moves={"ゼニガメ": {"たいあたり": 1.0, "しっぽをふる": 1.0}}),
+    )
+    player.team = [Pokemon("ヒトカゲ", item_name="", move_names=["たいあたり", "なきごえ"])]
+    opponent = Player(username="Opponent")
+    opponent.team = [Pokemon("ゼニガメ", item_name="", move_names=["みずでっぽう"])]
+    battle = Battle(player, opponent, n_selected=1, seed=1, terastal=False)
+    battle.test_option.accuracy = 100
+    battle.start()
+    observation = battle.build_observation(player)
+
+    with observation.phase_context("action"):
+        scores = player.evaluate_commands(observation)
+        command = player.choose_command(observation)
+    assert set(scores) == {Command.MOVE_0, Command.MOVE_1}
+    assert command == Command.MOVE_0
+    assert player.nodes_expanded > 0
+    assert player._positions is None
+    # 観測は変更されない
+    opp_mon = observation.player_states[observation.opponent(player)].team[0]
+    assert opp_mon.moves == []
+
+
+class _RecordingEvaluator(BatchEvaluator):
+    """残りHP割合の差で評価し、評価した盤面の数を呼び出しごとに記録する。"""
+
+    def __init__(self):
+        self.batch_sizes: list[int] = []
+
+    def evaluate_batch(self, battles: list[Battle], player: Player) -> list[float]:
+        self.batch_sizes.append(len(battles))
+        return [
+            total_hp_ratio(battle, player) - total_hp_ratio(battle, battle.opponent(player))
+            for battle in battles
+        ]
+
+
+def test_evaluatorで最後の1手の相手の応手の盤面をまとめて評価する():
+    """evaluator を指定すると、相手の応手ごとの葉ノードを1回の evaluate_batch() で
+    評価し、既定の evaluate() と同じ評価値になることを確認する。"""
+    scores = {}
+    for use_evaluator in (False, True):
+        evaluator = _RecordingEvaluator() if use_evaluator else None
+        player = MinimaxPlayer(username="SearchPlayer", evaluator=evaluator)
+        player.team = [Pokemon("ピカチュウ", item_name="", move_names=["たいあたり", "なきごえ"])]
+        opponent = Player(username="Opponent")
+        opponent.team = [Pokemon("ゼニガメ", item_name="", move_names=["たいあたり", "しっぽをふる", "あわ"])]
+        battle = Battle(player, opponent, n_selected=1, seed=1, terastal=False)
+        battle.test_option.accuracy = 100
+        battle.start()
+        for move in battle.player_states[opponent].team[0].moves:
+            move.revealed = True
+        with battle.phase_context("action"):
+            scores[use_evaluator] = player.evaluate_commands(battle)
+    assert scores[True] == scores[False]
+    # 自分の手ごとに、相手の3つの応手の盤面をまとめて評価する
+    assert evaluator.batch_sizes == [3, 3]
+
+
+def test_profileで深さごとの処理回数と分岐数を計測する():
+    player = MinimaxPlayer(username="SearchPlayer", max_plies=2, profile=True)
+    battle = _start_status_move_battle(player)
+
+    with battle.phase_context("action"):
+        player.choose_command(battle)
+    stats = player.search_stats
+    assert stats.decisions == 1
+    assert stats.nodes_expanded == player.nodes_expanded == 2 * 2 + 4 * 2 * 2
+    root, child, leaf = (stats.plies[depth] for depth in range(3))
+    assert (root.positions, root.branches, root.counts["step"]) == (1, 4, 4)
+    assert (child.positions, child.branches, child.counts["step"]) == (4, 16, 16)
+    assert child.branching_factor == child.effective_branching_factor == 4
+    assert leaf.counts["evaluate"] == 16
+    assert all(time >= 0 for time in child.times.values())
+    assert stats.cutoffs == 0
+
+    data = json.loads(stats.to_json())
+    assert [ply["depth"] for ply in data["plies"]] == [0, 1, 2]
+    assert data["plies"][1]["counts"]["copy"] == 16
+
+    # ノード上限で打ち切った回数を数え、探索を跨いで足し合わせる
+    player.max_nodes = 5
+    with battle.phase_context("action"):
+        player.choose_command(battle)
+    assert player.search_stats.cutoffs > 0
+    assert player.total_search_stats.decisions == 2
+    total = SearchStats.aggregate([stats, player.search_stats])
+    assert total.nodes_expanded == player.total_search_stats.nodes_expanded == 20 + 5
+
+
 def test_とんぼがえり使用時に相手のベンチが公開済みでもValueErrorにならない():
     """CRIT-1回帰: 相手のベンチが公開済みの状態でとんぼがえりを使い、
     switch フェーズに入っても sim.step() が例外にならず探索が完了すること。